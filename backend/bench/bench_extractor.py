@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+영양성분 추출기 마이크로 벤치마크
+
+영양소마다 extract_value / extract_nutrition_value 를 따로 호출하던 기존 방식과
+NutrientMatcher 로 한 번에 추출하는 방식의 속도를 비교합니다.
+
+    python bench/bench_extractor.py [반복 횟수]
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.samples import READTEXT_SAMPLES
+from ocr.constants import OCR_NUTRIENTS
+from ocr.extractor import (
+    NUTRITION_KEYWORDS,
+    NutrientMatcher,
+    extract_value,
+    extract_nutrition_value,
+)
+
+UPLOAD_KEYWORDS = {name: keywords for name, (_, keywords) in OCR_NUTRIENTS.items()}
+
+
+def legacy_upload(lines):
+    return {name: extract_value(lines, keywords) for name, keywords in UPLOAD_KEYWORDS.items()}
+
+
+def legacy_table(lines):
+    result = {}
+    for name, keywords in NUTRITION_KEYWORDS.items():
+        value = extract_nutrition_value(lines, keywords)
+        if value is not None:
+            result[name] = value
+    return result
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    upload_matcher = NutrientMatcher(UPLOAD_KEYWORDS)
+    table_matcher = NutrientMatcher(NUTRITION_KEYWORDS, mode="table")
+
+    # 결과가 기존 함수와 같은지 먼저 확인
+    for lines in READTEXT_SAMPLES:
+        expected = legacy_upload(lines)
+        matched = upload_matcher.match(lines)
+        actual = {name: matched.get(name, 0.0) for name in UPLOAD_KEYWORDS}
+        assert actual == expected, (expected, actual)
+        assert table_matcher.match(lines) == legacy_table(lines)
+
+    cases = [
+        ("업로드 6종 (extract_value)", legacy_upload, upload_matcher.match),
+        ("영양성분표 22종 (extract_nutrition_value)", legacy_table, table_matcher.match),
+    ]
+
+    print(f"샘플 {len(READTEXT_SAMPLES)}개, 반복 {number}회")
+    for label, legacy, compiled in cases:
+        legacy_time = timeit.timeit(lambda: [legacy(lines) for lines in READTEXT_SAMPLES], number=number)
+        compiled_time = timeit.timeit(lambda: [compiled(lines) for lines in READTEXT_SAMPLES], number=number)
+        per_call = len(READTEXT_SAMPLES) * number
+        print(f"\n{label}")
+        print(f"  - 기존 방식: {legacy_time / per_call * 1e6:8.1f} us/이미지")
+        print(f"  - 매처:      {compiled_time / per_call * 1e6:8.1f} us/이미지")
+        print(f"  - 속도 향상: {legacy_time / compiled_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+remove_background_noise 벤치마크
+
+라벨마다 전체 이미지 마스크를 만들던 기존 구현과 조회표 방식의 현재 구현을
+점 노이즈가 많은 이진화 라벨 이미지에서 비교합니다.
+
+    python bench/bench_noise.py [점 개수]
+"""
+
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ocr.preprocess import preprocess_image, remove_background_noise
+
+
+def legacy_remove_background_noise(image: np.ndarray) -> np.ndarray:
+    """기존 구현 (요소마다 labels == i 마스크 생성)"""
+    num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(image, connectivity=8)
+    min_size = 50
+    cleaned = image.copy()
+    for i in range(1, num_labels):
+        if stats[i, cv2.CC_STAT_AREA] < min_size:
+            cleaned[labels == i] = 0
+    return cleaned
+
+
+def noisy_sample(speckles: int) -> np.ndarray:
+    """샘플 라벨을 작업 폭으로 키워 이진화한 뒤 흰 점 노이즈를 뿌린 이미지"""
+    base = cv2.imread(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                   "uploads", "label_sample.png"))
+    base = cv2.resize(base, (2000, int(2000 * base.shape[0] / base.shape[1])), interpolation=cv2.INTER_CUBIC)
+    binary = cv2.bitwise_not(preprocess_image(base, denoise="none"))
+
+    rng = np.random.default_rng(0)
+    ys = rng.integers(0, binary.shape[0], speckles)
+    xs = rng.integers(0, binary.shape[1], speckles)
+    binary[ys, xs] = 255
+    return binary
+
+
+def timed(fn, image):
+    start = time.perf_counter()
+    result = fn(image)
+    return result, time.perf_counter() - start
+
+
+def main():
+    speckles = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    image = noisy_sample(speckles)
+    num_labels = cv2.connectedComponents(image, connectivity=8)[0]
+    print(f"이미지 크기: {image.shape}, 연결 요소: {num_labels}개")
+
+    current, current_time = timed(remove_background_noise, image)
+    legacy, legacy_time = timed(legacy_remove_background_noise, image)
+    assert np.array_equal(current, legacy)
+
+    print(f"  - 기존 구현: {legacy_time * 1000:10.1f} ms")
+    print(f"  - 조회표:    {current_time * 1000:10.1f} ms")
+    print(f"  - 속도 향상: {legacy_time / current_time:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
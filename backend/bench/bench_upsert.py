@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+save_nutrients 저장 방식 벤치마크 (MySQL 필요, .env 의 DB 설정 사용)
+
+영양소마다 SELECT 후 UPDATE/INSERT 하던 기존 방식과 다중 행 upsert 한 번으로 저장하는 현재 방식을
+여러 스레드가 같은 사용자의 같은 날짜에 동시에 저장하는 상황에서 비교합니다.
+벤치마크용 임시 테이블 두 개를 만들어 쓰고 끝나면 지웁니다. (daily_nutrients 는 건드리지 않음)
+
+    python bench/bench_upsert.py [스레드 수] [스레드당 저장 횟수]
+"""
+
+import os
+import sys
+import threading
+import time
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import connect
+from repository import upsert_daily_sql
+
+LEGACY_TABLE = "bench_daily_nutrients_legacy"
+UPSERT_TABLE = "bench_daily_nutrients_upsert"
+
+# 한 끼 저장 요청 (화면에서 보내는 6개 영양소)
+MEAL = [
+    {"name": "열량", "value": 250.0, "unit": "kcal"},
+    {"name": "단백질", "value": 8.0, "unit": "g"},
+    {"name": "나트륨", "value": 450.0, "unit": "mg"},
+    {"name": "당류", "value": 12.0, "unit": "g"},
+    {"name": "지방", "value": 3.5, "unit": "g"},
+    {"name": "포화지방", "value": 1.0, "unit": "g"},
+]
+
+CREATE_SQL = """
+    CREATE TABLE {table} (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        user_id INT NOT NULL,
+        nutrient_name VARCHAR(50) NOT NULL,
+        value DOUBLE NOT NULL,
+        unit VARCHAR(10),
+        date DATE NOT NULL,
+        {key} (user_id, nutrient_name, date)
+    )
+"""
+
+
+class CountingCursor:
+    """execute 호출 수(= 서버 왕복 수)를 세는 커서 래퍼"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.cursor = conn.cursor(dictionary=True, buffered=True)
+        self.round_trips = 0
+
+    def execute(self, sql, params=()):
+        self.round_trips += 1
+        self.cursor.execute(sql, params)
+
+    def fetchone(self):
+        return self.cursor.fetchone()
+
+    def commit(self):
+        self.round_trips += 1
+        self.conn.commit()
+
+
+def legacy_save(db: CountingCursor, user_id: int, nutrients, day: date):
+    """기존 save_nutrients (영양소마다 SELECT + UPDATE/INSERT)"""
+    for nutrient in nutrients:
+        db.execute(f"""
+            SELECT id, value FROM {LEGACY_TABLE}
+            WHERE user_id = %s AND nutrient_name = %s AND date = %s
+        """, (user_id, nutrient["name"], day))
+        existing = db.fetchone()
+        if existing:
+            db.execute(f"UPDATE {LEGACY_TABLE} SET value = %s WHERE id = %s",
+                       (existing["value"] + nutrient["value"], existing["id"]))
+        else:
+            db.execute(f"""
+                INSERT INTO {LEGACY_TABLE} (user_id, nutrient_name, value, unit, date)
+                VALUES (%s, %s, %s, %s, %s)
+            """, (user_id, nutrient["name"], nutrient["value"], nutrient["unit"], day))
+    db.commit()
+
+
+def upsert_save(db: CountingCursor, user_id: int, nutrients, day: date):
+    """현재 방식 (다중 행 upsert 한 번)"""
+    params = []
+    for nutrient in nutrients:
+        params.extend((user_id, nutrient["name"], nutrient["value"], nutrient["unit"], day))
+    db.execute(upsert_daily_sql(len(nutrients), UPSERT_TABLE), params)
+    db.commit()
+
+
+def run(save, table: str, threads: int, saves: int):
+    latencies = []
+    round_trips = []
+    errors = []
+    lock = threading.Lock()
+    day = date.today()
+
+    def worker():
+        db = CountingCursor(connect())
+        local = []
+        try:
+            for _ in range(saves):
+                start = time.perf_counter()
+                try:
+                    save(db, 1, MEAL, day)
+                except Exception as e:
+                    db.conn.rollback()
+                    errors.append(repr(e))
+                local.append(time.perf_counter() - start)
+        finally:
+            with lock:
+                latencies.extend(local)
+                round_trips.append(db.round_trips)
+            db.conn.close()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    # 정확성: 열량 합계가 저장 횟수 × 250 인지, 행이 영양소당 하나인지
+    conn = connect()
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(f"SELECT COUNT(*) AS n, SUM(value) AS total FROM {table} WHERE nutrient_name = '열량'")
+    row = cursor.fetchone()
+    conn.close()
+
+    latencies.sort()
+    total_saves = threads * saves
+    return {
+        "saves_per_sec": total_saves / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "round_trips_per_save": sum(round_trips) / total_saves,
+        "errors": len(errors),
+        "calorie_rows": row["n"],
+        "calorie_total": float(row["total"] or 0),
+        "expected_total": total_saves * MEAL[0]["value"],
+    }
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    saves = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    conn = connect()
+    cursor = conn.cursor()
+    for table, key in ((LEGACY_TABLE, "KEY"), (UPSERT_TABLE, "UNIQUE KEY")):
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        cursor.execute(CREATE_SQL.format(table=table, key=key))
+    conn.commit()
+
+    try:
+        print(f"스레드 {threads}개 × {saves}회 저장 (같은 사용자, 같은 날짜)")
+        for label, save, table in (("기존 (SELECT+UPDATE)", legacy_save, LEGACY_TABLE),
+                                   ("upsert", upsert_save, UPSERT_TABLE)):
+            r = run(save, table, threads, saves)
+            print(f"  - {label}")
+            print(f"      처리량 {r['saves_per_sec']:.0f}회/s, p50 {r['p50_ms']:.1f} ms, p95 {r['p95_ms']:.1f} ms,"
+                  f" 저장당 왕복 {r['round_trips_per_save']:.1f}회, 오류 {r['errors']}건")
+            print(f"      열량 행 {r['calorie_rows']}개, 합계 {r['calorie_total']:.0f} (기대값 {r['expected_total']:.0f})")
+    finally:
+        for table in (LEGACY_TABLE, UPSERT_TABLE):
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.commit()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+부하 테스트용 OpenAI 호환 서버 (POST /v1/chat/completions)
+
+실제 API 대신 고정된 지연 뒤에 정해진 길이의 답변을 돌려줍니다. stream=true 이면
+첫 조각까지 --latency-ms, 이후 조각마다 --token-ms 간격으로 보냅니다.
+지연에 무작위성이 없으므로 실행할 때마다 같은 조건으로 측정됩니다.
+
+    python bench/fake_openai.py [--port 8790] [--latency-ms 800] [--tokens 60] [--token-ms 15]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+
+def create_app(latency_ms: float = 800, tokens: int = 60, token_ms: float = 15) -> Starlette:
+    stats = {"requests": 0, "streams": 0}
+
+    def completion(content: str, model: str):
+        return {
+            "id": "chatcmpl-bench", "object": "chat.completion", "created": int(time.time()), "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": tokens, "total_tokens": tokens},
+        }
+
+    def chunk(delta: dict, model: str, finish_reason=None) -> str:
+        body = {
+            "id": "chatcmpl-bench", "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        return f"data: {json.dumps(body, ensure_ascii=False)}\n\n"
+
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "gpt-3.5-turbo")
+        stats["requests"] += 1
+        words = [f"답변{i}" for i in range(tokens)]
+
+        if not body.get("stream"):
+            await asyncio.sleep(latency_ms / 1000)
+            return JSONResponse(completion(" ".join(words), model))
+
+        stats["streams"] += 1
+
+        async def events():
+            await asyncio.sleep(latency_ms / 1000)
+            yield chunk({"role": "assistant", "content": ""}, model)
+            for i, word in enumerate(words):
+                if i:
+                    await asyncio.sleep(token_ms / 1000)
+                yield chunk({"content": word + " "}, model)
+            yield chunk({}, model, finish_reason="stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    async def get_stats(request: Request):
+        return JSONResponse(stats)
+
+    return Starlette(routes=[
+        Route("/v1/chat/completions", chat_completions, methods=["POST"]),
+        Route("/stats", get_stats),
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--latency-ms", type=float, default=800, help="응답(스트리밍은 첫 조각)까지 지연")
+    parser.add_argument("--tokens", type=int, default=60, help="답변 단어 수")
+    parser.add_argument("--token-ms", type=float, default=15, help="스트리밍 조각 간격")
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency_ms, args.tokens, args.token_ms),
+                host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+부하 테스트 대상 서버 실행 (bench/loadtest.py 가 별도 프로세스로 띄움)
+
+main.app 을 그대로 uvicorn 으로 실행하되, 시작 전에 대역을 끼웁니다.
+  --db sqlite      db_pool 이 MySQL 대신 bench/sqlite_mysql.py 의 SQLite 연결을 쓰도록
+  --db mysql       .env 의 DB_* 설정 그대로 (벤치마크 전용 DB 를 가리키도록 DB_NAME 을 바꿔서 사용)
+  --ocr fake       EasyOCR 대신 --ocr-latency-ms 동안 멈춘 뒤 샘플 라인을 돌려주는 리더
+                   (전처리/캐스케이드/추출은 실제 코드 그대로, 모델 추론 시간만 고정값으로 대체)
+  --ocr real       실제 EasyOCR 모델
+OpenAI 주소는 OPENAI_BASE_URL 환경 변수로 받습니다.
+
+    python bench/load_server.py --port 8791 [--db sqlite --sqlite-path bench.db] [--ocr fake]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.samples import READTEXT_SAMPLES
+
+
+class FakeReader:
+    """
+    easyocr.Reader 대역 (readtext 가 detect → recognize 를 거치는 구조까지 같게)
+
+    워커 프로세스가 fork 로 만들어지며 부모의 리더를 물려받는 것을 이용하므로 Linux 에서만 동작합니다.
+    """
+
+    def __init__(self, latency_ms: float):
+        self.latency = latency_ms / 1000
+        self.calls = 0
+
+    def detect(self, image, **kwargs):
+        time.sleep(self.latency / 2)
+        return [[]], [[]]
+
+    def recognize(self, image, horizontal_list=None, free_list=None, detail=1, **kwargs):
+        time.sleep(self.latency / 2)
+        lines = READTEXT_SAMPLES[self.calls % len(READTEXT_SAMPLES)]
+        self.calls += 1
+        if detail:
+            return [([[0, 0], [1, 0], [1, 1], [0, 1]], line, 0.9) for line in lines]
+        return list(lines)
+
+    def readtext(self, image, detail=1, **kwargs):
+        horizontal_list, free_list = self.detect(image)
+        return self.recognize(image, horizontal_list, free_list, detail=detail)
+
+    def readtext_batched(self, images, detail=1, **kwargs):
+        return [self.readtext(image, detail=detail) for image in images]
+
+
+def init_fake_worker(torch_threads: int, event_queue=None):
+    """ocr.worker._init_worker 대역 (torch 를 불러오지 않고 진행/소요 시간 큐만 연결)"""
+    import ocr.worker
+    ocr.worker._event_queue = event_queue
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8791)
+    parser.add_argument("--db", choices=("sqlite", "mysql"), default="sqlite")
+    parser.add_argument("--sqlite-path", default="bench.db")
+    parser.add_argument("--ocr", choices=("fake", "real"), default="real")
+    parser.add_argument("--ocr-latency-ms", type=float, default=300, help="--ocr fake 의 인식 한 번 소요 시간")
+    args = parser.parse_args()
+
+    if args.db == "sqlite":
+        from bench.sqlite_mysql import connector, create_database
+        from db import db_pool
+        create_database(args.sqlite_path)
+        db_pool._connect = connector(args.sqlite_path)
+
+    if args.ocr == "fake":
+        import ocr.worker
+        ocr.worker._reader = FakeReader(args.ocr_latency_ms)
+        ocr.worker._init_worker = init_fake_worker
+
+    import uvicorn
+    from main import app
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+종단 간 부하 테스트 (실제 FastAPI 앱을 HTTP 로 호출)
+
+가짜 OpenAI 서버(bench/fake_openai.py)와 대상 서버(bench/load_server.py)를 별도 프로세스로 띄우고,
+사용자를 만든 뒤 시나리오마다 --concurrency 개의 가상 사용자가 쉬지 않고 요청을 보냅니다.
+워밍업 구간을 뺀 --duration 초 동안 끝난 요청으로 처리량과 지연 시간 분위수를 계산합니다.
+
+시나리오: upload, add-nutrients, user-status, statistics, ask-ai, mixed (앞의 다섯 개를 가중치대로 섞음)
+  - upload 는 매번 다른 바이트(샘플 이미지 끝에 무작위 바이트 추가)를 보내고 비슷한 사진 캐시를 꺼서
+    항상 OCR 을 실행합니다.
+  - 요청 순서와 내용은 --seed 로 정해지고, 실행마다 새 DB/캐시 디렉터리를 쓰므로
+    같은 설정으로 실행한 결과끼리 커밋 간 비교가 가능합니다.
+
+결과는 커밋 해시, 설정과 함께 JSON 으로 저장되며 --compare 로 이전 결과와의 차이를 출력합니다.
+
+    python bench/loadtest.py [--concurrency 8] [--duration 30] [--warmup 5] [--scenarios user-status,ask-ai]
+                             [--db sqlite|mysql] [--ocr fake|real] [--openai-latency-ms 800]
+                             [--out 결과.json] [--compare 이전결과.json]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(BACKEND_DIR, "bench")
+SAMPLE_IMAGE = os.path.join(BACKEND_DIR, "uploads", "label_sample.png")
+
+SCENARIOS = ("upload", "add-nutrients", "user-status", "statistics", "ask-ai", "mixed")
+# mixed 시나리오의 요청 비율 (화면 사용 빈도 기준: 메인 화면 조회가 가장 많음)
+MIX_WEIGHTS = {"user-status": 4, "add-nutrients": 2, "statistics": 2, "upload": 1, "ask-ai": 1}
+# 비교할 때 설정이 다르면 경고할 항목
+COMPARABLE_CONFIG = ("concurrency", "duration", "users", "seed", "db", "ocr", "ocr_latency_ms",
+                     "openai_latency_ms", "openai_tokens", "openai_token_ms")
+
+MEAL = [
+    {"name": "열량", "value": 250.0, "unit": "kcal"},
+    {"name": "단백질", "value": 8.0, "unit": "g"},
+    {"name": "나트륨", "value": 450.0, "unit": "mg"},
+    {"name": "당류", "value": 12.0, "unit": "g"},
+    {"name": "지방", "value": 3.5, "unit": "g"},
+    {"name": "포화지방", "value": 1.2, "unit": "g"},
+]
+QUESTIONS = ["오늘 식단에서 부족한 영양소가 뭐예요?", "나트륨을 줄이려면 어떻게 해야 하나요?",
+             "저녁으로 뭘 먹으면 좋을까요?", "당류를 너무 많이 먹은 것 같아요."]
+
+
+# --- 프로세스 관리 ---
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_process(args: List[str], log_path: str, env: Optional[Dict[str, str]] = None) -> subprocess.Popen:
+    log = open(log_path, "wb")
+    return subprocess.Popen([sys.executable, *args], cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+
+def wait_ready(url: str, process: subprocess.Popen, timeout: float) -> None:
+    """url 이 200 을 반환할 때까지 대기 (OCR 워밍업 포함, 서버가 failed 로 응답하면 바로 중단)"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"서버가 종료됨 (코드 {process.returncode})")
+        try:
+            response = httpx.get(url, timeout=2)
+            if response.status_code == 200:
+                return
+            if response.status_code == 503 and response.json().get("status") == "failed":
+                raise RuntimeError(f"{url} 준비 실패: {response.json().get('error')}")
+        except (httpx.HTTPError, ValueError):
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} 가 {timeout:.0f}초 안에 준비되지 않음")
+
+
+def stop_process(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def git_revision() -> Dict[str, Any]:
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=BACKEND_DIR, capture_output=True, text=True).stdout.strip()
+    try:
+        return {"commit": git("rev-parse", "--short", "HEAD"), "dirty": bool(git("status", "--porcelain"))}
+    except OSError:
+        return {"commit": None, "dirty": None}
+
+
+# --- 시나리오 ---
+
+class VirtualUser:
+    """가상 사용자 한 명 (자기 계정, 채팅 세션, 난수 생성기)"""
+
+    def __init__(self, user_id: int, rng: random.Random):
+        self.user_id = user_id
+        self.rng = rng
+        self.session_id: Optional[str] = None
+        self.requests = 0
+
+
+class Workload:
+    """시나리오별 요청 한 번을 보내는 함수 모음"""
+
+    def __init__(self, client: httpx.AsyncClient, image: bytes):
+        self.client = client
+        self.image = image
+        self.actions: Dict[str, Callable[[VirtualUser], Awaitable[httpx.Response]]] = {
+            "upload": self.upload,
+            "add-nutrients": self.add_nutrients,
+            "user-status": self.user_status,
+            "statistics": self.statistics,
+            "ask-ai": self.ask_ai,
+        }
+
+    async def upload(self, user: VirtualUser) -> httpx.Response:
+        # PNG 끝(IEND 뒤)에 붙인 바이트는 디코딩에 영향이 없지만 캐시 키(sha256)는 매번 달라짐
+        image = self.image + user.rng.randbytes(16)
+        return await self.client.post("/upload", data={"user_id": str(user.user_id)},
+                                      files={"image": ("label.png", image, "image/png")})
+
+    async def add_nutrients(self, user: VirtualUser) -> httpx.Response:
+        nutrients = [dict(n, value=round(n["value"] * user.rng.uniform(0.5, 1.5), 1)) for n in MEAL]
+        return await self.client.post("/add-nutrients", json={"user_id": str(user.user_id), "nutrients": nutrients})
+
+    async def user_status(self, user: VirtualUser) -> httpx.Response:
+        return await self.client.get(f"/user-status/{user.user_id}")
+
+    async def statistics(self, user: VirtualUser) -> httpx.Response:
+        granularity = ("day", "week", "month")[user.requests % 3]
+        return await self.client.get(f"/statistics/{user.user_id}", params={"granularity": granularity})
+
+    async def ask_ai(self, user: VirtualUser) -> httpx.Response:
+        body = {"user_id": user.user_id, "question": user.rng.choice(QUESTIONS), "session_id": user.session_id}
+        response = await self.client.post("/ask-ai", json=body)
+        if response.status_code == 200:
+            user.session_id = response.json().get("session_id", user.session_id)
+        return response
+
+    def pick(self, scenario: str, user: VirtualUser) -> str:
+        if scenario != "mixed":
+            return scenario
+        names = list(MIX_WEIGHTS)
+        return user.rng.choices(names, weights=[MIX_WEIGHTS[name] for name in names])[0]
+
+
+async def create_users(client: httpx.AsyncClient, count: int) -> List[int]:
+    """벤치마크 사용자 생성 후 ID 목록 (한 끼 기록까지 해 두어 첫 조회부터 데이터가 있도록)"""
+    user_ids = []
+    for i in range(count):
+        username = f"bench_user_{i}"
+        form = {"username": username, "password": "bench-password", "gender": ("male", "female")[i % 2],
+                "age_group": "20대"}
+        await client.post("/auth/register", data=form)
+        response = await client.post("/auth/login", data={"username": username, "password": "bench-password"})
+        response.raise_for_status()
+        user_id = response.json()["user"]["id"]
+        (await client.post("/add-nutrients", json={"user_id": str(user_id), "nutrients": MEAL})).raise_for_status()
+        user_ids.append(user_id)
+    return user_ids
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """nearest-rank 분위수"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, max(0, math.ceil(q * len(sorted_values)) - 1))]
+
+
+def summarize(samples: List[Tuple[float, str]], duration: float) -> Dict[str, Any]:
+    latencies = sorted(latency * 1000 for latency, _ in samples)
+    statuses = Counter(status for _, status in samples)
+    errors = sum(count for status, count in statuses.items() if not status.startswith("2"))
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "statuses": dict(sorted(statuses.items())),
+        "throughput_rps": round(len(samples) / duration, 2),
+        "latency_ms": {
+            "avg": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+            "p50": round(percentile(latencies, 0.50), 2),
+            "p90": round(percentile(latencies, 0.90), 2),
+            "p95": round(percentile(latencies, 0.95), 2),
+            "p99": round(percentile(latencies, 0.99), 2),
+            "max": round(latencies[-1], 2) if latencies else 0.0,
+        },
+    }
+
+
+async def run_scenario(workload: Workload, scenario: str, user_ids: List[int], concurrency: int,
+                       warmup: float, duration: float, seed: int) -> Dict[str, Any]:
+    """
+    가상 사용자 concurrency 명이 warmup + duration 초 동안 요청을 보냄 (닫힌 루프: 응답을 받으면 바로 다음 요청)
+
+    워밍업이 끝난 뒤 시작해 측정 구간 안에 끝난 요청만 집계합니다.
+    """
+    users = [VirtualUser(user_ids[i % len(user_ids)], random.Random(f"{seed}:{scenario}:{i}"))
+             for i in range(concurrency)]
+    samples: List[Tuple[float, str]] = []
+    per_action: Dict[str, List[Tuple[float, str]]] = {}
+    started = time.perf_counter()
+    measure_from = started + warmup
+    measure_until = measure_from + duration
+
+    async def loop(user: VirtualUser):
+        while time.perf_counter() < measure_until:
+            action = workload.pick(scenario, user)
+            begin = time.perf_counter()
+            try:
+                status = str((await workload.actions[action](user)).status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            end = time.perf_counter()
+            user.requests += 1
+            if begin >= measure_from and end <= measure_until:
+                samples.append((end - begin, status))
+                per_action.setdefault(action, []).append((end - begin, status))
+
+    await asyncio.gather(*(loop(user) for user in users))
+    result = summarize(samples, duration)
+    if scenario == "mixed":
+        result["actions"] = {action: summarize(action_samples, duration)
+                             for action, action_samples in sorted(per_action.items())}
+    return result
+
+
+# --- 출력 ---
+
+def print_results(results: Dict[str, Dict[str, Any]], concurrency: int) -> None:
+    print(f"\n{'시나리오':<16}{'동시성':>6}{'요청':>8}{'오류':>6}{'req/s':>10}"
+          f"{'avg':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}  (ms)")
+    for scenario, result in results.items():
+        rows = [(scenario, result)] + [(f"  {action}", r) for action, r in result.get("actions", {}).items()]
+        for name, r in rows:
+            ms = r["latency_ms"]
+            print(f"{name:<16}{concurrency:>6}{r['requests']:>8}{r['errors']:>6}{r['throughput_rps']:>10.2f}"
+                  f"{ms['avg']:>10.1f}{ms['p50']:>10.1f}{ms['p95']:>10.1f}{ms['p99']:>10.1f}{ms['max']:>10.1f}")
+
+
+def print_comparison(report: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    base_rev, rev = baseline["revision"], report["revision"]
+    print(f"\n비교: {base_rev.get('commit')} → {rev.get('commit')}{' (커밋 안 된 변경 포함)' if rev.get('dirty') else ''}")
+    changed = [key for key in COMPARABLE_CONFIG if baseline["config"].get(key) != report["config"].get(key)]
+    if changed:
+        print(f"주의: 설정이 다릅니다 ({', '.join(changed)}) - 수치를 그대로 비교할 수 없습니다.")
+
+    def delta(new: float, old: float) -> str:
+        return f"{(new - old) / old * 100:+.1f}%" if old else "-"
+
+    print(f"{'시나리오':<16}{'req/s':>18}{'p50':>18}{'p95':>18}{'p99':>18}")
+    for scenario, result in report["results"].items():
+        old = baseline["results"].get(scenario)
+        if old is None:
+            continue
+        cells = [delta(result["throughput_rps"], old["throughput_rps"])]
+        cells += [delta(result["latency_ms"][q], old["latency_ms"][q]) for q in ("p50", "p95", "p99")]
+        print(f"{scenario:<16}" + "".join(f"{cell:>18}" for cell in cells))
+
+
+# --- 실행 ---
+
+async def run_load(args, base_url: str) -> Tuple[Dict[str, Any], Any]:
+    with open(SAMPLE_IMAGE, "rb") as f:
+        image = f.read()
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        user_ids = await create_users(client, args.users)
+        workload = Workload(client, image)
+        results = {}
+        for scenario in args.scenarios:
+            print(f"{scenario}: 워밍업 {args.warmup:.0f}초 + 측정 {args.duration:.0f}초 ...", flush=True)
+            results[scenario] = await run_scenario(workload, scenario, user_ids, args.concurrency,
+                                                   args.warmup, args.duration, args.seed)
+        # 서버가 기록한 단계별 소요 시간 (모든 시나리오 누적)
+        server_stages = (await client.get("/metrics/summary")).json()
+    return results, server_stages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"쉼표로 구분 ({', '.join(SCENARIOS)})")
+    parser.add_argument("--concurrency", type=int, default=8, help="동시에 요청하는 가상 사용자 수")
+    parser.add_argument("--duration", type=float, default=30, help="시나리오별 측정 시간 (초)")
+    parser.add_argument("--warmup", type=float, default=5, help="시나리오별 워밍업 시간 (초, 집계 제외)")
+    parser.add_argument("--users", type=int, default=20, help="만들 사용자 계정 수")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=120, help="요청 하나의 제한 시간 (초)")
+    parser.add_argument("--db", choices=("sqlite", "mysql"), default="sqlite",
+                        help="sqlite: 실행마다 새 SQLite 대역 / mysql: .env 의 DB (벤치마크 전용 DB 사용)")
+    parser.add_argument("--ocr", choices=("fake", "real"), default="real")
+    parser.add_argument("--ocr-latency-ms", type=float, default=300)
+    parser.add_argument("--openai-latency-ms", type=float, default=800)
+    parser.add_argument("--openai-tokens", type=int, default=60)
+    parser.add_argument("--openai-token-ms", type=float, default=15)
+    parser.add_argument("--ready-timeout", type=float, default=300, help="서버 준비(OCR 워밍업) 대기 시간 (초)")
+    parser.add_argument("--out", help="결과 JSON 경로 (기본: bench/results/loadtest-<커밋>.json)")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    args = parser.parse_args()
+
+    args.scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [s for s in args.scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"알 수 없는 시나리오: {', '.join(unknown)}")
+
+    revision = git_revision()
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    openai_port, server_port = free_port(), free_port()
+    base_url = f"http://127.0.0.1:{server_port}"
+
+    env = dict(os.environ)
+    env.update({
+        "OPENAI_API_KEY": "bench",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{openai_port}/v1",
+        # 이전 실행이 남긴 캐시/작업/이미지가 결과에 섞이지 않도록 실행마다 새 디렉터리
+        "OCR_CACHE_DIR": os.path.join(workdir, "ocr-cache"),
+        "OCR_JOB_DB": os.path.join(workdir, "ocr-jobs.db"),
+        "BLOB_STORE_DIR": os.path.join(workdir, "storage"),
+        "PROFILE_DIR": os.path.join(workdir, "profiles"),
+        # 비슷한 사진 캐시를 끄고 매 업로드가 OCR 을 거치도록
+        "OCR_CACHE_MAX_DISTANCE": "-1",
+    })
+
+    fake_openai = start_process(
+        [os.path.join(BENCH_DIR, "fake_openai.py"), "--port", str(openai_port),
+         "--latency-ms", str(args.openai_latency_ms), "--tokens", str(args.openai_tokens),
+         "--token-ms", str(args.openai_token_ms)],
+        os.path.join(workdir, "fake_openai.log"))
+    server = start_process(
+        [os.path.join(BENCH_DIR, "load_server.py"), "--port", str(server_port), "--db", args.db,
+         "--sqlite-path", os.path.join(workdir, "bench.db"), "--ocr", args.ocr,
+         "--ocr-latency-ms", str(args.ocr_latency_ms)],
+        os.path.join(workdir, "server.log"), env=env)
+    print(f"작업 디렉터리 (로그/DB): {workdir}")
+
+    try:
+        wait_ready(f"http://127.0.0.1:{openai_port}/stats", fake_openai, 30)
+        wait_ready(f"{base_url}/readyz", server, args.ready_timeout)
+        results, server_stages = asyncio.run(run_load(args, base_url))
+    finally:
+        stop_process(server)
+        stop_process(fake_openai)
+
+    config = {key: value for key, value in vars(args).items() if key not in ("out", "compare")}
+    report = {
+        "revision": revision,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "cpu_count": os.cpu_count()},
+        "config": config,
+        "results": results,
+        "server_stages": server_stages,
+    }
+
+    print_results(results, args.concurrency)
+    out = args.out or os.path.join(
+        BENCH_DIR, "results", f"loadtest-{revision['commit'] or 'unknown'}{'-dirty' if revision['dirty'] else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print_comparison(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
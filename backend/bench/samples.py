@@ -0,0 +1,30 @@
+#벤치마크용 샘플 데이터
+
+# reader.readtext(detail=0) 출력 형태의 영양성분표 라인들
+# (표 셀 단위로 잘린 라인, 공백이 섞인 키워드, 단위 오인식 등이 포함된 실제 출력 패턴)
+READTEXT_SAMPLES = [
+    [
+        "영양정보", "총 내용량 120g", "100g당 250kcal", "1일 영양성분", "기준치에 대한 비율",
+        "나트륨 450mg", "23%", "탄수화물 35g", "11%", "당류 12g", "12%",
+        "지방 9.5g", "18%", "트랜스지방 0g", "포화지방 3.29", "22%",
+        "콜레스테롤 15mg", "5%", "단백질 8g", "15%",
+        "1일 영양성분 기준치에 대한 비율(%)은 2,000kcal 기준이므로",
+        "개인의 필요 열량에 따라 다를 수 있습니다.",
+    ],
+    [
+        "제품명: 초코 쿠키", "식품유형: 과자", "내용량: 60g", "유통기한: 측면 표기일까지",
+        "원재료명 및 함량", "밀가루(밀:미국산)", "설탕", "식물성유지(팜유)", "코코아분말 5%",
+        "전지분유", "쇼트닝", "탄산수소나트륨", "합성향료(바닐라향)", "정제소금",
+        "제조원: (주)OO제과 경기도 OO시 OO로 123", "반품 및 교환처: 구입처 및 본사",
+        "부정불량식품 신고는 국번없이 1399", "보관방법: 직사광선을 피해 서늘한 곳에 보관",
+        "영 양 정 보", "총 내용량 60 g", "열 량", "310 kcal", "나 트 륨", "180 mg",
+        "탄 수 화 물", "38 g", "당 류", "21 g", "지 방", "16 g", "포 화 지 방", "8 g",
+        "단 백 질", "4 g", "알레르기 유발물질: 밀, 우유, 대두 함유",
+    ],
+    [
+        "Nutrition Facts", "Serving size 1 cup (240ml)", "Calories 150 kcal",
+        "Total Fat 8g", "Saturated Fat 5g", "Trans Fat 0g", "Cholesterol 30mg",
+        "Sodium 125mg", "Total Carbohydrate 12g", "Sugars 12g", "Protein 8g",
+        "Vitamin D 2.5mcg", "Calcium 300mg", "Iron 0.1mg", "Potassium 380mg",
+    ],
+]
@@ -0,0 +1,140 @@
+#부하 테스트용 MySQL 대역 (mysql.connector 연결처럼 동작하는 SQLite 연결)
+#
+# 서버가 쓰는 만큼의 SQL만 옮깁니다: %s 자리표시자, ON DUPLICATE KEY UPDATE ... VALUES(col) 형식의 upsert.
+# 쓰기는 파일 단위 잠금으로 직렬화되므로 InnoDB 의 행 잠금보다 쓰기 경합에 약합니다.
+# DB 쪽 수치가 중요한 측정은 실제 MySQL(--db mysql)로 하세요.
+
+import re
+import sqlite3
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+
+# 서버가 쓰는 테이블 (MySQL 스키마와 같은 컬럼 / 유니크 키)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL UNIQUE,
+    password TEXT NOT NULL,
+    gender TEXT,
+    age_group TEXT,
+    activity_level TEXT,
+    health_goal TEXT,
+    profile_image TEXT
+);
+CREATE TABLE IF NOT EXISTS daily_nutrients (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    nutrient_name TEXT NOT NULL,
+    value REAL NOT NULL,
+    unit TEXT,
+    date DATE NOT NULL,
+    UNIQUE (user_id, nutrient_name, date)
+);
+CREATE TABLE IF NOT EXISTS nutrient_rollups (
+    user_id INTEGER NOT NULL,
+    granularity TEXT NOT NULL,
+    period_start DATE NOT NULL,
+    nutrient_name TEXT NOT NULL,
+    value REAL NOT NULL,
+    unit TEXT,
+    PRIMARY KEY (user_id, granularity, period_start, nutrient_name)
+);
+"""
+
+# ON DUPLICATE KEY UPDATE 를 ON CONFLICT 로 옮길 때 쓰는 테이블별 유니크 키
+CONFLICT_KEYS = {
+    "daily_nutrients": "user_id, nutrient_name, date",
+    "nutrient_rollups": "user_id, granularity, period_start, nutrient_name",
+}
+
+_UPSERT = re.compile(r"INSERT\s+INTO\s+(\w+)(.*?)ON\s+DUPLICATE\s+KEY\s+UPDATE(.*)$", re.S | re.I)
+_VALUES_FN = re.compile(r"VALUES\((\w+)\)", re.I)
+
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_converter("DATE", lambda value: date.fromisoformat(value.decode()))
+
+
+def translate(sql: str) -> str:
+    """MySQL 문을 SQLite 문으로"""
+    sql = sql.replace("%s", "?")
+    match = _UPSERT.search(sql)
+    if match:
+        table, body, update = match.groups()
+        update = _VALUES_FN.sub(r"excluded.\1", update)
+        sql = f"INSERT INTO {table}{body}ON CONFLICT ({CONFLICT_KEYS[table]}) DO UPDATE SET{update}"
+    return sql
+
+
+class Cursor:
+    """mysql.connector 의 cursor(dictionary=True, buffered=True) 와 같은 방식으로 결과 반환"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._cursor = conn.cursor()
+
+    def execute(self, sql: str, params: Sequence[Any] = ()):
+        self._cursor.execute(translate(sql), tuple(params))
+
+    def fetchone(self) -> Optional[Dict[str, Any]]:
+        row = self._cursor.fetchone()
+        return dict(row) if row is not None else None
+
+    def fetchall(self) -> List[Dict[str, Any]]:
+        return [dict(row) for row in self._cursor.fetchall()]
+
+    @property
+    def lastrowid(self) -> Optional[int]:
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    def close(self):
+        self._cursor.close()
+
+
+class Connection:
+    """db.ConnectionPool 이 쓰는 mysql.connector 연결 메서드만 구현"""
+
+    def __init__(self, path: str):
+        # 풀이 연결을 여러 DB 스레드에 돌려 쓰므로 스레드 확인은 끔 (한 번에 한 스레드만 사용)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False,
+                                     detect_types=sqlite3.PARSE_DECLTYPES)
+        self._conn.row_factory = sqlite3.Row
+
+    @property
+    def in_transaction(self) -> bool:
+        return self._conn.in_transaction
+
+    def cursor(self, dictionary: bool = True, buffered: bool = True) -> Cursor:
+        return Cursor(self._conn)
+
+    def ping(self, reconnect: bool = False):
+        self._conn.execute("SELECT 1")
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        self._conn.close()
+
+
+def create_database(path: str):
+    """스키마 생성 (WAL: 읽기가 쓰기를 기다리지 않도록)"""
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def connector(path: str):
+    """db.ConnectionPool 의 connect 자리에 넣을 함수"""
+    def connect() -> Connection:
+        return Connection(path)
+    return connect
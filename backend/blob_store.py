@@ -0,0 +1,87 @@
+#바이너리 파일 저장소 (프로필 이미지 등 DB에 넣지 않을 파일)
+#
+# 키는 "profile/1/ab12.../128.jpg" 처럼 '/'로 구분한 경로이며, 저장소 구현만 바꾸면
+# (예: S3 같은 오브젝트 스토리지) 호출하는 쪽은 그대로 쓸 수 있습니다.
+
+import os
+import re
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from typing import Optional
+
+BLOB_STORE_BACKEND = os.getenv("BLOB_STORE_BACKEND", "local")
+BLOB_STORE_DIR = os.getenv(
+    "BLOB_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "storage"),
+)
+
+_KEY_PATTERN = re.compile(r"^[A-Za-z0-9_.-]+(/[A-Za-z0-9_.-]+)*$")
+
+
+def _check_key(key: str):
+    # 경로 조작('..', 절대 경로 등) 방지
+    if not _KEY_PATTERN.match(key) or any(part in (".", "..") for part in key.split("/")):
+        raise ValueError(f"잘못된 blob 키: {key!r}")
+
+
+class BlobStore(ABC):
+    """저장소 인터페이스 (모든 메서드는 블로킹이므로 이벤트 루프 밖에서 호출, 빠진 메서드가 있으면 생성 시 TypeError)"""
+
+    @abstractmethod
+    def put(self, key: str, data: bytes):
+        ...
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """없으면 None"""
+
+    @abstractmethod
+    def delete_prefix(self, prefix: str):
+        """prefix 아래의 모든 키 삭제 (없어도 오류 아님)"""
+
+
+class LocalBlobStore(BlobStore):
+    """로컬 디스크 저장소 (키 = directory 아래 상대 경로)"""
+
+    def __init__(self, directory: str = BLOB_STORE_DIR):
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        _check_key(key)
+        return os.path.join(self.directory, *key.split("/"))
+
+    def put(self, key: str, data: bytes):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 읽는 쪽이 쓰다 만 파일을 보지 않도록 임시 파일에 쓴 뒤 교체
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def delete_prefix(self, prefix: str):
+        path = self._path(prefix)
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        elif os.path.exists(path):
+            os.unlink(path)
+
+
+def create_blob_store() -> BlobStore:
+    """BLOB_STORE_BACKEND 설정에 맞는 저장소 생성"""
+    if BLOB_STORE_BACKEND == "local":
+        return LocalBlobStore()
+    raise ValueError(f"지원하지 않는 BLOB_STORE_BACKEND: {BLOB_STORE_BACKEND}")
@@ -0,0 +1,182 @@
+#AI 코치 채팅 세션 (대화 기록을 서버에 보관하고 토큰 예산을 넘으면 오래된 대화를 요약/삭제)
+
+import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+CHAT_SESSION_TTL = float(os.getenv("CHAT_SESSION_TTL", str(2 * 3600)))
+CHAT_SESSION_MAX = int(os.getenv("CHAT_SESSION_MAX", "10000"))
+# OpenAI 로 보내는 이전 대화(요약 포함)의 최대 토큰 수
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "1500"))
+# 예산을 넘으면 최근 대화를 이 비율만큼 남기고 나머지를 요약
+CHAT_HISTORY_KEEP_RATIO = float(os.getenv("CHAT_HISTORY_KEEP_RATIO", "0.5"))
+SYSTEM_PROMPT_CACHE_SIZE = int(os.getenv("SYSTEM_PROMPT_CACHE_SIZE", "5000"))
+
+# 메시지 하나마다 붙는 역할/구분자 토큰
+_MESSAGE_OVERHEAD = 4
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except ImportError:
+    _encoding = None
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    텍스트의 토큰 수 추정
+
+    tiktoken 이 설치되어 있으면 정확히 세고, 없으면 한글 등 비 ASCII 문자는 글자당 1토큰,
+    ASCII 는 4글자당 1토큰으로 어림합니다. (gpt-3.5-turbo 토크나이저 기준으로 약간 크게 잡힘)
+    """
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    non_ascii = sum(1 for c in text if ord(c) > 127)
+    return non_ascii + (len(text) - non_ascii + 3) // 4
+
+
+def message_tokens(messages: List[Dict[str, str]]) -> int:
+    return sum(estimate_tokens(m["content"]) + _MESSAGE_OVERHEAD for m in messages)
+
+
+def fit_to_budget(messages: List[Dict[str, str]], budget: int) -> List[Dict[str, str]]:
+    """예산 안에 들어가는 최근 메시지들만 남김 (오래된 것부터 버림)"""
+    kept: List[Dict[str, str]] = []
+    total = 0
+    for message in reversed(messages):
+        total += estimate_tokens(message["content"]) + _MESSAGE_OVERHEAD
+        if total > budget:
+            break
+        kept.append(message)
+    kept.reverse()
+    return kept
+
+
+class ChatSession:
+    """사용자 한 명의 대화 하나"""
+
+    __slots__ = ("id", "user_id", "summary", "history", "updated", "compacting")
+
+    def __init__(self, user_id):
+        self.id = uuid.uuid4().hex
+        self.user_id = str(user_id)
+        self.summary = ""  # 요약된 이전 대화
+        self.history: List[Dict[str, str]] = []
+        self.updated = time.monotonic()
+        self.compacting = False
+
+    def context(self, budget: int = CHAT_HISTORY_TOKEN_BUDGET) -> List[Dict[str, str]]:
+        """OpenAI 로 보낼 이전 대화 (요약 + 예산 안의 최근 대화)"""
+        messages = []
+        if self.summary:
+            messages.append({"role": "system", "content": f"이전 대화 요약:\n{self.summary}"})
+        return messages + fit_to_budget(self.history, budget - message_tokens(messages))
+
+
+Summarizer = Callable[[str, List[Dict[str, str]]], Awaitable[str]]
+
+
+class ChatSessionStore:
+    """
+    프로세스 메모리에 보관하는 채팅 세션 저장소 (TTL + 최대 개수 LRU)
+
+    대화가 추가되어 기록이 토큰 예산을 넘으면 최근 대화(예산 × keep_ratio)만 남기고
+    나머지는 summarize 로 기존 요약에 합칩니다. 요약은 응답을 늦추지 않도록 백그라운드에서 실행하며,
+    요약에 실패하면 그 대화는 버립니다.
+    """
+
+    def __init__(self, ttl: float = CHAT_SESSION_TTL, max_sessions: int = CHAT_SESSION_MAX,
+                 budget: int = CHAT_HISTORY_TOKEN_BUDGET, keep_ratio: float = CHAT_HISTORY_KEEP_RATIO):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.budget = budget
+        self.keep_ratio = keep_ratio
+        self._sessions: "OrderedDict[str, ChatSession]" = OrderedDict()
+        self._tasks = set()
+        self._stats = {"created": 0, "expired": 0, "compactions": 0, "summarize_errors": 0}
+
+    def _expire(self):
+        now = time.monotonic()
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.updated <= self.ttl and len(self._sessions) <= self.max_sessions:
+                break
+            self._sessions.popitem(last=False)
+            self._stats["expired"] += 1
+
+    def get_or_create(self, user_id, session_id: Optional[str]) -> ChatSession:
+        """session_id 세션을 반환 (없거나 만료되었거나 다른 사용자의 세션이면 새로 만듦)"""
+        self._expire()
+        session = self._sessions.get(session_id) if session_id else None
+        if session is None or session.user_id != str(user_id):
+            session = ChatSession(user_id)
+            self._sessions[session.id] = session
+            self._stats["created"] += 1
+            self._expire()
+        session.updated = time.monotonic()
+        self._sessions.move_to_end(session.id)
+        return session
+
+    def append(self, session: ChatSession, question: str, answer: str, summarize: Optional[Summarizer] = None):
+        """질문/답변 한 쌍을 기록하고 필요하면 백그라운드에서 압축"""
+        session.history.append({"role": "user", "content": question})
+        session.history.append({"role": "assistant", "content": answer})
+        session.updated = time.monotonic()
+        if message_tokens(session.history) > self.budget and not session.compacting:
+            session.compacting = True
+            task = asyncio.create_task(self._compact(session, summarize))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _compact(self, session: ChatSession, summarize: Optional[Summarizer]):
+        try:
+            recent = fit_to_budget(session.history, int(self.budget * self.keep_ratio))
+            # 질문/답변 쌍이 갈라지지 않도록 짝수 개만 남김
+            keep = len(recent) - len(recent) % 2
+            old = session.history[:len(session.history) - keep]
+            if not old:
+                return
+            if summarize is not None:
+                try:
+                    session.summary = await summarize(session.summary, old)
+                except Exception as e:
+                    self._stats["summarize_errors"] += 1
+                    print(f"대화 요약 실패 (오래된 대화는 버림): {e!r}")
+            # 요약하는 동안 뒤에 추가된 대화는 그대로 두고 앞부분만 제거
+            del session.history[:len(old)]
+            self._stats["compactions"] += 1
+        finally:
+            session.compacting = False
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats["sessions"] = len(self._sessions)
+        return stats
+
+
+class SystemPromptCache:
+    """사용자별 시스템 프롬프트 캐시 (사용자 정보와 오늘 영양소 스냅샷이 같을 때만 재사용)"""
+
+    def __init__(self, max_entries: int = SYSTEM_PROMPT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()  # 사용자 -> (스냅샷 키, 프롬프트)
+
+    def get(self, user_id, fingerprint: str, build: Callable[[], str]) -> str:
+        user_key = str(user_id)
+        entry = self._entries.get(user_key)
+        if entry is not None and entry[0] == fingerprint:
+            self._entries.move_to_end(user_key)
+            return entry[1]
+        prompt = build()
+        self._entries[user_key] = (fingerprint, prompt)
+        self._entries.move_to_end(user_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return prompt
+
+
+chat_sessions = ChatSessionStore()
+system_prompts = SystemPromptCache()
@@ -1,14 +1,227 @@
 import mysql.connector
 import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, Tuple
 from dotenv import load_dotenv
 
 load_dotenv()
 
-conn = mysql.connector.connect(
-    host=os.getenv("DB_HOST"),
-    port=os.getenv("DB_PORT"),
-    user=os.getenv("DB_USER"),
-    password=os.getenv("DB_PASSWORD"),
-    database=os.getenv("DB_NAME")
-)
-cursor = conn.cursor(dictionary=True)
+# 커넥션 풀 설정 (환경 변수로 조정)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+# 풀이 가득 찼을 때 추가로 열 수 있는 연결 수 (반납 시 닫힘)
+DB_POOL_OVERFLOW = int(os.getenv("DB_POOL_OVERFLOW", "5"))
+# 연결을 빌릴 때 최대 대기 시간 (초)
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+# 이 시간(초)보다 오래된 연결은 다시 열기 (MySQL wait_timeout 보다 짧게)
+DB_POOL_RECYCLE = float(os.getenv("DB_POOL_RECYCLE", "1800"))
+# 빌려줄 때마다 ping 으로 끊긴 연결 확인
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+
+
+def connect():
+    """새 MySQL 연결 생성"""
+    return mysql.connector.connect(
+        host=os.getenv("DB_HOST"),
+        port=os.getenv("DB_PORT"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        database=os.getenv("DB_NAME")
+    )
+
+
+class PoolTimeoutError(Exception):
+    """제한 시간 안에 빌릴 수 있는 연결이 없음"""
+
+
+class ConnectionPool:
+    """
+    스레드 안전한 DB 커넥션 풀
+
+    size 개까지는 반납된 연결을 보관해 재사용하고, 모두 사용 중이면 overflow 개까지 임시 연결을 더 엽니다.
+    그 이상은 timeout 초 동안 반납을 기다리다가 PoolTimeoutError 를 발생시킵니다.
+    recycle 초보다 오래된 연결과 ping 에 실패한 연결은 버리고 새로 엽니다.
+    연결은 처음 필요할 때 열기 때문에 모듈을 불러오는 시점에는 DB에 접속하지 않습니다.
+    """
+
+    def __init__(self, connect: Callable[[], Any] = connect, size: int = DB_POOL_SIZE,
+                 overflow: int = DB_POOL_OVERFLOW, timeout: float = DB_POOL_TIMEOUT,
+                 recycle: float = DB_POOL_RECYCLE, pre_ping: bool = DB_POOL_PRE_PING):
+        self._connect = connect
+        self.size = max(1, size)
+        self.overflow = max(0, overflow)
+        self.timeout = timeout
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+
+        self._cond = threading.Condition()
+        self._idle: Deque[Tuple[Any, float]] = deque()  # (연결, 연 시각)
+        self._created: Dict[int, float] = {}  # id(연결) -> 연 시각 (열려 있는 모든 연결)
+        self._checked_out = 0
+        self._opening = 0  # 여는 중인 연결 수
+        self._stats = {"checkouts": 0, "waits": 0, "timeouts": 0, "connects": 0, "recycled": 0, "errors": 0}
+
+    def _discard(self, conn: Any):
+        """연결을 닫고 목록에서 제거 (락 밖에서 호출)"""
+        with self._cond:
+            self._created.pop(id(conn), None)
+            self._cond.notify()
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _usable(self, conn: Any, created: float) -> bool:
+        if self.recycle >= 0 and time.monotonic() - created > self.recycle:
+            return False
+        if self.pre_ping:
+            try:
+                conn.ping(reconnect=False)
+            except Exception:
+                return False
+        return True
+
+    def checkout(self) -> Any:
+        """연결 하나를 빌림"""
+        deadline = time.monotonic() + self.timeout
+        waited = False
+        while True:
+            with self._cond:
+                while True:
+                    if self._idle:
+                        conn, created = self._idle.pop()
+                        break
+                    if len(self._created) + self._opening < self.size + self.overflow:
+                        conn = None
+                        self._opening += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeoutError()
+                    if not waited:
+                        waited = True
+                        self._stats["waits"] += 1
+                    self._cond.wait(remaining)
+                self._checked_out += 1
+
+            if conn is None:
+                # 새 연결은 락 밖에서 엶 (접속 시간 동안 다른 스레드를 막지 않도록)
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._opening -= 1
+                        self._checked_out -= 1
+                        self._stats["errors"] += 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._opening -= 1
+                    self._created[id(conn)] = time.monotonic()
+                    self._stats["connects"] += 1
+            elif not self._usable(conn, created):
+                with self._cond:
+                    self._checked_out -= 1
+                    self._stats["recycled"] += 1
+                self._discard(conn)
+                continue
+
+            with self._cond:
+                self._stats["checkouts"] += 1
+            return conn
+
+    def checkin(self, conn: Any, discard: bool = False):
+        """빌린 연결을 반납 (discard 이면 닫음)"""
+        if not discard:
+            try:
+                # 읽기만 한 요청도 트랜잭션이 열려 있을 수 있으므로 끝내서 다음 요청이 최신 데이터를 보게 함
+                if conn.in_transaction:
+                    conn.rollback()
+            except Exception:
+                discard = True
+
+        with self._cond:
+            self._checked_out -= 1
+            keep = not discard and id(conn) in self._created and len(self._idle) < self.size
+            if keep:
+                self._idle.append((conn, self._created[id(conn)]))
+                self._cond.notify()
+        if not keep:
+            self._discard(conn)
+
+    def close(self):
+        """보관 중인 연결을 모두 닫음 (사용 중인 연결은 반납될 때 닫히지 않고 다시 보관됨)"""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                "size": self.size,
+                "overflow": self.overflow,
+                "open": len(self._created),
+                "idle": len(self._idle),
+                "checked_out": self._checked_out,
+            })
+        return stats
+
+
+db_pool = ConnectionPool()
+
+
+class DBSession:
+    """요청 하나가 빌린 연결과 커서 묶음"""
+
+    __slots__ = ("conn", "cursor")
+
+    def __init__(self, conn: Any):
+        self.conn = conn
+        # buffered: 결과를 다 읽지 않고 다음 쿼리를 실행해도 "Unread result found" 오류가 나지 않도록
+        self.cursor = conn.cursor(dictionary=True, buffered=True)
+
+    def commit(self):
+        self.conn.commit()
+
+    def rollback(self):
+        self.conn.rollback()
+
+
+@contextmanager
+def db_session() -> Iterator[DBSession]:
+    """
+    풀에서 연결을 빌려 DBSession 을 만들고, 블록이 끝나면 반납
+
+    블록 안에서 예외가 나면 롤백하고, 롤백조차 실패하면 연결을 버립니다.
+    """
+    conn = db_pool.checkout()
+    discard = False
+    session = None
+    try:
+        session = DBSession(conn)
+        yield session
+    except BaseException:
+        try:
+            conn.rollback()
+        except Exception:
+            discard = True
+        raise
+    finally:
+        if session is not None:
+            try:
+                session.cursor.close()
+            except Exception:
+                discard = True
+        db_pool.checkin(conn, discard=discard)
+
+
+def get_db() -> Iterator[DBSession]:
+    """FastAPI 의존성: 요청마다 연결 하나를 빌려주고 응답 후 반납"""
+    with db_session() as session:
+        yield session
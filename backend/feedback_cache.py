@@ -0,0 +1,137 @@
+#AI 피드백 캐시 (같은 영양 상태면 OpenAI를 다시 호출하지 않고, 바뀌었으면 이전 피드백을 먼저 보여주고 백그라운드에서 갱신)
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+FEEDBACK_CACHE_MAX_ENTRIES = int(os.getenv("FEEDBACK_CACHE_MAX_ENTRIES", "5000"))
+# 이 시간(초)이 지난 피드백은 그대로 보여주되 백그라운드에서 다시 생성
+FEEDBACK_CACHE_TTL = float(os.getenv("FEEDBACK_CACHE_TTL", str(6 * 3600)))
+
+
+def feedback_key(gender: str, age_group: str, nutrients: List[Dict[str, Any]]) -> str:
+    """(성별, 나이대, 영양소 값) 스냅샷의 해시 - 순서와 미세한 부동소수점 차이는 무시"""
+    vector = sorted((n["name"], round(float(n["value"]), 1), n["unit"]) for n in nutrients)
+    payload = json.dumps([gender, age_group, vector], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AIFeedbackCache:
+    """
+    스냅샷 해시 -> 피드백 텍스트 LRU 캐시 (stale-while-revalidate)
+
+    - 같은 스냅샷의 피드백이 TTL 이내면 바로 반환
+    - TTL이 지났거나 스냅샷이 바뀌었는데 사용자의 같은 날 이전 피드백이 있으면 그것을 바로 반환하고
+      새 스냅샷의 피드백은 백그라운드에서 생성
+    - 처음 보는 사용자와 그날 첫 피드백만 생성이 끝날 때까지 기다림 (어제 식단의 조언을 오늘 보여주지 않도록)
+    같은 스냅샷을 동시에 여러 번 요청해도 생성은 한 번만 실행합니다. 생성에 실패하면 저장하지 않습니다.
+    """
+
+    def __init__(self, max_entries: int = FEEDBACK_CACHE_MAX_ENTRIES, ttl: float = FEEDBACK_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()  # 키 -> (피드백, 생성 시각)
+        # 사용자 -> (마지막으로 생성/반환한 키, 그 피드백의 기준 날짜)
+        self._latest: "OrderedDict[str, Tuple[str, Optional[date]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "errors": 0}
+
+    def _remember_user(self, user_id, key: str, day: Optional[date]):
+        user_key = str(user_id)
+        self._latest[user_key] = (key, day)
+        self._latest.move_to_end(user_key)
+        while len(self._latest) > self.max_entries:
+            self._latest.popitem(last=False)
+
+    def _store(self, key: str, text: str):
+        self._entries[key] = (text, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _start(self, user_id, key: str, day: Optional[date], generate: Callable[[], Awaitable[str]]) -> asyncio.Task:
+        """key 의 피드백 생성을 시작 (이미 진행 중이면 그 작업 반환)"""
+        task = self._inflight.get(key)
+        if task is not None:
+            return task
+
+        async def run() -> str:
+            text = await generate()
+            self._store(key, text)
+            self._remember_user(user_id, key, day)
+            return text
+
+        def done(task: asyncio.Task):
+            self._inflight.pop(key, None)
+            if task.cancelled():
+                return
+            error = task.exception()
+            if error is not None:
+                self._stats["errors"] += 1
+                print(f"AI 피드백 생성 실패: {error!r}")
+
+        task = asyncio.create_task(run())
+        task.add_done_callback(done)
+        self._inflight[key] = task
+        self._stats["refreshes"] += 1
+        return task
+
+    async def get(self, user_id, key: str, generate: Callable[[], Awaitable[str]],
+                  day: Optional[date] = None) -> str:
+        """
+        피드백 조회 (설명은 클래스 docstring 참고)
+
+        Args:
+            user_id: 사용자 ID (이전 피드백을 찾는 데 사용)
+            key: feedback_key 로 만든 스냅샷 키
+            generate: 피드백을 새로 생성하는 코루틴 함수 (실패 시 예외)
+            day: 스냅샷의 기준 날짜 (다른 날짜의 이전 피드백은 대신 보여주지 않음)
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            text, created = entry
+            self._entries.move_to_end(key)
+            self._remember_user(user_id, key, day)
+            if time.monotonic() - created <= self.ttl:
+                self._stats["hits"] += 1
+            else:
+                self._stats["stale_hits"] += 1
+                self._start(user_id, key, day, generate)
+            return text
+
+        task = self._start(user_id, key, day, generate)
+        previous = self._previous(user_id, day)
+        if previous is not None:
+            self._stats["stale_hits"] += 1
+            return previous
+
+        self._stats["misses"] += 1
+        # 요청이 끊겨도 생성은 계속해서 캐시에 남도록 shield
+        return await asyncio.shield(task)
+
+    def _previous(self, user_id, day: Optional[date]) -> Optional[str]:
+        latest = self._latest.get(str(user_id))
+        if latest is None or latest[1] != day:
+            return None
+        entry = self._entries.get(latest[0])
+        return entry[0] if entry is not None else None
+
+    def forget_user(self, user_id):
+        """사용자의 이전 피드백 연결 삭제 (탈퇴 등)"""
+        self._latest.pop(str(user_id), None)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats["entries"] = len(self._entries)
+        stats["inflight"] = len(self._inflight)
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["hits"] + stats["stale_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+feedback_cache = AIFeedbackCache()
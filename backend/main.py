@@ -1,25 +1,41 @@
-from fastapi import FastAPI, UploadFile, File, Form
+from fastapi import FastAPI, UploadFile, File, Query, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from tempfile import NamedTemporaryFile
-from shutil import copyfileobj
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from routers.auth_routes import router as auth_router
 from routers import auth
-from db import conn, cursor  # DB 연결
+from db import PoolTimeoutError, db_pool  # DB 커넥션 풀
+import repository
+from repository import users, daily_nutrients, statistics, GRANULARITIES
+from nutrient_cache import today_cache
+from user_cache import user_cache
+from passwords import password_hasher, PasswordHasherBusyError
+from feedback_cache import feedback_cache, feedback_key
+from chat_sessions import ChatSession, chat_sessions, system_prompts, fit_to_budget, CHAT_HISTORY_TOKEN_BUDGET
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from datetime import date, timedelta, datetime
 import pytz # pytz 임포트
-import bcrypt # bcrypt 임포트 확인
 
 import os
-import easyocr
+import json
+import time
+import hashlib
+import asyncio
+import anyio
 from dotenv import load_dotenv
 from openai import AsyncOpenAI
 
-from ocr.preprocess import preprocess_image
-from ocr.extractor import extract_value , extract_calorie
-from ocr.constants import NUTRIENT_BASES
+from ocr.worker import ocr_pool, run_ocr, run_ocr_cascade, run_ocr_batch, run_profiled, OCRBusyError, OCRTimeoutError, OCR_CASCADE
+from ocr.cache import ocr_cache
+from ocr.cascade import OCR_NUTRIENT_MATCHER, cascade_stats
+from ocr.jobs import ocr_jobs, JobNotCancellableError, FINAL_STATUSES, OCR_JOB_CONCURRENCY
+from ocr.constants import NUTRIENT_BASES, OCR_NUTRIENTS
+from middleware import UploadSizeLimitMiddleware, MetricsMiddleware, ProfilingMiddleware
+from metrics import registry, STAGE_SECONDS, OPENAI_REQUEST_SECONDS, OPENAI_REQUEST_ERRORS, OCR_WORKER_EVENTS
+from profiler import current_profile, profile_store, is_admin_token, PROFILE_HEADER
+from profile_images import profile_images, profile_image_urls, is_version, PROFILE_IMAGE_MAX_BYTES
+from upload_form import read_upload_form, upload_form_openapi, UploadFormError
 
 # .env 파일에서 환경 변수 로드
 load_dotenv()
@@ -31,14 +47,74 @@ app.include_router(auth.router, prefix="/auth")
 # OpenAI 클라이언트 초기화 (API 키는 환경 변수에서 자동으로 읽어옴)
 client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
+# 업로드 이미지 최대 크기 (바이트)
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(15 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# /upload/batch 한 번에 받을 수 있는 최대 이미지 수
+OCR_BATCH_MAX_IMAGES = int(os.getenv("OCR_BATCH_MAX_IMAGES", "8"))
+
+app.add_middleware(UploadSizeLimitMiddleware, max_bytes=MAX_UPLOAD_BYTES, paths=["/upload", "/ocr/jobs"])
+app.add_middleware(UploadSizeLimitMiddleware, max_bytes=MAX_UPLOAD_BYTES * OCR_BATCH_MAX_IMAGES, paths=["/upload/batch"])
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],
     allow_methods=["*"],
     allow_headers=["*"],
 )
-
-reader = easyocr.Reader(['ko', 'en'], gpu=False)
+# 관리자 헤더 또는 샘플링 비율로 고른 요청만 프로파일링 (profiler 참고)
+app.add_middleware(ProfilingMiddleware)
+# 가장 바깥 미들웨어로 두어 업로드 크기 제한으로 거절된 요청까지 포함해 기록
+app.add_middleware(MetricsMiddleware, routes=app.routes)
+
+@app.on_event("startup")
+async def start_ocr_pool():
+    # 모델 로드와 워밍업은 백그라운드에서 진행 (인증/통계 API는 바로 응답 가능)
+    ocr_pool.start()
+    app.state.ocr_warmup = asyncio.create_task(ocr_pool.warm_up())
+    # 비동기 OCR 작업: 저장된 작업을 다시 대기열에 올리고, 워커가 보내는 진행 단계를 작업 상태에 반영
+    ocr_pool.on_progress(ocr_jobs.report)
+    ocr_pool.on_timing(lambda stage, seconds: STAGE_SECONDS.labels(stage).observe(seconds))
+    ocr_pool.on_count(lambda event, amount: OCR_WORKER_EVENTS.labels(event).inc(amount))
+    await ocr_jobs.start(run_ocr_job, OCR_JOB_CONCURRENCY or ocr_pool.size)
+
+@app.on_event("shutdown")
+async def stop_ocr_pool():
+    await ocr_jobs.stop()
+    ocr_pool.shutdown()
+
+@app.on_event("shutdown")
+def close_db_pool():
+    repository.shutdown()
+    db_pool.close()
+
+@app.on_event("shutdown")
+def stop_password_hasher():
+    password_hasher.shutdown()
+
+@app.exception_handler(PoolTimeoutError)
+async def db_pool_timeout_handler(request, exc):
+    # 모든 DB 연결이 사용 중이고 제한 시간 안에 반납되지 않음
+    return JSONResponse(status_code=503, content={"error": "요청이 많습니다. 잠시 후 다시 시도해주세요."})
+
+@app.exception_handler(PasswordHasherBusyError)
+async def password_hasher_busy_handler(request, exc):
+    # 로그인/회원가입/비밀번호 변경이 몰려 bcrypt 대기열이 가득 참
+    return JSONResponse(status_code=503, content={"error": "요청이 많습니다. 잠시 후 다시 시도해주세요."})
+
+@app.get("/healthz")
+async def healthz():
+    # 프로세스 생존 확인
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    # OCR 모델 워밍업이 끝나야 업로드 트래픽을 받을 준비가 된 것으로 판단 (재시도까지 모두 실패하면 failed)
+    if not ocr_pool.ready:
+        content = {"status": ocr_pool.status}
+        if ocr_pool.warmup_error is not None:
+            content["error"] = ocr_pool.warmup_error
+        return JSONResponse(status_code=503, content=content)
+    return {"status": "ready"}
 
 # 한국 시간대 객체 생성
 KST = pytz.timezone('Asia/Seoul')
@@ -50,15 +126,47 @@ def get_today_kst():
 class AskRequest(BaseModel):
     user_id: int
     question: str
-    history: List[Dict[str, str]]
+    # 서버에 보관된 대화를 이어갈 세션 ID (없거나 만료되었으면 새 세션을 만들어 응답에 담아줌)
+    session_id: Optional[str] = None
+    # 이전 방식 호환: 세션 없이 대화 기록 전체를 보내는 클라이언트 (토큰 예산만큼 최근 것만 사용)
+    history: Optional[List[Dict[str, Any]]] = None
+
+async def timed_openai_call(call: str, request):
+    """OpenAI 요청(코루틴)을 기다리면서 호출 종류별 소요 시간/실패 횟수 기록"""
+    started = time.perf_counter()
+    try:
+        return await request
+    except Exception:
+        OPENAI_REQUEST_ERRORS.labels(call).inc()
+        raise
+    finally:
+        OPENAI_REQUEST_SECONDS.labels(call).observe(time.perf_counter() - started)
+
+async def get_ai_feedback(user_id, nutrients: list, gender: str, age_group: str) -> str:
+    """
+    영양 상태에 맞는 AI 피드백 반환
 
-async def generate_ai_feedback(nutrients: list, gender: str, age_group: str) -> str:
+    같은 (성별, 나이대, 영양소 값)에 대한 피드백은 캐시에서 바로 반환하고, 값이 바뀌었으면
+    오늘 받은 이전 피드백을 먼저 반환하면서 새 피드백은 백그라운드에서 생성합니다. (feedback_cache 참고)
+    """
     if not client.api_key:
         return "OpenAI API 키가 설정되지 않았습니다."
 
     if not nutrients:
         return "분석된 데이터가 없습니다. 첫 식사를 기록하고 맞춤 피드백을 받아보세요!"
 
+    key = feedback_key(gender, age_group, nutrients)
+    try:
+        with STAGE_SECONDS.labels("ai.feedback").time():
+            return await feedback_cache.get(user_id, key, lambda: generate_ai_feedback(nutrients, gender, age_group),
+                                            day=get_today_kst())
+    except Exception as e:
+        print(f"Error calling OpenAI API: {e}")
+        return "AI 피드백을 생성하는 중 오류가 발생했습니다."
+
+
+async def generate_ai_feedback(nutrients: list, gender: str, age_group: str) -> str:
+    """OpenAI로 피드백 생성 (실패 시 예외)"""
     # 영양소 데이터를 문자열로 변환
     nutrient_summary = "\n".join(
         [f"- {n['name']}: {n['value']}{n['unit']} ({n['percentage']}% of daily value)" for n in nutrients]
@@ -79,54 +187,26 @@ async def generate_ai_feedback(nutrients: list, gender: str, age_group: str) ->
     전체적으로 전문가적이면서도 이해하기 쉬운 말투를 사용해주세요.
     """
 
-    try:
-        completion = await client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a helpful nutrition assistant providing advice in Korean."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-        )
-        return completion.choices[0].message.content.strip()
-    except Exception as e:
-        print(f"Error calling OpenAI API: {e}")
-        return "AI 피드백을 생성하는 중 오류가 발생했습니다."
+    completion = await timed_openai_call("feedback", client.chat.completions.create(
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": "You are a helpful nutrition assistant providing advice in Korean."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.7,
+    ))
+    return completion.choices[0].message.content.strip()
 
 
 #  하루 누적 저장 함수
-def save_nutrients(user_id: int, nutrients: list):
+async def save_nutrients(user_id: int, nutrients: list):
     today = get_today_kst() # 한국 시간 기준 오늘 날짜 사용
-    for nutrient in nutrients:
-        name = nutrient["name"]
-        value = float(nutrient["value"])
-        unit = nutrient["unit"]
-
-        cursor.execute("""
-            SELECT id, value FROM daily_nutrients
-            WHERE user_id = %s AND nutrient_name = %s AND date = %s
-        """, (user_id, name, today))
-        existing = cursor.fetchone()
-
-        if existing:
-            new_total = existing["value"] + value
-            cursor.execute("UPDATE daily_nutrients SET value = %s WHERE id = %s", (new_total, existing["id"]))
-        else:
-            cursor.execute("""
-                INSERT INTO daily_nutrients (user_id, nutrient_name, value, unit, date)
-                VALUES (%s, %s, %s, %s, %s)
-            """, (user_id, name, value, unit, today))
-    conn.commit()
+    await daily_nutrients.add(user_id, nutrients, today)
 
 
-def get_today_nutrients(user_id: int, gender: str):
+async def get_today_nutrients(user_id: int, gender: str):
     today = get_today_kst() # 한국 시간 기준 오늘 날짜 사용
-    cursor.execute("""
-        SELECT nutrient_name, value, unit
-        FROM daily_nutrients
-        WHERE user_id = %s AND date = %s
-    """, (user_id, today))
-    rows = cursor.fetchall()
+    rows = await daily_nutrients.get(user_id, today)
 
     base = NUTRIENT_BASES[gender]
     name_to_key = {
@@ -158,9 +238,7 @@ def get_today_nutrients(user_id: int, gender: str):
 
 @app.get("/user-status/{user_id}")
 async def get_user_status(user_id: int):
-    # profile_image 컬럼도 함께 조회합니다.
-    cursor.execute("SELECT username, gender, age_group, activity_level, health_goal, profile_image FROM users WHERE id = %s", (user_id,))
-    user = cursor.fetchone()
+    user = await users.get(user_id)
     if not user:
         return JSONResponse(status_code=404, content={"error": "사용자를 찾을 수 없습니다."})
 
@@ -170,19 +248,18 @@ async def get_user_status(user_id: int):
     gender = "남성" if gender_db.lower() == "male" else "여성"
 
     # 누적된 하루치 불러오기
-    today_nutrients = get_today_nutrients(user_id=user_id, gender=gender)
+    today_nutrients = await get_today_nutrients(user_id=user_id, gender=gender)
 
     # AI 피드백 생성
-    ai_feedback = await generate_ai_feedback(today_nutrients, gender, ageGroup)
+    ai_feedback = await get_ai_feedback(user_id, today_nutrients, gender, ageGroup)
 
-    # 응답 데이터에 profile_image 추가
     response = {
         "username": username,
         "gender": gender,
         "ageGroup": ageGroup,
         "activity_level": user["activity_level"],
         "health_goal": user["health_goal"],
-        "profile_image": user["profile_image"], # 이미지 데이터 전달
+        "profile_image": profile_image_urls(user_id, user["profile_image"]), # 크기별 이미지 경로 (없으면 null)
         "nutrients": today_nutrients,
         "ai_feedback": ai_feedback
     }
@@ -213,68 +290,381 @@ class AddNutrientsRequest(BaseModel):
     nutrients: List[Dict[str, Any]]
     date: Optional[str] = None
 
-@app.post("/upload")
-async def upload_image(
-    image: UploadFile = File(...),
-    user_id: str = Form(...)
-):
-    # 사용자 정보 조회 (성별만 필요)
-    cursor.execute("SELECT gender FROM users WHERE id = %s", (user_id,))
-    user = cursor.fetchone()
-    if not user:
-        return JSONResponse(status_code=404, content={"error": "사용자를 찾을 수 없습니다."})
-    gender = "남성" if user["gender"].lower() == "male" else "여성"
-    
-    #  이미지 저장 및 전처리
-    suffix = os.path.splitext(image.filename)[1]
-    with NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        copyfileobj(image.file, tmp)
-        tmp_path = tmp.name
-
-    processed_img = preprocess_image(tmp_path)
-    if processed_img is None:
-        return JSONResponse(status_code=400, content={"error": "이미지 불러오기 실패"})
-
-    result = reader.readtext(processed_img, detail=0)
-    print("추출된 텍스트:", result)
-
-    #  OCR 기반 영양소 추출
-    base = NUTRIENT_BASES[gender]
-    nutrient_info = {
-        "열량": ("kcal", extract_value(result, ["열량", "kcal", "칼로리"]), base["energy"]),
-        "단백질": ("g", extract_value(result, ["단백질", "protein"]), base["protein"]),
-        "나트륨": ("mg", extract_value(result, ["나트륨", "나트롬","나트룹","염분"]), base["sodium"]),
-        "당류": ("g", extract_value(result, ["당류","당료", "sugar"]), base["sugar"]),
-        "지방": ("g", extract_value(result, ["지방", "fat"]), base["fat"]),
-        "포화지방": ("g", extract_value(result, ["포화지방", "satfat", "saturated"]), base["sat_fat"]),
-    }
-
-    # OCR로 분석된 값만 반환 (DB 저장 X)
+async def read_upload(image: UploadFile, max_bytes: int = MAX_UPLOAD_BYTES) -> Optional[bytes]:
+    """업로드 파일을 메모리로 읽고 닫음 (max_bytes 초과 시 None)"""
+    data = bytearray()
+    try:
+        while True:
+            chunk = await image.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            data.extend(chunk)
+            if len(data) > max_bytes:
+                return None
+    finally:
+        await image.close()
+    return bytes(data)
+
+def extract_ocr_nutrients(lines: List[str]) -> List[Dict[str, Any]]:
+    """OCR 텍스트 라인들에서 화면에 보여줄 영양소 값 추출"""
+    return format_ocr_nutrients(OCR_NUTRIENT_MATCHER.match(lines))
+
+def format_ocr_nutrients(values: Dict[str, float]) -> List[Dict[str, Any]]:
+    """영양소 값을 화면에 보여줄 목록 형식으로 변환"""
+    # OCR로 분석된 값만 반환 (DB 저장 X), 찾지 못한 영양소는 0
     ocr_nutrients = []
-    for name, (unit, val, base_val) in nutrient_info.items():
+    for name, (unit, _) in OCR_NUTRIENTS.items():
         ocr_nutrients.append({
             "name": name,
-            "value": float(val),
+            "value": float(values.get(name, 0.0)),
             "unit": unit
         })
-        
-    os.remove(tmp_path)
+    return ocr_nutrients
+
+async def run_in_ocr_pool(fn, *args, timeout: Optional[float] = None):
+    """OCR 풀에서 fn(*args) 실행 (프로파일링 중인 요청이면 워커 프로세스의 스택도 함께 수집)"""
+    profile = current_profile.get()
+    if profile is None:
+        return await ocr_pool.run(fn, *args, timeout=timeout)
+    result, stacks = await ocr_pool.run(run_profiled, fn, profile.interval, *args, timeout=timeout)
+    profile.add_stacks("ocr-worker", stacks)
+    return result
+
+async def recognize_nutrients(image_bytes: bytes, job_id: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    OCR 프로세스 풀에서 이미지를 분석해 화면에 보여줄 영양소 목록 반환
+
+    Args:
+        image_bytes: 인코딩된 이미지 바이트
+        job_id: 비동기 OCR 작업 ID (주면 단계별 진행 상황을 ocr_jobs 에 기록)
+
+    Returns:
+        영양소 목록 또는 None (이미지 불러오기 실패) - 풀이 가득 차면 OCRBusyError, 시간 초과 시 OCRTimeoutError
+    """
+    # ocr.pool: 풀 대기 + 워커 실행 전체 (워커 안의 세부 단계는 ocr_pool.on_timing 으로 따로 기록)
+    with STAGE_SECONDS.labels("ocr.pool").time():
+        if OCR_CASCADE:
+            result = await run_in_ocr_pool(run_ocr_cascade, image_bytes, job_id)
+        else:
+            result = await run_in_ocr_pool(run_ocr, image_bytes, "adaptive", job_id)
+    if result is None:
+        return None
+
+    #  OCR 기반 영양소 추출
+    if job_id is not None:
+        ocr_jobs.report(job_id, "extract")
+    with STAGE_SECONDS.labels("ocr.extract").time():
+        if OCR_CASCADE:
+            cascade_stats.record(result["tier"], result["table_retries"])
+            return format_ocr_nutrients(result["values"])
+        return extract_ocr_nutrients(result)
+
+
+async def lookup_ocr_cache(image_bytes: bytes):
+    """OCR 결과 캐시 조회 (이미지 해시 계산 포함, 스레드 풀에서 실행) -> (캐시 키, 결과 또는 None)"""
+    with STAGE_SECONDS.labels("ocr.cache_lookup").time():
+        return await run_in_threadpool(ocr_cache.lookup, image_bytes)
+
+
+async def run_ocr_job(job_id: str, image_bytes: bytes) -> Optional[List[Dict[str, Any]]]:
+    """ocr_jobs 작업자가 실행하는 OCR 작업 (결과는 /upload 와 같은 캐시에 저장)"""
+    cache_key, cached = await lookup_ocr_cache(image_bytes)
+    if cached is not None:
+        return cached
+    ocr_nutrients = await recognize_nutrients(image_bytes, job_id)
+    if ocr_nutrients is not None:
+        await run_in_threadpool(ocr_cache.store, cache_key, ocr_nutrients)
+    return ocr_nutrients
+
+
+@app.post("/upload", openapi_extra=upload_form_openapi())
+async def upload_image(request: Request):
+    # 업로드 파일은 디스크 임시 파일 없이 메모리에서 파싱 (upload_form.py 참고)
+    try:
+        user_id, (image,) = await read_upload_form(request, MAX_UPLOAD_BYTES)
+    except UploadFormError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+
+    # 사용자 확인
+    if not await users.exists(user_id):
+        return JSONResponse(status_code=404, content={"error": "사용자를 찾을 수 없습니다."})
+    
+    #  이미지는 디스크에 저장하지 않고 메모리에서 바로 디코딩
+    image_bytes = await read_upload(image)
+    if image_bytes is None:
+        return JSONResponse(status_code=413, content={"error": "업로드 파일이 너무 큽니다."})
+
+    # 같은 사진을 이미 분석했다면 캐시된 결과 반환 (OCR_CACHE_MAX_DISTANCE 를 켜면 거의 같은 사진도)
+    cache_key, cached = await lookup_ocr_cache(image_bytes)
+    if cached is not None:
+        return JSONResponse(content={"ocr_nutrients": cached})
+
+    # 전처리 + OCR은 전용 프로세스 풀에서 실행 (이벤트 루프 차단 방지)
+    try:
+        ocr_nutrients = await recognize_nutrients(image_bytes)
+    except OCRBusyError:
+        return JSONResponse(status_code=503, content={"error": "OCR 요청이 많습니다. 잠시 후 다시 시도해주세요."})
+    except OCRTimeoutError:
+        return JSONResponse(status_code=504, content={"error": "OCR 처리 시간이 초과되었습니다."})
+    if ocr_nutrients is None:
+        return JSONResponse(status_code=400, content={"error": "이미지 불러오기 실패"})
+
+    await run_in_threadpool(ocr_cache.store, cache_key, ocr_nutrients)
+
     # DB 저장 없이 OCR 결과만 반환
     return JSONResponse(content={"ocr_nutrients": ocr_nutrients})
 
 
+@app.post("/upload/batch", openapi_extra=upload_form_openapi("images", multiple=True))
+async def upload_images_batch(request: Request):
+    try:
+        user_id, images = await read_upload_form(request, MAX_UPLOAD_BYTES, "images", multiple=True)
+    except UploadFormError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+
+    # 사용자 확인
+    if not await users.exists(user_id):
+        return JSONResponse(status_code=404, content={"error": "사용자를 찾을 수 없습니다."})
+
+    if len(images) > OCR_BATCH_MAX_IMAGES:
+        return JSONResponse(status_code=400, content={"error": f"한 번에 최대 {OCR_BATCH_MAX_IMAGES}장까지 업로드할 수 있습니다."})
+
+    results: List[Dict[str, Any]] = []
+    pending = []  # (결과 위치, 캐시 키, 이미지 바이트)
+    for image in images:
+        item = {"filename": image.filename}
+        results.append(item)
+
+        image_bytes = await read_upload(image)
+        if image_bytes is None:
+            item["error"] = "업로드 파일이 너무 큽니다."
+            continue
+
+        cache_key, cached = await lookup_ocr_cache(image_bytes)
+        if cached is not None:
+            item["ocr_nutrients"] = cached
+        else:
+            pending.append((item, cache_key, image_bytes))
+
+    if pending:
+        # 캐시에 없는 이미지만 한 번의 배치 작업으로 OCR
+        try:
+            with STAGE_SECONDS.labels("ocr.pool_batch").time():
+                texts = await run_in_ocr_pool(run_ocr_batch, [image_bytes for _, _, image_bytes in pending],
+                                              timeout=ocr_pool.timeout * len(pending))
+        except OCRBusyError:
+            return JSONResponse(status_code=503, content={"error": "OCR 요청이 많습니다. 잠시 후 다시 시도해주세요."})
+        except OCRTimeoutError:
+            return JSONResponse(status_code=504, content={"error": "OCR 처리 시간이 초과되었습니다."})
+
+        for (item, cache_key, _), lines in zip(pending, texts):
+            if lines is None:
+                item["error"] = "이미지 불러오기 실패"
+                continue
+            item["ocr_nutrients"] = extract_ocr_nutrients(lines)
+            await run_in_threadpool(ocr_cache.store, cache_key, item["ocr_nutrients"])
+
+    return JSONResponse(content={"results": results})
+
+
+@app.post("/ocr/jobs", status_code=202, openapi_extra=upload_form_openapi())
+async def create_ocr_job(request: Request):
+    # 업로드만 받고 작업 ID를 바로 반환, 진행 상황은 GET /ocr/jobs/{id} 또는 WebSocket 으로 확인
+    try:
+        user_id, (image,) = await read_upload_form(request, MAX_UPLOAD_BYTES)
+    except UploadFormError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+
+    if not await users.exists(user_id):
+        return JSONResponse(status_code=404, content={"error": "사용자를 찾을 수 없습니다."})
+
+    image_bytes = await read_upload(image)
+    if image_bytes is None:
+        return JSONResponse(status_code=413, content={"error": "업로드 파일이 너무 큽니다."})
+
+    # 이미 분석한 사진이면 바로 끝난 작업으로 등록
+    _, cached = await lookup_ocr_cache(image_bytes)
+    try:
+        job = await ocr_jobs.submit(user_id, image_bytes, result=cached)
+    except OCRBusyError:
+        return JSONResponse(status_code=503, content={"error": "OCR 요청이 많습니다. 잠시 후 다시 시도해주세요."})
+    return JSONResponse(status_code=202, content=job.to_dict())
+
+
+@app.get("/ocr/jobs/stats")
+async def get_ocr_job_stats():
+    # 상태별 OCR 작업 수와 취소(클라이언트 이탈)/실패 횟수
+    return ocr_jobs.stats()
+
+
+@app.get("/ocr/jobs/{job_id}")
+async def get_ocr_job(job_id: str):
+    # 작업 상태 조회 (주기적으로 조회하는 동안에는 대기 중인 작업이 취소되지 않음)
+    job = await ocr_jobs.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": "작업을 찾을 수 없습니다."})
+    return job
+
+
+@app.delete("/ocr/jobs/{job_id}")
+async def cancel_ocr_job(job_id: str):
+    # 대기 중인 작업만 취소 가능 (실행 중인 OCR은 중간에 멈출 수 없음)
+    try:
+        cancelled = await ocr_jobs.cancel(job_id)
+    except JobNotCancellableError:
+        return JSONResponse(status_code=409, content={"error": "이미 실행 중이거나 끝난 작업입니다."})
+    if not cancelled:
+        return JSONResponse(status_code=404, content={"error": "작업을 찾을 수 없습니다."})
+    return {"message": "작업이 취소되었습니다."}
+
+
+@app.websocket("/ocr/jobs/{job_id}/ws")
+async def watch_ocr_job(websocket: WebSocket, job_id: str):
+    """
+    작업 상태가 바뀔 때마다 JSON 으로 전송하고, 작업이 끝나면 연결을 닫음
+
+    연결이 끊기면 구독을 해제하며, 대기 중인 작업은 OCR_JOB_ABANDON_AFTER 동안 다시 연결/조회가 없으면 취소됩니다.
+    """
+    await websocket.accept()
+    listener = ocr_jobs.subscribe(job_id)
+    if listener is None:
+        # 메모리에 없는 작업 (재시작 전에 끝났거나 없는 작업)
+        job = await ocr_jobs.get(job_id)
+        await websocket.send_json(job or {"job_id": job_id, "error": "작업을 찾을 수 없습니다."})
+        await websocket.close()
+        return
+
+    async def send_events():
+        while True:
+            event = await listener.get()
+            await websocket.send_json(event)
+            if event["status"] in FINAL_STATUSES:
+                return
+
+    async def wait_disconnect():
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    sender = asyncio.create_task(send_events())
+    receiver = asyncio.create_task(wait_disconnect())
+    try:
+        done, _ = await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        if sender in done and sender.exception() is None:
+            await websocket.close()
+    finally:
+        sender.cancel()
+        receiver.cancel()
+        ocr_jobs.unsubscribe(job_id, listener)
+
+
+@app.get("/ocr/cache/stats")
+async def get_ocr_cache_stats():
+    # OCR 결과 캐시 적중/실패 통계
+    return ocr_cache.stats()
+
+
+@app.get("/db/pool/stats")
+async def get_db_pool_stats():
+    # DB 커넥션 풀 사용 현황 (열린 연결, 대기/타임아웃 횟수 등)
+    return db_pool.stats()
+
+
+@app.get("/nutrients/cache/stats")
+async def get_today_cache_stats():
+    # 오늘 누적 영양소 캐시 적중률
+    return today_cache.stats()
+
+
+@app.get("/ai/feedback/cache/stats")
+async def get_feedback_cache_stats():
+    # AI 피드백 캐시 적중률과 진행 중인 생성 작업 수
+    return feedback_cache.stats()
+
+
+@app.get("/ask-ai/sessions/stats")
+async def get_chat_session_stats():
+    # 보관 중인 채팅 세션 수와 압축(요약) 횟수
+    return chat_sessions.stats()
+
+
+@app.get("/users/cache/stats")
+async def get_user_cache_stats():
+    # 사용자 프로필 캐시 적중률과 bcrypt 스레드 풀 사용 현황
+    return {"profiles": user_cache.stats(), "password_hasher": password_hasher.stats()}
+
+
+@app.get("/ocr/cascade/stats")
+async def get_ocr_cascade_stats():
+    # OCR 캐스케이드 단계별 종료 횟수/비율
+    return cascade_stats.stats()
+
+
+def collect_component_metrics():
+    """/metrics 조회 시점의 OCR 풀 / DB 커넥션 풀 / OCR 작업 현황"""
+    yield "ocr_pool_pending", "gauge", "OCR 풀에서 실행/대기 중인 작업 수", {}, ocr_pool.pending
+    yield "ocr_pool_capacity", "gauge", "OCR 풀이 받을 수 있는 최대 작업 수", {}, ocr_pool.capacity
+    pool = db_pool.stats()
+    for state in ("open", "idle", "checked_out"):
+        yield "db_pool_connections", "gauge", "DB 커넥션 풀 연결 수", {"state": state}, pool[state]
+    for event in ("waits", "timeouts"):
+        yield f"db_pool_{event}_total", "counter", f"DB 커넥션 풀 {event} 횟수", {}, pool[event]
+    for status, count in ocr_jobs.stats()["jobs"].items():
+        yield "ocr_jobs", "gauge", "상태별 OCR 작업 수 (메모리에 있는 작업)", {"status": status}, count
+
+registry.add_collector(collect_component_metrics)
+
+
+@app.get("/metrics")
+async def get_metrics():
+    # Prometheus 수집용 (분위수는 histogram_quantile 로 버킷에서 계산)
+    return Response(content=registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/metrics/summary")
+async def get_metrics_summary():
+    # 단계/엔드포인트별 횟수, 평균, p50/p95/p99 (ms) - 사람이 바로 보기 위한 요약
+    return registry.summary()
+
+
+@app.get("/profiles/stats")
+async def get_profile_stats(request: Request):
+    # 저장/버린/밀려난 프로파일 수와 현재 설정 (관리자 헤더 필요)
+    if not is_admin_token(request.headers.get(PROFILE_HEADER)):
+        return JSONResponse(status_code=403, content={"error": "권한이 없습니다."})
+    return await run_in_threadpool(profile_store.stats)
+
+
+@app.get("/profiles")
+async def list_profiles(request: Request):
+    # 최근 프로파일 목록 (관리자 헤더 필요)
+    if not is_admin_token(request.headers.get(PROFILE_HEADER)):
+        return JSONResponse(status_code=403, content={"error": "권한이 없습니다."})
+    return {"profiles": await run_in_threadpool(profile_store.list)}
+
+
+@app.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, request: Request):
+    # collapsed stacks 텍스트 (flamegraph.pl / speedscope 입력으로 그대로 사용)
+    if not is_admin_token(request.headers.get(PROFILE_HEADER)):
+        return JSONResponse(status_code=403, content={"error": "권한이 없습니다."})
+    collapsed = await run_in_threadpool(profile_store.read, profile_id)
+    if collapsed is None:
+        return JSONResponse(status_code=404, content={"error": "프로파일을 찾을 수 없습니다."})
+    return Response(content=collapsed, media_type="text/plain; charset=utf-8")
+
+
 @app.post("/add-nutrients")
 async def add_nutrients(request: AddNutrientsRequest):
     # 사용자가 수정한 최종 데이터를 DB에 저장
-    save_nutrients(user_id=request.user_id, nutrients=request.nutrients)
+    await save_nutrients(user_id=request.user_id, nutrients=request.nutrients)
     
     # 사용자 정보 및 업데이트된 누적 데이터 조회 후 반환
-    cursor.execute("SELECT username, gender, age_group, activity_level, health_goal, profile_image FROM users WHERE id = %s", (request.user_id,))
-    user = cursor.fetchone()
+    user = await users.get(request.user_id)
     gender = "남성" if user["gender"].lower() == "male" else "여성"
     
-    today_nutrients = get_today_nutrients(user_id=request.user_id, gender=gender)
-    ai_feedback = await generate_ai_feedback(today_nutrients, user['gender'], user['age_group'])
+    today_nutrients = await get_today_nutrients(user_id=request.user_id, gender=gender)
+    # 영양 상태가 바뀌었으므로 새 피드백은 백그라운드에서 생성 (이전 피드백이 있으면 먼저 반환)
+    ai_feedback = await get_ai_feedback(request.user_id, today_nutrients, gender, user['age_group'])
 
     # latestNutrients에 각 영양소별 percentage(이번 음식 기준)를 추가
     name_to_key = {
@@ -305,46 +695,86 @@ async def add_nutrients(request: AddNutrientsRequest):
     return JSONResponse(content=response)
 
 
-@app.get("/statistics/{user_id}")
-async def get_statistics(user_id: int):
-    # 최근 90일간의 데이터 조회
-    today_kst = get_today_kst() # 한국 시간 기준 오늘 날짜 사용
-    ninety_days_ago = today_kst - timedelta(days=90)
-    
-    cursor.execute("""
-        SELECT date, nutrient_name, value, unit
-        FROM daily_nutrients
-        WHERE user_id = %s AND date >= %s
-        ORDER BY date DESC
-    """, (user_id, ninety_days_ago))
-    
-    rows = cursor.fetchall()
+# 통계 조회 최대 기간 (일)
+STATISTICS_MAX_DAYS = int(os.getenv("STATISTICS_MAX_DAYS", str(3 * 366)))
+
 
-    # 날짜별로 데이터 그룹화
-    stats_data = {}
+def statistics_payload(rows: List[Dict[str, Any]], granularity: str, start: date, end: date) -> Dict[str, Any]:
+    """
+    기간별 행을 열 단위 응답으로 변환
+
+    dates 에는 기록이 있는 기간의 시작일만 담고, 영양소별 values 는 dates 와 같은 순서입니다.
+    (그 기간에 해당 영양소 기록이 없으면 null)
+    """
+    dates: List[str] = []
+    index: Dict[str, int] = {}
+    nutrients: Dict[str, Dict[str, Any]] = {}
     for r in rows:
-        day = r["date"].isoformat() # 'YYYY-MM-DD' 형식의 문자열로 변환
-        if day not in stats_data:
-            stats_data[day] = []
-        
-        stats_data[day].append({
-            "name": r["nutrient_name"],
-            "value": float(r["value"]),
-            "unit": r["unit"]
-        })
-        
-    return JSONResponse(content=stats_data)
+        period = r["period"].isoformat()
+        if period not in index:
+            index[period] = len(dates)
+            dates.append(period)
+        column = nutrients.setdefault(r["nutrient_name"], {"unit": r["unit"], "values": {}})
+        column["values"][index[period]] = float(r["value"])
+    for column in nutrients.values():
+        values = column["values"]
+        column["values"] = [values.get(i) for i in range(len(dates))]
+    return {
+        "granularity": granularity,
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "dates": dates,
+        "nutrients": nutrients,
+    }
 
-@app.post("/ask-ai")
-async def ask_ai(request: AskRequest):
+
+@app.get("/statistics/{user_id}")
+async def get_statistics(
+    user_id: int,
+    http_request: Request,
+    start: Optional[date] = Query(None, alias="from"),
+    end: Optional[date] = Query(None, alias="to"),
+    granularity: str = "day",
+):
+    """
+    기간별 영양소 통계 (기본: 오늘까지 최근 90일, 일별)
+
+    주/월 단위는 저장할 때 미리 합산해 둔 롤업을 읽습니다. 같은 결과면 ETag 가 같으므로
+    If-None-Match 가 일치하면 본문 없이 304 를 반환합니다.
+    """
+    if granularity not in GRANULARITIES:
+        return JSONResponse(status_code=400, content={"error": f"granularity 는 {', '.join(GRANULARITIES)} 중 하나여야 합니다."})
+    end = end or get_today_kst()
+    start = start or end - timedelta(days=90)
+    if start > end:
+        return JSONResponse(status_code=400, content={"error": "from 은 to 보다 이후일 수 없습니다."})
+    if (end - start).days > STATISTICS_MAX_DAYS:
+        return JSONResponse(status_code=400, content={"error": f"조회 기간은 최대 {STATISTICS_MAX_DAYS}일입니다."})
+
+    rows = await statistics.range(user_id, granularity, start, end)
+    body = json.dumps(statistics_payload(rows, granularity, start, end), ensure_ascii=False).encode("utf-8")
+    etag = f'W/"{hashlib.sha1(body).hexdigest()}"'
+    # 브라우저가 매번 서버에 확인하되, 바뀌지 않았으면 캐시된 본문을 쓰도록
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if_none_match = http_request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+async def build_ask_messages(request: AskRequest) -> Optional[Tuple[List[Dict[str, str]], Optional[ChatSession]]]:
+    """
+    /ask-ai 에 보낼 OpenAI 메시지 목록 (시스템 프롬프트 + 이전 대화 + 새 질문)과 채팅 세션
+
+    history 만 보내는 이전 방식 요청이면 세션은 None, 사용자가 없으면 None 반환
+    """
     # 사용자 정보 및 누적 영양 데이터 조회 (health_goal 추가)
-    cursor.execute("SELECT gender, age_group, health_goal FROM users WHERE id = %s", (request.user_id,))
-    user = cursor.fetchone()
+    user = await users.get(request.user_id, ("gender", "age_group", "health_goal"))
     if not user:
-        return JSONResponse(status_code=404, content={"error": "사용자를 찾을 수 없습니다."})
+        return None
     
     gender = "남성" if user["gender"].lower() == "male" else "여성"
-    today_nutrients = get_today_nutrients(user_id=request.user_id, gender=gender)
+    today_nutrients = await get_today_nutrients(user_id=request.user_id, gender=gender)
     
     if today_nutrients:
         nutrient_summary = "\n".join(
@@ -353,8 +783,30 @@ async def ask_ai(request: AskRequest):
     else:
         nutrient_summary = "아직 기록된 섭취량이 없습니다."
 
+    # 사용자 정보와 오늘 섭취량이 그대로면 이전에 만든 프롬프트 재사용
+    fingerprint = json.dumps([gender, user["age_group"], user["health_goal"],
+                              [(n["name"], n["value"]) for n in today_nutrients]], ensure_ascii=False)
+    system_prompt = system_prompts.get(request.user_id, fingerprint,
+                                       lambda: build_system_prompt(gender, user, nutrient_summary))
+
+    # 이전 대화 내용 + 새 질문
+    if request.history is not None and request.session_id is None:
+        session = None
+        history = [{"role": m["role"], "content": m["content"]} for m in request.history
+                   if m.get("role") in ("user", "assistant") and isinstance(m.get("content"), str)]
+        history = fit_to_budget(history, CHAT_HISTORY_TOKEN_BUDGET)
+    else:
+        session = chat_sessions.get_or_create(request.user_id, request.session_id)
+        history = session.context()
+
+    messages = [{"role": "system", "content": system_prompt}]
+    messages.extend(history)
+    messages.append({"role": "user", "content": request.question})
+    return messages, session
+
+def build_system_prompt(gender: str, user: Dict[str, Any], nutrient_summary: str) -> str:
     # 훨씬 더 구체적이고 역할을 명확히 하는 프롬프트
-    system_prompt = f"""
+    return f"""
 ### 역할 및 목표
 당신은 'AI 영양 코치'입니다. 사용자가 건강한 식습관을 형성하도록 돕는 것이 당신의 목표입니다. 항상 친절하고, 긍정적이며, 과학적 근거에 기반하여 조언해주세요.
 
@@ -373,24 +825,117 @@ async def ask_ai(request: AskRequest):
 
 이제 위의 정보를 바탕으로 사용자의 다음 질문에 답변해주세요.
 """
-    
-    # 이전 대화 내용 + 새 질문
-    messages = [{"role": "system", "content": system_prompt}]
-    messages.extend(request.history)
-    messages.append({"role": "user", "content": request.question})
+
+async def summarize_chat(summary: str, messages: List[Dict[str, str]]) -> str:
+    """기존 요약에 오래된 대화를 합쳐 새 요약 생성 (채팅 세션 압축용, 실패 시 예외)"""
+    conversation = "\n".join(f"{'사용자' if m['role'] == 'user' else 'AI 코치'}: {m['content']}" for m in messages)
+    prompt = f"""
+    다음은 사용자와 AI 영양 코치의 이전 대화 요약과 그 이후 대화입니다.
+    이후 대화에서 이어서 답변할 때 필요한 정보(사용자의 상황, 질문, 받은 조언)를 남겨 5문장 이내의 한국어 요약으로 합쳐주세요.
+
+    [이전 요약]
+    {summary or "없음"}
+
+    [이후 대화]
+    {conversation}
+    """
+    completion = await timed_openai_call("summarize", client.chat.completions.create(
+        model="gpt-3.5-turbo",
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0.3,
+    ))
+    return completion.choices[0].message.content.strip()
+
+@app.post("/ask-ai")
+async def ask_ai(request: AskRequest):
+    built = await build_ask_messages(request)
+    if built is None:
+        return JSONResponse(status_code=404, content={"error": "사용자를 찾을 수 없습니다."})
+    messages, session = built
 
     try:
-        completion = await client.chat.completions.create(
+        completion = await timed_openai_call("ask", client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=messages,
             temperature=0.7,
-        )
+        ))
         answer = completion.choices[0].message.content.strip()
-        return {"answer": answer}
+        if session is None:
+            return {"answer": answer}
+        chat_sessions.append(session, request.question, answer, summarize_chat)
+        return {"answer": answer, "session_id": session.id}
+    except Exception as e:
+        print(f"Error calling OpenAI API: {e}")
+        return JSONResponse(status_code=500, content={"error": "AI 피드백 생성 중 오류 발생"})
+
+def sse_event(data: Dict[str, Any], event: Optional[str] = None) -> str:
+    """Server-Sent Events 메시지 한 개"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.post("/ask-ai/stream")
+async def ask_ai_stream(request: AskRequest):
+    """
+    /ask-ai 의 스트리밍 버전 (Server-Sent Events)
+
+    세션을 쓰는 요청이면 먼저 `event: session` 으로 세션 ID를 보내고, 생성되는 대로
+    `data: {"delta": "..."}` 메시지를, 끝나면 `event: done`, 도중에 실패하면 `event: error` 메시지를 보냅니다.
+    끝까지 생성된 답변만 세션 기록에 남깁니다.
+    클라이언트가 연결을 끊으면 응답 작업이 취소되면서 OpenAI 스트림도 닫혀 생성이 중단됩니다.
+    """
+    started = time.perf_counter()
+    built = await build_ask_messages(request)
+    if built is None:
+        return JSONResponse(status_code=404, content={"error": "사용자를 찾을 수 없습니다."})
+    messages, session = built
+
+    try:
+        stream = await client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=messages,
+            temperature=0.7,
+            stream=True,
+        )
     except Exception as e:
+        OPENAI_REQUEST_ERRORS.labels("ask_stream").inc()
         print(f"Error calling OpenAI API: {e}")
         return JSONResponse(status_code=500, content={"error": "AI 피드백 생성 중 오류 발생"})
 
+    async def events():
+        first_token = None
+        chunks = []
+        finished = False
+        try:
+            if session is not None:
+                yield sse_event({"session_id": session.id}, event="session")
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                if first_token is None:
+                    first_token = time.perf_counter()
+                    OPENAI_REQUEST_SECONDS.labels("ask_stream").observe(first_token - started)
+                    print(f"ask-ai 첫 토큰까지 {(first_token - started) * 1000:.0f} ms")
+                chunks.append(delta)
+                yield sse_event({"delta": delta})
+            finished = True
+            if session is not None:
+                chat_sessions.append(session, request.question, "".join(chunks).strip(), summarize_chat)
+            yield sse_event({}, event="done")
+        except Exception as e:
+            OPENAI_REQUEST_ERRORS.labels("ask_stream").inc()
+            print(f"Error streaming OpenAI API: {e}")
+            yield sse_event({"error": "AI 피드백 생성 중 오류 발생"}, event="error")
+        finally:
+            # 연결이 끊겨 취소된 경우에도 OpenAI 스트림을 닫도록 취소로부터 보호
+            with anyio.CancelScope(shield=True):
+                await stream.close()
+            status = "완료" if finished else "중단"
+            print(f"ask-ai 스트림 {status}: 조각 {len(chunks)}개, {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.put("/users/{user_id}")
 async def update_user_profile(user_id: int, request: UserUpdateRequest):
     update_fields = request.dict(exclude_unset=True)
@@ -401,47 +946,67 @@ async def update_user_profile(user_id: int, request: UserUpdateRequest):
     if 'gender' in update_fields:
         update_fields['gender'] = 'male' if update_fields['gender'] == '남성' else 'female'
 
-    set_clause = ", ".join([f"{key} = %s" for key in update_fields])
-    values = list(update_fields.values())
-    values.append(user_id)
-
-    query = f"UPDATE users SET {set_clause} WHERE id = %s"
-    cursor.execute(query, tuple(values))
-    conn.commit()
+    await users.update(user_id, update_fields)
 
     return {"message": "회원 정보가 성공적으로 수정되었습니다."}
 
 @app.put("/users/{user_id}/password")
 async def change_password(user_id: int, request: PasswordChangeRequest):
-    cursor.execute("SELECT password FROM users WHERE id = %s", (user_id,))
-    user = cursor.fetchone()
+    user = await users.get(user_id, ("password",))
     if not user:
         return JSONResponse(status_code=404, content={"detail": "사용자를 찾을 수 없습니다."})
 
-    if not bcrypt.checkpw(request.current_password.encode('utf-8'), user["password"].encode('utf-8')):
+    if not await password_hasher.check(request.current_password, user["password"]):
         return JSONResponse(status_code=400, content={"detail": "현재 비밀번호가 일치하지 않습니다."})
 
-    hashed_new_password = bcrypt.hashpw(request.new_password.encode('utf-8'), bcrypt.gensalt())
-    cursor.execute("UPDATE users SET password = %s WHERE id = %s", (hashed_new_password.decode('utf-8'), user_id))
-    conn.commit()
+    hashed_new_password = await password_hasher.hash(request.new_password)
+    await users.update(user_id, {"password": hashed_new_password})
 
     return {"message": "비밀번호가 성공적으로 변경되었습니다."}
 
 @app.delete("/users/{user_id}")
 async def delete_user(user_id: int):
     # 사용자와 관련된 모든 데이터를 삭제해야 합니다. (예: daily_nutrients)
-    cursor.execute("DELETE FROM daily_nutrients WHERE user_id = %s", (user_id,))
-    cursor.execute("DELETE FROM users WHERE id = %s", (user_id,))
-    conn.commit()
+    await users.delete(user_id)
+    feedback_cache.forget_user(user_id)
+    await run_in_threadpool(profile_images.delete, user_id)
     return {"message": "회원 탈퇴가 성공적으로 처리되었습니다."}
 
-# 프로필 이미지 업로드를 위한 요청 모델
-class ProfileImageRequest(BaseModel):
-    profile_image: str # Base64 인코딩된 이미지 데이터
-
 @app.post("/users/{user_id}/profile-image")
-async def upload_profile_image(user_id: int, request: ProfileImageRequest):
-    # Base64 이미지 데이터를 DB에 저장
-    cursor.execute("UPDATE users SET profile_image = %s WHERE id = %s", (request.profile_image, user_id))
-    conn.commit()
-    return {"message": "프로필 이미지가 성공적으로 업데이트되었습니다."}
+async def upload_profile_image(user_id: int, image: UploadFile = File(...)):
+    # 원본은 저장하지 않고 고정 크기 썸네일만 blob 저장소에 저장, users 에는 버전만 기록
+    user = await users.get(user_id, ("profile_image",))
+    if not user:
+        return JSONResponse(status_code=404, content={"error": "사용자를 찾을 수 없습니다."})
+
+    data = await read_upload(image, PROFILE_IMAGE_MAX_BYTES)
+    if data is None:
+        return JSONResponse(status_code=413, content={"error": "업로드 파일이 너무 큽니다."})
+
+    version = await run_in_threadpool(profile_images.save, user_id, data)
+    if version is None:
+        return JSONResponse(status_code=400, content={"error": "이미지 파일을 읽을 수 없습니다."})
+
+    await users.update(user_id, {"profile_image": version})
+    previous = user["profile_image"]
+    if is_version(previous) and previous != version:
+        await run_in_threadpool(profile_images.delete, user_id, previous)
+
+    return {
+        "message": "프로필 이미지가 성공적으로 업데이트되었습니다.",
+        "profile_image": profile_image_urls(user_id, version),
+    }
+
+
+@app.get("/profile-images/{user_id}/{version}/{size}.jpg")
+async def get_profile_image(user_id: int, version: str, size: int, http_request: Request):
+    # URL 에 내용 버전이 들어 있으므로 바뀌지 않음 → 브라우저/프록시가 오래 캐시하도록
+    etag = f'"{version}-{size}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=31536000, immutable"}
+    if http_request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    data = await run_in_threadpool(profile_images.read, user_id, version, size)
+    if data is None:
+        return JSONResponse(status_code=404, content={"error": "이미지를 찾을 수 없습니다."})
+    return Response(content=data, media_type="image/jpeg", headers=headers)
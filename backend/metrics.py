@@ -0,0 +1,298 @@
+#서버 지표 (단계별 소요 시간 히스토그램, 카운터, 진행 중 게이지) - /metrics 에서 Prometheus 텍스트 형식으로 제공
+#
+# 기록은 락 한 번 + 버킷 이진 탐색이라 요청당 부담이 거의 없고, 집계(누적 버킷/분위수 계산)는 조회할 때만 합니다.
+# DB 스레드와 OCR 진행 전달 스레드에서도 기록하므로 모든 지표는 스레드 안전합니다.
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# 초 단위 기본 버킷 (1 ms ~ 60 s)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SUMMARY_QUANTILES = (0.5, 0.95, 0.99)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[LabelValues, Any] = {}
+
+    @abstractmethod
+    def _new_child(self):
+        """라벨 값 조합 하나의 값 객체"""
+
+    def labels(self, *values) -> Any:
+        """라벨 값 조합별 지표 (labelnames 순서대로 값 전달)"""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name}: 라벨 {self.labelnames} 가 필요합니다.")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _items(self) -> List[Tuple[LabelValues, Any]]:
+        with self._lock:
+            return sorted(self._children.items())
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in self._items():
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    @abstractmethod
+    def _render_child(self, values: LabelValues, child) -> List[str]:
+        """값 객체 하나를 Prometheus 텍스트 줄들로"""
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self, lock: threading.Lock):
+        self.value = 0.0
+        self._lock = lock
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = float(value)
+
+
+class Counter(_Metric):
+    """누적 횟수 (inc 만 사용)"""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value(self._lock)
+
+    def _render_child(self, values, child):
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"]
+
+
+class Gauge(_Metric):
+    """현재 값 (진행 중인 요청 수 등)"""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _Value(self._lock)
+
+    def _render_child(self, values, child):
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"]
+
+
+class _Timer:
+    __slots__ = ("_child", "_start")
+
+    def __init__(self, child: "_HistogramChild"):
+        self._child = child
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._child.observe(time.perf_counter() - self._start)
+        return False
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count", "_lock")
+
+    def __init__(self, buckets: Tuple[float, ...], lock: threading.Lock):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = lock
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def time(self) -> _Timer:
+        """with 블록의 소요 시간(초)을 기록"""
+        return _Timer(self)
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        버킷 개수로 분위수 추정 (Prometheus histogram_quantile 과 같은 선형 보간)
+
+        +Inf 칸에 들어가면 가장 큰 버킷 경계를 반환합니다.
+        """
+        counts, _, count = self.snapshot()
+        if count == 0:
+            return None
+        rank = q * count
+        cumulative = 0
+        for i, bucket_count in enumerate(counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+
+class Histogram(_Metric):
+    """소요 시간 분포 (누적 버킷 + 합계 + 횟수)"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets, self._lock)
+
+    def _render_child(self, values, child):
+        counts, total, count = child.snapshot()
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """라벨 조합별 횟수/평균/p50/p95/p99 (ms)"""
+        rows = []
+        for values, child in self._items():
+            _, total, count = child.snapshot()
+            if not count:
+                continue
+            row: Dict[str, Any] = dict(zip(self.labelnames, values))
+            row["count"] = count
+            row["avg_ms"] = round(total / count * 1000, 2)
+            for q in SUMMARY_QUANTILES:
+                row[f"p{int(q * 100)}_ms"] = round(child.quantile(q) * 1000, 2)
+            rows.append(row)
+        return rows
+
+
+# 조회 시점에 값을 읽어 오는 지표: () -> [(이름, 종류, 설명, {라벨: 값}, 값)]
+Collector = Callable[[], Iterable[Tuple[str, str, str, Dict[str, str], float]]]
+
+
+class Registry:
+    """지표 모음 (/metrics 출력 단위)"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Collector] = []
+
+    def _register(self, metric: _Metric) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"이미 등록된 지표: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Collector):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Prometheus 텍스트 형식 (text/plain; version=0.0.4)"""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+
+        # 수집 함수가 돌려준 값은 이름별로 묶어서 출력
+        families: Dict[str, Tuple[str, str, List[str]]] = {}
+        for collector in self._collectors:
+            try:
+                samples = list(collector())
+            except Exception as e:
+                print(f"지표 수집 실패 ({collector!r}): {e!r}")
+                continue
+            for name, kind, documentation, labels, value in samples:
+                family = families.setdefault(name, (kind, documentation, []))
+                family[2].append(f"{name}{_format_labels(list(labels), list(labels.values()))} {_format_value(value)}")
+        for name, (kind, documentation, samples) in families.items():
+            lines.extend([f"# HELP {name} {documentation}", f"# TYPE {name} {kind}", *samples])
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict[str, List[Dict[str, Any]]]:
+        """히스토그램별 분위수 요약 (사람이 보기 위한 JSON)"""
+        return {name: metric.summary() for name, metric in self._metrics.items() if isinstance(metric, Histogram)}
+
+
+registry = Registry()
+
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "HTTP 요청 수", ("method", "route", "status"))
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds", "HTTP 요청 처리 시간 (응답 본문 전송 완료까지)", ("method", "route"))
+HTTP_IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight", "처리 중인 HTTP 요청 수", ("method", "route"))
+STAGE_SECONDS = registry.histogram(
+    "pipeline_stage_duration_seconds", "OCR 파이프라인 / 피드백 생성 단계별 소요 시간", ("stage",))
+DB_QUERY_SECONDS = registry.histogram(
+    "db_query_duration_seconds", "DB 작업 소요 시간 (커넥션 대기 포함)", ("query",))
+DB_QUERY_ERRORS = registry.counter(
+    "db_query_errors_total", "실패한 DB 작업 수", ("query",))
+OPENAI_REQUEST_SECONDS = registry.histogram(
+    "openai_request_duration_seconds", "OpenAI 호출 소요 시간 (스트리밍은 첫 조각까지)", ("call",))
+OPENAI_REQUEST_ERRORS = registry.counter(
+    "openai_request_errors_total", "실패한 OpenAI 호출 수", ("call",))
+OCR_WORKER_EVENTS = registry.counter(
+    "ocr_worker_events_total", "OCR 워커 프로세스에서 일어난 일 횟수 (table_retry: 표 영역이 아니어서 전체 이미지로 재시도)",
+    ("event",))
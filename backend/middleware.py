@@ -0,0 +1,198 @@
+#ASGI 미들웨어 모음
+
+import json
+import time
+from typing import Iterable, List, Optional, Pattern, Sequence, Set, Tuple
+
+from fastapi import HTTPException
+from starlette._utils import get_route_path
+from starlette.routing import BaseRoute
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from metrics import HTTP_IN_FLIGHT, HTTP_REQUEST_SECONDS, HTTP_REQUESTS
+from profiler import PROFILE_MIN_DURATION_MS, RequestProfile, current_profile, profile_store, should_profile
+
+UPLOAD_TOO_LARGE_MESSAGE = "업로드 파일이 너무 큽니다."
+
+
+class _PayloadTooLarge(HTTPException):
+    # 본문 파싱 중에 발생하면 FastAPI가 400으로 바꾸지 않고 그대로 413 응답을 만들도록 HTTPException 상속
+    def __init__(self):
+        super().__init__(status_code=413, detail=UPLOAD_TOO_LARGE_MESSAGE)
+
+
+class UploadSizeLimitMiddleware:
+    """
+    지정한 경로의 요청 본문 크기를 제한하는 미들웨어
+
+    Content-Length 가 한도를 넘으면 본문을 읽기 전에 413으로 응답하고,
+    chunked 전송처럼 길이를 알 수 없는 경우에는 받은 바이트를 세다가 한도를 넘는 순간 중단합니다.
+    (multipart 파서가 파일 전체를 임시 파일에 쌓기 전에 끊기 위함)
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int, paths: Iterable[str]):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.paths = tuple(paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                try:
+                    too_large = int(value) > self.max_bytes
+                except ValueError:
+                    too_large = False
+                if too_large:
+                    await self._reject(send)
+                    return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise _PayloadTooLarge()
+            return message
+
+        async def tracking_send(message: Message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except _PayloadTooLarge:
+            if not response_started:
+                await self._reject(send)
+
+    async def _reject(self, send: Send):
+        body = json.dumps({"error": UPLOAD_TOO_LARGE_MESSAGE}, ensure_ascii=False).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+class MetricsMiddleware:
+    """
+    엔드포인트별 요청 수 / 처리 시간 / 처리 중 요청 수를 metrics 에 기록하는 미들웨어
+
+    지표 라벨에는 실제 경로(/users/3) 대신 라우트 경로(/users/{user_id})를 써서 라벨 수가 늘어나지 않게 하고,
+    어떤 라우트에도 맞지 않는 요청은 "unmatched" 로 묶습니다.
+    """
+
+    def __init__(self, app: ASGIApp, routes: Sequence[BaseRoute]):
+        self.app = app
+        self.routes = routes
+        self._patterns: Optional[List[Tuple[Pattern, Optional[Set[str]], str]]] = None
+
+    def _compile(self) -> List[Tuple[Pattern, Optional[Set[str]], str]]:
+        # 라우트는 미들웨어 등록 뒤에 추가되므로 첫 요청 때 정규식만 모아 둠
+        # (route.matches 는 경로 매개변수 변환까지 해서 라우트가 많으면 요청마다 수십 us 가 듦)
+        return [(route.path_regex, getattr(route, "methods", None), route.path)
+                for route in self.routes if hasattr(route, "path_regex")]
+
+    def _route(self, scope: Scope) -> str:
+        if self._patterns is None:
+            self._patterns = self._compile()
+        path = get_route_path(scope)
+        method = scope["method"]
+        # 라우터와 같은 규칙: 경로만 맞고 메서드가 다른(405) 요청은 처음 경로가 맞은 라우트로 기록
+        partial = None
+        for regex, methods, route_path in self._patterns:
+            if regex.match(path):
+                if methods is None or method in methods:
+                    return route_path
+                if partial is None:
+                    partial = route_path
+        return partial or "unmatched"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = self._route(scope)
+        in_flight = HTTP_IN_FLIGHT.labels(method, route)
+        status = 500
+
+        async def recording_send(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, recording_send)
+        finally:
+            HTTP_REQUEST_SECONDS.labels(method, route).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(method, route, status).inc()
+            in_flight.dec()
+
+
+class ProfilingMiddleware:
+    """
+    관리자 헤더(X-Profile: <PROFILE_ADMIN_TOKEN>)가 있거나 PROFILE_SAMPLE_RATE 로 뽑힌 요청을 샘플링 프로파일링
+
+    요청을 처리하는 이벤트 루프 스레드의 스택을 모으고, 요청 중 OCR 풀에서 실행한 작업의 스택은
+    current_profile 을 통해 "ocr-worker" 아래에 합칩니다. 결과는 profile_store 에 저장하고
+    응답 헤더 X-Profile-Id 로 ID 를 알려 줍니다.
+    이벤트 루프 스택에는 같은 시간에 처리 중이던 다른 요청의 작업도 섞일 수 있습니다.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        reason = should_profile(Headers(scope=scope)) if scope["type"] == "http" else None
+        if reason is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(reason)
+        status = 500
+
+        async def profiled_send(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append("X-Profile-Id", profile.id)
+            await send(message)
+
+        token = current_profile.set(profile)
+        start = time.perf_counter()
+        profile.sampler.start()
+        try:
+            await self.app(scope, receive, profiled_send)
+        finally:
+            profile.sampler.stop()
+            current_profile.reset(token)
+            duration_ms = (time.perf_counter() - start) * 1000
+            if reason == "sampled" and duration_ms < PROFILE_MIN_DURATION_MS:
+                profile_store.discard()
+            else:
+                meta = {"method": scope["method"], "path": scope["path"], "status": status,
+                        "duration_ms": round(duration_ms, 1), "created": time.time()}
+                try:
+                    await run_in_threadpool(profile_store.save, profile, meta)
+                except OSError as e:
+                    print(f"프로파일 저장 실패: {e}")
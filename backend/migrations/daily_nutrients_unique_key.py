@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+daily_nutrients 에 (user_id, nutrient_name, date) 유니크 키 추가
+
+save_nutrients 의 upsert(INSERT ... ON DUPLICATE KEY UPDATE)가 동작하려면 이 키가 필요합니다.
+기존 방식(조회 후 갱신)이 동시에 실행되며 생긴 중복 행은 합계를 가장 오래된 행(가장 작은 id)에
+모은 뒤 나머지를 지우고 키를 추가합니다. 이미 키가 있으면 아무것도 하지 않습니다.
+
+중복 정리와 키 추가 사이에 새 중복이 생기지 않도록 서버를 멈춘 상태에서 실행하세요.
+(그래도 생겼다면 ALTER 가 실패하므로 다시 실행하면 됩니다)
+
+    python migrations/daily_nutrients_unique_key.py [--dry-run]
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import connect
+
+INDEX_NAME = "uq_daily_nutrients_user_nutrient_date"
+
+DUPLICATE_GROUPS_SQL = """
+    SELECT COUNT(*) AS groups_count, COALESCE(SUM(cnt - 1), 0) AS extra_rows
+    FROM (
+        SELECT COUNT(*) AS cnt
+        FROM daily_nutrients
+        GROUP BY user_id, nutrient_name, date
+        HAVING COUNT(*) > 1
+    ) dup
+"""
+
+# 중복 그룹의 합계를 가장 작은 id 행에 기록
+MERGE_SQL = """
+    UPDATE daily_nutrients d
+    JOIN (
+        SELECT MIN(id) AS keep_id, SUM(value) AS total
+        FROM daily_nutrients
+        GROUP BY user_id, nutrient_name, date
+        HAVING COUNT(*) > 1
+    ) g ON d.id = g.keep_id
+    SET d.value = g.total
+"""
+
+# 같은 그룹에서 id 가 더 작은 행이 있는 행 삭제
+DELETE_SQL = """
+    DELETE d FROM daily_nutrients d
+    JOIN daily_nutrients k
+      ON d.user_id = k.user_id AND d.nutrient_name = k.nutrient_name AND d.date = k.date AND d.id > k.id
+"""
+
+ADD_INDEX_SQL = f"""
+    ALTER TABLE daily_nutrients
+    ADD UNIQUE KEY {INDEX_NAME} (user_id, nutrient_name, date)
+"""
+
+
+def index_exists(cursor) -> bool:
+    cursor.execute("""
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = 'daily_nutrients' AND index_name = %s
+        LIMIT 1
+    """, (INDEX_NAME,))
+    return cursor.fetchone() is not None
+
+
+def main():
+    dry_run = "--dry-run" in sys.argv[1:]
+    conn = connect()
+    cursor = conn.cursor(dictionary=True, buffered=True)
+    try:
+        if index_exists(cursor):
+            print(f"{INDEX_NAME} 키가 이미 있습니다.")
+            return
+
+        cursor.execute(DUPLICATE_GROUPS_SQL)
+        dup = cursor.fetchone()
+        print(f"중복 그룹 {dup['groups_count']}개, 정리할 행 {int(dup['extra_rows'])}개")
+        if dry_run:
+            return
+
+        if dup["groups_count"]:
+            # 합치기와 삭제는 한 트랜잭션으로 (중간에 실패하면 합계가 두 번 더해지지 않도록)
+            cursor.execute(MERGE_SQL)
+            cursor.execute(DELETE_SQL)
+            print(f"중복 행 {cursor.rowcount}개 삭제")
+            conn.commit()
+
+        # ALTER TABLE 은 암묵적으로 커밋됨
+        cursor.execute(ADD_INDEX_SQL)
+        print(f"{INDEX_NAME} 키 추가 완료")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
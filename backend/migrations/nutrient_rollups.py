@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+주/월 단위 영양소 롤업 테이블(nutrient_rollups) 생성 및 기존 기록 반영
+
+save_nutrients 는 daily_nutrients 와 함께 이 테이블에도 값을 더하므로, 서버를 새 버전으로 올리기 전에
+실행해야 합니다. 롤업은 daily_nutrients 에서 다시 계산해 덮어쓰므로 여러 번 실행해도 결과가 같습니다.
+(값이 어긋났을 때 다시 맞추는 용도로도 사용 가능)
+
+다시 계산하는 동안 저장된 값이 덮어써지지 않도록 서버를 멈춘 상태에서 실행하세요.
+
+    python migrations/nutrient_rollups.py [--dry-run]
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import connect
+
+# 기본 키가 (사용자, 단위, 기간) 범위 조회와 upsert 의 유니크 키를 함께 담당
+CREATE_SQL = """
+    CREATE TABLE IF NOT EXISTS nutrient_rollups (
+        user_id INT NOT NULL,
+        granularity ENUM('week', 'month') NOT NULL,
+        period_start DATE NOT NULL,
+        nutrient_name VARCHAR(50) NOT NULL,
+        value DOUBLE NOT NULL,
+        unit VARCHAR(10),
+        PRIMARY KEY (user_id, granularity, period_start, nutrient_name)
+    )
+"""
+
+# 기간 시작일: 주는 월요일(repository.period_start 와 같은 기준), 월은 1일
+PERIOD_STARTS = {
+    "week": "DATE_SUB(date, INTERVAL WEEKDAY(date) DAY)",
+    "month": "DATE_SUB(date, INTERVAL DAYOFMONTH(date) - 1 DAY)",
+}
+
+BACKFILL_SQL = """
+    INSERT INTO nutrient_rollups (user_id, granularity, period_start, nutrient_name, value, unit)
+    SELECT user_id, '{granularity}', {start} AS period_start, nutrient_name, SUM(value), MAX(unit)
+    FROM daily_nutrients
+    GROUP BY user_id, period_start, nutrient_name
+    ON DUPLICATE KEY UPDATE value = VALUES(value), unit = VALUES(unit)
+"""
+
+COUNT_SQL = """
+    SELECT COUNT(*) AS n FROM (
+        SELECT 1 FROM daily_nutrients
+        GROUP BY user_id, {start}, nutrient_name
+    ) g
+"""
+
+
+def main():
+    dry_run = "--dry-run" in sys.argv[1:]
+    conn = connect()
+    cursor = conn.cursor(dictionary=True, buffered=True)
+    try:
+        for granularity, start in PERIOD_STARTS.items():
+            cursor.execute(COUNT_SQL.format(start=start))
+            print(f"{granularity} 롤업 {cursor.fetchone()['n']}행")
+        if dry_run:
+            return
+
+        # CREATE TABLE 은 암묵적으로 커밋됨
+        cursor.execute(CREATE_SQL)
+        for granularity, start in PERIOD_STARTS.items():
+            cursor.execute(BACKFILL_SQL.format(granularity=granularity, start=start))
+        conn.commit()
+        print("nutrient_rollups 반영 완료")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
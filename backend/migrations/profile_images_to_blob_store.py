@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+users.profile_image 에 base64 로 저장된 이전 프로필 이미지를 blob 저장소로 옮김
+
+이미지마다 썸네일을 만들어 저장한 뒤 컬럼 값을 버전(16자리 해시)으로 바꿉니다.
+이미 옮긴 사용자는 건너뛰므로 여러 번 실행해도 됩니다. 읽을 수 없는 데이터는 NULL 로 비웁니다.
+(blob 저장소 설정은 서버와 같은 BLOB_STORE_* 환경 변수를 사용)
+
+    python migrations/profile_images_to_blob_store.py [--dry-run]
+"""
+
+import base64
+import binascii
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import connect
+from profile_images import is_version, profile_images
+
+
+def decode_data_url(value: str):
+    """"data:image/png;base64,...." 또는 순수 base64 문자열을 바이트로 (실패 시 None)"""
+    if value.startswith("data:"):
+        value = value.split(",", 1)[-1]
+    try:
+        return base64.b64decode(value, validate=False)
+    except (binascii.Error, ValueError):
+        return None
+
+
+def main():
+    dry_run = "--dry-run" in sys.argv[1:]
+    conn = connect()
+    cursor = conn.cursor(dictionary=True, buffered=True)
+    try:
+        # 한 번에 모든 이미지를 메모리에 올리지 않도록 id 만 먼저 조회 (버전은 16자)
+        cursor.execute("SELECT id FROM users WHERE LENGTH(profile_image) > 16")
+        user_ids = [row["id"] for row in cursor.fetchall()]
+        print(f"옮길 프로필 이미지 {len(user_ids)}개")
+        if dry_run:
+            return
+
+        moved = cleared = 0
+        for user_id in user_ids:
+            cursor.execute("SELECT profile_image FROM users WHERE id = %s", (user_id,))
+            row = cursor.fetchone()
+            if row is None or row["profile_image"] is None or is_version(row["profile_image"]):
+                continue
+            data = decode_data_url(row["profile_image"])
+            version = profile_images.save(user_id, data) if data else None
+            if version is None:
+                cleared += 1
+            else:
+                moved += 1
+            cursor.execute("UPDATE users SET profile_image = %s WHERE id = %s", (version, user_id))
+            conn.commit()
+        print(f"완료: {moved}개 이동, 읽을 수 없어 비운 데이터 {cleared}개")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
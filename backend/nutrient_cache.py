@@ -0,0 +1,145 @@
+#사용자별 오늘 누적 영양소 캐시 (대시보드 / 채팅에서 매번 daily_nutrients 를 조회하지 않도록)
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+TODAY_CACHE_MAX_USERS = int(os.getenv("TODAY_CACHE_MAX_USERS", "10000"))
+# 최대 보관 시간 (초) - 캐시는 프로세스마다 따로 있으므로, 여러 워커 프로세스로 실행하거나
+# 다른 경로(관리 도구 등)로 DB가 바뀌면 그 변경은 이 시간이 지나야 보임
+TODAY_CACHE_TTL = float(os.getenv("TODAY_CACHE_TTL", "600"))
+
+CacheKey = Tuple[str, date]
+
+
+class TodayNutrientCache:
+    """
+    (user_id, 날짜) -> 그날 누적 영양소 행 목록 캐시
+
+    저장은 begin_write → (DB 반영) → add 순서로 호출하며, add 에서 캐시에도 같은 값을 더하는
+    write-through 방식입니다. DB에서 읽은 값은 조회를 시작할 때의 버전이 그대로이고 진행 중인 저장이
+    없을 때만 캐시에 넣습니다. (저장 도중 읽은 값을 넣으면 add 에서 한 번 더 더해질 수 있으므로)
+    날짜가 바뀌면(KST 자정) 지난 날짜 항목은 모두 버립니다.
+    """
+
+    def __init__(self, max_users: int = TODAY_CACHE_MAX_USERS, ttl: float = TODAY_CACHE_TTL):
+        self.max_users = max_users
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[CacheKey, Tuple[List[Dict[str, Any]], float]]" = OrderedDict()
+        self._versions: Dict[CacheKey, int] = {}
+        self._writing: Dict[CacheKey, int] = {}  # 키별 진행 중인 저장 수
+        self._day: Optional[date] = None
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "invalidations": 0}
+
+    def _roll_over(self, day: date):
+        """새 날짜가 들어오면 이전 날짜 항목 삭제 (락을 잡은 상태에서 호출)"""
+        if self._day is not None and day <= self._day:
+            return
+        self._day = day
+        for key in [key for key in self._entries if key[1] < day]:
+            del self._entries[key]
+        # 진행 중인 저장이 있는 키는 버전을 유지 (끝날 때 다시 올림)
+        self._versions = {key: version for key, version in self._versions.items()
+                          if key[1] >= day or key in self._writing}
+
+    def get(self, user_id, day: date) -> Tuple[Optional[List[Dict[str, Any]]], int]:
+        """
+        캐시 조회
+
+        Returns:
+            (행 목록 복사본 또는 None, 캐시를 채울 때 넘길 버전)
+        """
+        key = (str(user_id), day)
+        with self._lock:
+            self._roll_over(day)
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] <= self.ttl:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return [dict(row) for row in entry[0]], self._versions.get(key, 0)
+            if entry is not None:
+                del self._entries[key]
+            self._stats["misses"] += 1
+            return None, self._versions.get(key, 0)
+
+    def fill(self, user_id, day: date, rows: List[Dict[str, Any]], version: int):
+        """DB에서 읽은 행을 저장 (get 이후 저장/무효화가 있었으면 버림)"""
+        key = (str(user_id), day)
+        with self._lock:
+            if self._versions.get(key, 0) != version or self._writing.get(key) \
+                    or (self._day is not None and day < self._day):
+                return
+            self._entries[key] = ([{"nutrient_name": row["nutrient_name"], "value": float(row["value"]),
+                                    "unit": row["unit"]} for row in rows], time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+
+    def begin_write(self, user_id, day: date):
+        """DB 저장 시작 (반드시 add 또는 abort_write 로 끝내야 함)"""
+        key = (str(user_id), day)
+        with self._lock:
+            self._writing[key] = self._writing.get(key, 0) + 1
+            self._versions[key] = self._versions.get(key, 0) + 1
+
+    def _end_write(self, key: CacheKey):
+        remaining = self._writing.get(key, 0) - 1
+        if remaining > 0:
+            self._writing[key] = remaining
+        else:
+            self._writing.pop(key, None)
+        self._versions[key] = self._versions.get(key, 0) + 1
+
+    def abort_write(self, user_id, day: date):
+        """DB 저장 실패: 반영 여부를 알 수 없으므로 항목을 버림"""
+        key = (str(user_id), day)
+        with self._lock:
+            self._end_write(key)
+            self._entries.pop(key, None)
+
+    def add(self, user_id, day: date, nutrients: List[Dict[str, Any]]):
+        """DB 저장 완료: 더한 값을 캐시 항목에도 더함 (항목이 없으면 다음 조회 때 DB에서 채움)"""
+        key = (str(user_id), day)
+        with self._lock:
+            self._end_write(key)
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            rows = {row["nutrient_name"]: row for row in entry[0]}
+            for nutrient in nutrients:
+                row = rows.get(nutrient["name"])
+                if row is None:
+                    row = {"nutrient_name": nutrient["name"], "value": 0.0, "unit": nutrient["unit"]}
+                    rows[nutrient["name"]] = row
+                    entry[0].append(row)
+                row["value"] += float(nutrient["value"])
+            self._stats["writes"] += 1
+
+    def invalidate_user(self, user_id):
+        """사용자의 모든 날짜 항목 삭제 (탈퇴 등)"""
+        user_key = str(user_id)
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_key]:
+                del self._entries[key]
+            keys = {key for key in self._versions if key[0] == user_key}
+            if self._day is not None:
+                keys.add((user_key, self._day))
+            for key in keys:
+                # 진행 중인 조회가 삭제 전 값을 다시 채우지 못하도록 버전도 올림
+                self._versions[key] = self._versions.get(key, 0) + 1
+            self._stats["invalidations"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+today_cache = TodayNutrientCache()
@@ -0,0 +1,201 @@
+#OCR 결과 캐시 (같은 사진 재업로드 시 OCR 생략, 거의 같은 사진 재사용은 설정 시에만)
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+OCR_CACHE_DIR = os.getenv(
+    "OCR_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "ocr"),
+)
+OCR_CACHE_MEMORY_SIZE = int(os.getenv("OCR_CACHE_MEMORY_SIZE", "256"))
+OCR_CACHE_MAX_ENTRIES = int(os.getenv("OCR_CACHE_MAX_ENTRIES", "5000"))
+OCR_CACHE_TTL = float(os.getenv("OCR_CACHE_TTL", str(7 * 24 * 3600)))
+# 지각 해시 해밍 거리가 이 값 이하이면 같은 사진으로 간주 (0 이하: 끔, 바이트가 같은 파일만 재사용)
+# dHash 는 배치만 보고 숫자는 구분하지 못해, 배치가 같은 다른 제품의 표도 1~2비트 차이로 맞아 버립니다.
+# 같은 사진을 다시 찍어 올리는 경우가 많고 잘못된 값을 돌려줘도 되는 환경에서만 켜세요.
+OCR_CACHE_MAX_DISTANCE = int(os.getenv("OCR_CACHE_MAX_DISTANCE", "0"))
+
+
+def perceptual_hash(data: bytes) -> Optional[int]:
+    """
+    64비트 dHash 계산
+
+    축소 그레이스케일로 디코딩한 뒤 9x8로 줄여 이웃 픽셀 밝기 차이의 부호만 사용하므로
+    재압축, 크기 변경, 약간의 밝기 변화에는 같은 값(또는 가까운 값)이 나옵니다.
+    """
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_4)
+    if image is None:
+        return None
+    small = cv2.resize(image, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = np.packbits((small[:, 1:] > small[:, :-1]).flatten())
+    return int.from_bytes(bits.tobytes(), "big")
+
+
+class CacheKey:
+    """이미지 바이트의 정확한 해시(sha256)와 지각 해시 묶음"""
+
+    __slots__ = ("digest", "phash")
+
+    def __init__(self, digest: str, phash: Optional[int]):
+        self.digest = digest
+        self.phash = phash
+
+
+class OCRResultCache:
+    """
+    프로세스 내 LRU + 디스크 저장소로 구성된 OCR 결과 캐시
+
+    디스크 항목은 "<sha256>_<phash>.json" 파일 하나로 저장되며, 파일 수정 시각을 생성 시각으로 씁니다.
+    TTL이 지난 항목과 max_entries 를 넘는 오래된 항목부터 삭제합니다.
+    """
+
+    def __init__(self, directory: str = OCR_CACHE_DIR, memory_size: int = OCR_CACHE_MEMORY_SIZE,
+                 max_entries: int = OCR_CACHE_MAX_ENTRIES, ttl: float = OCR_CACHE_TTL,
+                 max_distance: int = OCR_CACHE_MAX_DISTANCE):
+        self.directory = directory
+        self.memory_size = memory_size
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_distance = max_distance
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        # 디스크 색인: digest -> (phash, 생성 시각), 생성 순서 유지
+        self._index: "OrderedDict[str, Tuple[Optional[int], float]]" = OrderedDict()
+        self._stats = {"exact_hits": 0, "near_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._load_index()
+
+    def _path(self, digest: str, phash: Optional[int]) -> str:
+        suffix = format(phash, "016x") if phash is not None else "none"
+        return os.path.join(self.directory, f"{digest}_{suffix}.json")
+
+    def _load_index(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            name = entry.name
+            if not name.endswith(".json") or "_" not in name:
+                continue
+            digest, suffix = name[:-5].split("_", 1)
+            phash = None if suffix == "none" else int(suffix, 16)
+            entries.append((entry.stat().st_mtime, digest, phash))
+        for created, digest, phash in sorted(entries):
+            self._index[digest] = (phash, created)
+        self._evict(time.time())
+
+    def _evict(self, now: float):
+        """TTL 만료 항목과 용량 초과분 삭제 (락을 잡은 상태에서 호출)"""
+        while self._index:
+            digest, (phash, created) = next(iter(self._index.items()))
+            if now - created <= self.ttl and len(self._index) <= self.max_entries:
+                break
+            self._remove(digest, phash)
+            self._stats["evictions"] += 1
+
+    def _remove(self, digest: str, phash: Optional[int]):
+        self._index.pop(digest, None)
+        self._memory.pop(digest, None)
+        try:
+            os.remove(self._path(digest, phash))
+        except FileNotFoundError:
+            pass
+
+    def _read(self, digest: str) -> Optional[Any]:
+        if digest in self._memory:
+            self._memory.move_to_end(digest)
+            return self._memory[digest]
+        phash, _ = self._index[digest]
+        try:
+            with open(self._path(digest, phash), "r", encoding="utf-8") as f:
+                value = json.load(f)["ocr_nutrients"]
+        except (OSError, ValueError, KeyError):
+            self._remove(digest, phash)
+            return None
+        self._remember(digest, value)
+        return value
+
+    def _remember(self, digest: str, value: Any):
+        self._memory[digest] = value
+        self._memory.move_to_end(digest)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _find_near(self, phash: int) -> Optional[str]:
+        if self.max_distance <= 0:
+            return None
+        best, best_distance = None, self.max_distance + 1
+        for digest, (other, _) in self._index.items():
+            if other is None:
+                continue
+            distance = (phash ^ other).bit_count()
+            if distance < best_distance:
+                best, best_distance = digest, distance
+        return best
+
+    def lookup(self, data: bytes) -> Tuple[CacheKey, Optional[Any]]:
+        """
+        캐시 조회
+
+        Returns:
+            (저장할 때 쓸 키, 캐시된 ocr_nutrients 또는 None)
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        now = time.time()
+        with self._lock:
+            self._evict(now)
+            if digest in self._index:
+                value = self._read(digest)
+                if value is not None:
+                    self._stats["exact_hits"] += 1
+                    return CacheKey(digest, self._index[digest][0]), value
+
+        # 정확히 같은 파일이 없으면 지각 해시로 비슷한 사진 검색 (디코딩은 락 밖에서)
+        # max_distance 가 0 이하면 검색하지 않으므로 디코딩도 하지 않고 phash 없이 저장
+        phash = perceptual_hash(data) if self.max_distance > 0 else None
+        key = CacheKey(digest, phash)
+        with self._lock:
+            if phash is not None:
+                near = self._find_near(phash)
+                if near is not None:
+                    value = self._read(near)
+                    if value is not None:
+                        self._stats["near_hits"] += 1
+                        return key, value
+            self._stats["misses"] += 1
+        return key, None
+
+    def store(self, key: CacheKey, value: Any):
+        """OCR 결과 저장"""
+        path = self._path(key.digest, key.phash)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"ocr_nutrients": value}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._index.pop(key.digest, None)
+            self._index[key.digest] = (key.phash, time.time())
+            self._remember(key.digest, value)
+            self._stats["stores"] += 1
+            self._evict(time.time())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+            stats["disk_entries"] = len(self._index)
+        lookups = stats["exact_hits"] + stats["near_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["exact_hits"] + stats["near_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+ocr_cache = OCRResultCache()
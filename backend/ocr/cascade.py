@@ -0,0 +1,129 @@
+#신뢰도 기반 OCR 캐스케이드 (가벼운 단계부터 시도하고 실패할 때만 무거운 전처리)
+
+import os
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ocr.constants import OCR_NUTRIENTS
+from ocr.extractor import NutrientMatcher, looks_like_nutrition_table
+from ocr.preprocess import PreprocessPipeline
+
+# 이 영양소들이 모두 충분한 신뢰도로 읽혀야 해당 단계에서 종료
+OCR_CASCADE_REQUIRED = [name.strip() for name in os.getenv("OCR_CASCADE_REQUIRED", "열량,나트륨").split(",")
+                        if name.strip()]
+OCR_CASCADE_MIN_CONFIDENCE = float(os.getenv("OCR_CASCADE_MIN_CONFIDENCE", "0.5"))
+# 빠른 단계 다음에 차례로 시도할 이진화 방법
+OCR_CASCADE_METHODS = [method.strip() for method in os.getenv("OCR_CASCADE_METHODS", "adaptive,otsu").split(",")
+                       if method.strip()]
+
+# 모든 단계를 거쳐도 필수 영양소를 충분한 신뢰도로 읽지 못한 경우의 결과 (CascadeStats 에 따로 집계)
+EXHAUSTED = "exhausted"
+
+# /upload 에서 화면에 보여줄 영양소 매처
+OCR_NUTRIENT_MATCHER = NutrientMatcher({name: keywords for name, (_, keywords) in OCR_NUTRIENTS.items()})
+
+
+def _tiers(pipeline: PreprocessPipeline, crop_table: bool) -> List[Tuple[str, Callable[[], Optional[np.ndarray]]]]:
+    """(단계 이름, 이미지 생성 함수) 목록 - 가벼운 단계부터"""
+    tiers = [("fast", pipeline.fast)]
+    for method in OCR_CASCADE_METHODS:
+        tiers.append((method, lambda method=method: pipeline.variant(method, crop_table)))
+    return tiers
+
+
+def run_cascade(pipeline: PreprocessPipeline, reader, crop_table: bool = False,
+                progress: Optional[Callable[..., None]] = None) -> Optional[Dict[str, Any]]:
+    """
+    가벼운 단계부터 OCR하고, 필수 영양소가 빠졌거나 신뢰도가 낮을 때만 다음 단계로 넘어감
+
+    단계마다 readtext(detail=1)로 라인별 신뢰도를 받아, 영양소 값이 나온 라인의 신뢰도를 그 값의
+    신뢰도로 씁니다. 여러 단계를 거치면 영양소마다 신뢰도가 가장 높은 값을 남깁니다.
+
+    Args:
+        pipeline: 이미지 한 장의 전처리 파이프라인
+        reader: EasyOCR 리더
+        crop_table: 무거운 단계에서 영양성분표 영역만 잘라서 OCR (표가 아니면 전체 이미지로 다시 시도)
+        progress: 단계마다 progress("preprocess", tier=단계 이름) 로 진행 상황을 알릴 함수
+
+    Returns:
+        {"values": 영양소 값, "confidences": 값별 신뢰도,
+         "tier": 조건을 만족해 종료한 단계 (끝까지 만족하지 못했으면 EXHAUSTED),
+         "lines": 고른 값이 나온 단계들의 텍스트 (단계 순서, 값이 하나도 없으면 마지막 단계 텍스트),
+         "table_retries": 잘라낸 표 영역이 영양성분표가 아니어서 전체 이미지로 다시 OCR한 횟수}
+        또는 None (이미지 불러오기 실패)
+    """
+    best: Dict[str, Tuple[float, float, str]] = {}  # 영양소 -> (값, 신뢰도, 단계)
+    tier_lines: Dict[str, List[str]] = {}
+    exit_tier, lines = EXHAUSTED, []
+    table_retries = 0
+
+    for tier, make_image in _tiers(pipeline, crop_table):
+        if progress is not None:
+            progress("preprocess", tier=tier)
+        image = make_image()
+        if image is None:
+            return None
+        detections = reader.readtext(image, detail=1)
+
+        if tier != "fast" and crop_table and pipeline.table_bbox is not None \
+                and not looks_like_nutrition_table([text for _, text, _ in detections]):
+            # 잘라낸 영역이 영양성분표가 아니었으면 같은 방법으로 전체 이미지 OCR
+            table_retries += 1
+            detections = reader.readtext(pipeline.variant(tier), detail=1)
+
+        lines = tier_lines[tier] = [text for _, text, _ in detections]
+        confidences = [float(confidence) for _, _, confidence in detections]
+        for name, (value, index) in OCR_NUTRIENT_MATCHER.match_with_sources(lines).items():
+            if name not in best or confidences[index] > best[name][1]:
+                best[name] = (value, confidences[index], tier)
+
+        if all(name in best and best[name][1] >= OCR_CASCADE_MIN_CONFIDENCE for name in OCR_CASCADE_REQUIRED):
+            exit_tier = tier
+            break
+
+    source_tiers = {source for _, _, source in best.values()}
+    if source_tiers:
+        lines = [line for name, text in tier_lines.items() if name in source_tiers for line in text]
+    return {
+        "values": {name: value for name, (value, _, _) in best.items()},
+        "confidences": {name: round(confidence, 3) for name, (_, confidence, _) in best.items()},
+        "tier": exit_tier,
+        "lines": lines,
+        "table_retries": table_retries,
+    }
+
+
+class CascadeStats:
+    """
+    캐스케이드가 어느 단계에서 끝났는지 세는 카운터 (메인 프로세스용, 끝까지 실패한 경우는 EXHAUSTED)
+
+    표 영역을 잘못 잘라 전체 이미지로 다시 OCR한 횟수(table_retries)도 함께 셉니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._exits: Counter = Counter()
+        self._table_retries = 0
+
+    def record(self, tier: str, table_retries: int = 0):
+        with self._lock:
+            self._exits[tier] += 1
+            self._table_retries += table_retries
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            exits = dict(self._exits)
+            table_retries = self._table_retries
+        total = sum(exits.values())
+        return {
+            "total": total,
+            "exits": exits,
+            "exit_rates": {tier: round(count / total, 4) for tier, count in exits.items()} if total else {},
+            "table_retries": table_retries,
+        }
+
+
+cascade_stats = CascadeStats()
@@ -17,4 +17,14 @@ NUTRIENT_BASES = {
         "fat": 70,
         "sat_fat": 20
     }
-}
\ No newline at end of file
+}
+
+# 업로드 화면에 보여줄 영양소: 이름 → (단위, OCR 키워드)
+OCR_NUTRIENTS = {
+    "열량": ("kcal", ["열량", "kcal", "칼로리"]),
+    "단백질": ("g", ["단백질", "protein"]),
+    "나트륨": ("mg", ["나트륨", "나트롬", "나트룹", "염분"]),
+    "당류": ("g", ["당류", "당료", "sugar"]),
+    "지방": ("g", ["지방", "fat"]),
+    "포화지방": ("g", ["포화지방", "satfat", "saturated"]),
+}
@@ -2,37 +2,40 @@ import re
 from typing import List, Dict, Optional, Tuple
 import numpy as np
 
-def extract_value(lines, keywords):
-    replace_map = {
-        'O': '0', 'o': '0',
-        'I': '1', 'l': '1',
-        'Z': '2', 'S': '5',
-        'B': '8', 'A': '4',
-        'G': '6', 'g': '9',
-        'D': '0', 'd': '0'
-    }
+# extract_value 에서 사용하는 OCR 문자 오류 수정 매핑
+VALUE_REPLACE_MAP = {
+    'O': '0', 'o': '0',
+    'I': '1', 'l': '1',
+    'Z': '2', 'S': '5',
+    'B': '8', 'A': '4',
+    'G': '6', 'g': '9',
+    'D': '0', 'd': '0'
+}
 
-    def normalize_token(token):
-        token = token.replace(',', '.')  # OCR 콤마 → 점 처리
-        return ''.join(replace_map.get(c, c) for c in token)
+# 쉼표 → 점, OCR 문자 오류 수정을 한 번에 적용하는 변환표
+_VALUE_TRANSLATION = str.maketrans({',': '.', **VALUE_REPLACE_MAP})
 
+def _first_token_number(line: str) -> Optional[float]:
+    """공백으로 나눈 토큰 중 숫자로 읽히는 첫 토큰의 값"""
+    for token in line.translate(_VALUE_TRANSLATION).split():
+        try:
+            return float(''.join(c for c in token if c.isdigit() or c == '.'))
+        except:
+            continue
+    return None
+
+def extract_value(lines, keywords):
     for idx, line in enumerate(lines):
         norm_line = line.replace(" ", "").lower()
         for keyword in keywords:
             if keyword in norm_line:
-                for token in line.split():
-                    token = normalize_token(token)
-                    try:
-                        return float(''.join(c for c in token if c.isdigit() or c == '.'))
-                    except:
-                        continue
+                value = _first_token_number(line)
+                if value is not None:
+                    return value
                 if idx + 1 < len(lines):
-                    for token in lines[idx + 1].split():
-                        token = normalize_token(token)
-                        try:
-                            return float(''.join(c for c in token if c.isdigit() or c == '.'))
-                        except:
-                            continue
+                    value = _first_token_number(lines[idx + 1])
+                    if value is not None:
+                        return value
     return 0.0
 
 
@@ -66,6 +69,32 @@ def extract_calorie(lines):
                     continue
     return 0.0
 
+# 영양성분 키워드 매핑
+NUTRITION_KEYWORDS = {
+    '열량': ['열량', '칼로리', 'kcal', 'energy', '총열량'],
+    '탄수화물': ['탄수화물', 'carbohydrate', 'carb', '당질'],
+    '단백질': ['단백질', 'protein', 'pro'],
+    '지방': ['지방', 'fat', '지질'],
+    '당류': ['당류', 'sugar', 'sugars'],
+    '나트륨': ['나트륨', 'sodium', 'na'],
+    '포화지방': ['포화지방', 'saturated fat', '포화지방산'],
+    '트랜스지방': ['트랜스지방', 'trans fat', '트랜스지방산'],
+    '콜레스테롤': ['콜레스테롤', 'cholesterol'],
+    '식이섬유': ['식이섬유', 'dietary fiber', '섬유질'],
+    '칼슘': ['칼슘', 'calcium', 'ca'],
+    '철': ['철', 'iron', 'fe'],
+    '칼륨': ['칼륨', 'potassium', 'k'],
+    '인': ['인', 'phosphorus', 'p'],
+    '비타민a': ['비타민a', 'vitamin a', 'vit a'],
+    '비타민c': ['비타민c', 'vitamin c', 'vit c'],
+    '비타민d': ['비타민d', 'vitamin d', 'vit d'],
+    '비타민e': ['비타민e', 'vitamin e', 'vit e'],
+    '비타민b1': ['비타민b1', 'vitamin b1', 'thiamin'],
+    '비타민b2': ['비타민b2', 'vitamin b2', 'riboflavin'],
+    '니아신': ['니아신', 'niacin'],
+    '엽산': ['엽산', 'folate', 'folic acid']
+}
+
 def extract_nutrition_info(lines: List[str]) -> Dict[str, float]:
     """
     영양성분표에서 모든 영양성분을 추출하는 함수
@@ -78,39 +107,62 @@ def extract_nutrition_info(lines: List[str]) -> Dict[str, float]:
     """
     nutrition_data = {}
     
-    # 영양성분 키워드 매핑
-    nutrition_keywords = {
-        '열량': ['열량', '칼로리', 'kcal', 'energy', '총열량'],
-        '탄수화물': ['탄수화물', 'carbohydrate', 'carb', '당질'],
-        '단백질': ['단백질', 'protein', 'pro'],
-        '지방': ['지방', 'fat', '지질'],
-        '당류': ['당류', 'sugar', 'sugars'],
-        '나트륨': ['나트륨', 'sodium', 'na'],
-        '포화지방': ['포화지방', 'saturated fat', '포화지방산'],
-        '트랜스지방': ['트랜스지방', 'trans fat', '트랜스지방산'],
-        '콜레스테롤': ['콜레스테롤', 'cholesterol'],
-        '식이섬유': ['식이섬유', 'dietary fiber', '섬유질'],
-        '칼슘': ['칼슘', 'calcium', 'ca'],
-        '철': ['철', 'iron', 'fe'],
-        '칼륨': ['칼륨', 'potassium', 'k'],
-        '인': ['인', 'phosphorus', 'p'],
-        '비타민a': ['비타민a', 'vitamin a', 'vit a'],
-        '비타민c': ['비타민c', 'vitamin c', 'vit c'],
-        '비타민d': ['비타민d', 'vitamin d', 'vit d'],
-        '비타민e': ['비타민e', 'vitamin e', 'vit e'],
-        '비타민b1': ['비타민b1', 'vitamin b1', 'thiamin'],
-        '비타민b2': ['비타민b2', 'vitamin b2', 'riboflavin'],
-        '니아신': ['니아신', 'niacin'],
-        '엽산': ['엽산', 'folate', 'folic acid']
-    }
-    
-    for nutrition_name, keywords in nutrition_keywords.items():
-        value = extract_nutrition_value(lines, keywords)
+    # 키워드마다 전체 라인을 다시 훑지 않고, 컴파일된 매처로 한 번에 모든 영양성분을 찾음
+    for nutrition_name, value in _NUTRITION_TABLE_MATCHER.match(lines).items():
         if value is not None and value > 0:
             nutrition_data[nutrition_name] = value
     
     return nutrition_data
 
+# extract_nutrition_value 에서 사용하는 OCR 오류 수정 매핑
+NUMBER_REPLACE_MAP = {
+    'O': '0', 'o': '0', 'I': '1', 'l': '1', 'Z': '2', 'S': '5', 'B': '8', 'A': '4',
+    'G': '6', 'D': '0', 'd': '0', 'Q': '0', 'q': '0'
+}
+
+_NUMBER_PATTERN = re.compile(r'(\d+\.?\d+)')
+
+def _clean_and_extract_number(text: str, keywords: List[str], fixed: Optional[str] = None) -> Optional[float]:
+    """
+    텍스트에서 숫자 추출 및 정리
+
+    Args:
+        text: 원본 텍스트
+        keywords: 영양성분 키워드들 (키워드 뒤의 첫번째 숫자를 우선 사용)
+        fixed: 단위 오류 수정과 쉼표 변환을 미리 적용한 텍스트 (재사용용, 없으면 계산)
+    """
+    if fixed is None:
+        # 1. OCR 단위 관련 오류 우선 수정 (e.g., "2.69" -> "2.6g")
+        # 2. 쉼표를 소수점으로 변환
+        fixed = fix_ocr_unit_errors(text).replace(',', '.')
+    text = fixed
+    text_lower = text.lower()
+
+    # 3. 숫자와 단위를 찾기 위한 정규식
+    # 예: "2.6g", "150 kcal", "85mg"
+    # 키워드와 값이 한 줄에 같이 있는 경우가 많으므로, 키워드 뒤의 첫번째 숫자를 타겟팅합니다.
+    for keyword in keywords:
+        if keyword in text_lower:
+            # 키워드 이후의 텍스트에서 숫자 검색
+            sub_text = text[text_lower.find(keyword) + len(keyword):]
+            match = _NUMBER_PATTERN.search(sub_text)
+            if match:
+                break
+    else:
+        # 키워드가 없다면, 텍스트 전체에서 숫자 검색
+        match = _NUMBER_PATTERN.search(text)
+
+    if match:
+        number_str = match.group(1)
+        # 숫자 부분에 대해 OCR 문자 오류 수정
+        corrected_number_str = ''.join(NUMBER_REPLACE_MAP.get(c, c) for c in number_str)
+        try:
+            return float(corrected_number_str)
+        except ValueError:
+            return None
+    
+    return None
+
 def extract_nutrition_value(lines: List[str], keywords: List[str]) -> Optional[float]:
     """
     특정 영양성분의 값을 추출하는 함수
@@ -122,64 +174,25 @@ def extract_nutrition_value(lines: List[str], keywords: List[str]) -> Optional[f
     Returns:
         추출된 값 (실패시 None)
     """
-    # OCR 오류 수정 매핑
-    replace_map = {
-        'O': '0', 'o': '0', 'I': '1', 'l': '1', 'Z': '2', 'S': '5', 'B': '8', 'A': '4',
-        'G': '6', 'D': '0', 'd': '0', 'Q': '0', 'q': '0'
-    }
-    
-    def clean_and_extract_number(text: str) -> Optional[float]:
-        """텍스트에서 숫자 추출 및 정리"""
-        # 1. OCR 단위 관련 오류 우선 수정 (e.g., "2.69" -> "2.6g")
-        text = fix_ocr_unit_errors(text)
-
-        # 2. 쉼표를 소수점으로 변환
-        text = text.replace(',', '.')
-
-        # 3. 숫자와 단위를 찾기 위한 정규식
-        # 예: "2.6g", "150 kcal", "85mg"
-        # 키워드와 값이 한 줄에 같이 있는 경우가 많으므로, 키워드 뒤의 첫번째 숫자를 타겟팅합니다.
-        for keyword in keywords:
-            if keyword in text.lower():
-                # 키워드 이후의 텍스트에서 숫자 검색
-                sub_text = text[text.lower().find(keyword) + len(keyword):]
-                match = re.search(r'(\d+\.?\d+)', sub_text)
-                if match:
-                    break
-        else:
-            # 키워드가 없다면, 텍스트 전체에서 숫자 검색
-            match = re.search(r'(\d+\.?\d+)', text)
-
-        if match:
-            number_str = match.group(1)
-            # 숫자 부분에 대해 OCR 문자 오류 수정
-            corrected_number_str = ''.join(replace_map.get(c, c) for c in number_str)
-            try:
-                return float(corrected_number_str)
-            except ValueError:
-                return None
-        
-        return None
-
     for i, line in enumerate(lines):
         line_lower = line.lower()
         
         # 키워드가 포함된 라인 찾기
         if any(keyword in line_lower for keyword in keywords):
             # 현재 라인에서 숫자 추출
-            value = clean_and_extract_number(line)
+            value = _clean_and_extract_number(line, keywords)
             if value is not None:
                 return value
             
             # 다음 라인에서 숫자 추출 (테이블 형태인 경우)
             if i + 1 < len(lines):
-                value = clean_and_extract_number(lines[i + 1])
+                value = _clean_and_extract_number(lines[i + 1], keywords)
                 if value is not None:
                     return value
             
             # 이전 라인에서 숫자 추출
             if i > 0:
-                value = clean_and_extract_number(lines[i - 1])
+                value = _clean_and_extract_number(lines[i - 1], keywords)
                 if value is not None:
                     return value
     
@@ -333,3 +346,128 @@ def calculate_daily_values(nutrition_data: Dict[str, float]) -> Dict[str, float]
             percentages[f'{nutrient}_dv'] = round(percentage, 1)
     
     return percentages
+
+def _partially_overlaps(left: str, right: str) -> bool:
+    """left 의 끝부분이 right 의 앞부분과 겹치면서 right 가 left 밖으로 이어지는지 여부"""
+    for start in range(1, len(left)):
+        suffix = left[start:]
+        if len(suffix) < len(right) and right.startswith(suffix):
+            return True
+    return False
+
+class NutrientMatcher:
+    """
+    여러 영양성분의 키워드를 한 번에 찾는 컴파일된 추출기
+
+    모든 키워드를 하나의 정규식으로 묶어 라인마다 한 번만 훑고, 찾은 키워드에서 바로 영양성분을 찾습니다.
+    라인 정규화와 숫자 파싱 결과는 라인별로 한 번만 계산합니다.
+
+    mode
+        "token": extract_value 와 같은 방식 (공백 제거 후 매칭, 현재 → 다음 라인의 첫 숫자 토큰)
+        "table": extract_nutrition_value 와 같은 방식 (현재 → 다음 → 이전 라인, 키워드 뒤 숫자 우선)
+
+    같은 라인 목록에 대해 영양성분별로 기존 함수를 호출한 것과 같은 값을 반환합니다.
+    """
+
+    def __init__(self, keyword_map: Dict[str, List[str]], mode: str = "token"):
+        if mode not in ("token", "table"):
+            raise ValueError(f"지원하지 않는 mode: {mode}")
+        self.mode = mode
+        self.keyword_map = {name: list(keywords) for name, keywords in keyword_map.items()}
+
+        all_keywords = sorted({k for keywords in self.keyword_map.values() for k in keywords},
+                              key=len, reverse=True)
+        self._pattern = re.compile('|'.join(re.escape(k) for k in all_keywords))
+
+        # 키워드 → 그 키워드가 라인에 있으면 함께 포함되는 모든 키워드의 영양성분들
+        # (정규식은 겹치지 않게 가장 긴 키워드만 돌려주므로, 그 안에 든 짧은 키워드도 함께 처리. 예: "포화지방" 안의 "지방")
+        self._owners: Dict[str, Tuple[str, ...]] = {}
+        for keyword in all_keywords:
+            self._owners[keyword] = tuple(
+                name for name, keywords in self.keyword_map.items()
+                if any(k in keyword for k in keywords)
+            )
+
+        # 다른 키워드의 끝부분과 걸쳐서 나타날 수 있는 키워드는 정규식 결과에서 빠질 수 있으므로 따로 확인
+        # (예: "sugar" 와 "riboflavin" → "sugariboflavin")
+        self._overlapping = [
+            keyword for keyword in all_keywords
+            if any(_partially_overlaps(other, keyword) for other in all_keywords)
+        ]
+
+    def _normalize(self, line: str) -> str:
+        if self.mode == "token":
+            return line.replace(" ", "").lower()
+        return line.lower()
+
+    def match_with_sources(self, lines: List[str]) -> Dict[str, Tuple[float, int]]:
+        """
+        라인들을 한 번 훑어서 모든 영양성분 값을 추출
+
+        Returns:
+            영양성분 이름 → (값, 값을 읽은 라인 인덱스), 찾지 못한 영양성분은 제외
+        """
+        results: Dict[str, Tuple[float, int]] = {}
+        remaining = len(self.keyword_map)
+        parsed: Dict[int, Optional[float]] = {}
+        fixed: Dict[int, str] = {}
+        offsets = (0, 1) if self.mode == "token" else (0, 1, -1)
+        line_count = len(lines)
+
+        for i, line in enumerate(lines):
+            norm_line = self._normalize(line)
+            found = self._pattern.findall(norm_line)
+            if self._overlapping:
+                found.extend(k for k in self._overlapping if k in norm_line)
+            if not found:
+                continue
+
+            for keyword in set(found):
+                for name in self._owners[keyword]:
+                    if name in results:
+                        continue
+                    for offset in offsets:
+                        j = i + offset
+                        if j < 0 or j >= line_count:
+                            continue
+                        if self.mode == "token":
+                            if j not in parsed:
+                                parsed[j] = _first_token_number(lines[j])
+                            value = parsed[j]
+                        else:
+                            if j not in fixed:
+                                fixed[j] = fix_ocr_unit_errors(lines[j]).replace(',', '.')
+                            value = _clean_and_extract_number(lines[j], self.keyword_map[name], fixed[j])
+                        if value is not None:
+                            results[name] = (value, j)
+                            remaining -= 1
+                            break
+
+            if not remaining:
+                break
+
+        return {name: results[name] for name in self.keyword_map if name in results}
+
+    def match(self, lines: List[str]) -> Dict[str, float]:
+        """영양성분 이름 → 추출된 값 (찾지 못한 영양성분은 제외)"""
+        return {name: value for name, (value, _) in self.match_with_sources(lines).items()}
+
+
+_NUTRITION_TABLE_MATCHER = NutrientMatcher(NUTRITION_KEYWORDS, mode="table")
+
+# 영양성분표라면 거의 항상 들어 있는 주요 영양성분 (한 글자 키워드처럼 오탐이 많은 키워드는 제외)
+_CORE_NUTRIENT_MATCHER = NutrientMatcher({
+    name: [k for k in NUTRITION_KEYWORDS[name] if len(k) > 2 or not k.isascii()]
+    for name in ['열량', '탄수화물', '단백질', '지방', '당류', '나트륨']
+})
+
+def looks_like_nutrition_table(lines: List[str], min_nutrients: int = 2) -> bool:
+    """
+    OCR 결과가 영양성분표를 담고 있는지 판단
+
+    영양성분표 시작 키워드가 있거나 주요 영양성분 값이 min_nutrients 개 이상 읽히면 True
+    (잘라낸 표 영역이 맞는지 확인하고, 아니면 전체 이미지로 다시 OCR하기 위해 사용)
+    """
+    if extract_nutrition_table_region(lines):
+        return True
+    return len(_CORE_NUTRIENT_MATCHER.match(lines)) >= min_nutrients
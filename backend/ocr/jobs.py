@@ -0,0 +1,391 @@
+#비동기 OCR 작업 큐 (작업 ID를 바로 돌려주고 진행 단계는 조회 / WebSocket 으로 알림)
+#
+# 작업과 이미지는 로컬 SQLite 파일에 저장하므로 서버가 재시작되어도 대기 중이거나 실행 중이던 작업은
+# 다시 대기열에 올라가고, 끝난 작업의 결과도 보관 기간 동안 조회할 수 있습니다.
+
+import asyncio
+import json
+import os
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from ocr.worker import OCRBusyError, OCRTimeoutError
+
+OCR_JOB_DB = os.getenv(
+    "OCR_JOB_DB",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "ocr_jobs.sqlite3"),
+)
+# 동시에 OCR 풀에 넘기는 작업 수 (0이면 OCR 풀 워커 수)
+OCR_JOB_CONCURRENCY = int(os.getenv("OCR_JOB_CONCURRENCY", "0"))
+# 대기 중인 작업이 이 수를 넘으면 새 작업을 받지 않음
+OCR_JOB_MAX_QUEUED = int(os.getenv("OCR_JOB_MAX_QUEUED", "100"))
+# 조회도 WebSocket 연결도 없이 이 시간(초)이 지난 대기 작업은 클라이언트가 떠난 것으로 보고 취소
+OCR_JOB_ABANDON_AFTER = float(os.getenv("OCR_JOB_ABANDON_AFTER", "30"))
+# 작업 보관 시간 (초, 등록 시각 기준 - 지난 작업은 끝난 것만 삭제)
+OCR_JOB_RETENTION = float(os.getenv("OCR_JOB_RETENTION", "3600"))
+# OCR 풀이 가득 찼을 때 다시 시도하기까지 기다리는 시간 (초)
+OCR_JOB_BUSY_RETRY = float(os.getenv("OCR_JOB_BUSY_RETRY", "0.5"))
+
+# 작업 상태와 진행 단계
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINAL_STATUSES = (DONE, FAILED, CANCELLED)
+# report 로 받을 수 있는 진행 단계 (워커: decode → preprocess → detect → recognize, 메인 프로세스: extract)
+STAGES = ("decode", "preprocess", "detect", "recognize", "extract")
+
+# runner(job_id, 이미지 바이트) -> 화면에 보여줄 영양소 목록 (이미지를 읽을 수 없으면 None)
+JobRunner = Callable[[str, bytes], Awaitable[Optional[List[Dict[str, Any]]]]]
+
+
+class JobNotCancellableError(Exception):
+    """이미 실행 중이거나 끝난 작업은 취소할 수 없음"""
+
+
+class OCRJob:
+    """작업 하나의 현재 상태 (메모리)"""
+
+    __slots__ = ("id", "user_id", "status", "stage", "tier", "result", "error", "created", "last_seen", "listeners")
+
+    def __init__(self, job_id: str, user_id: str, status: str = QUEUED, created: Optional[float] = None):
+        self.id = job_id
+        self.user_id = user_id
+        self.status = status
+        self.stage: Optional[str] = None
+        self.tier: Optional[str] = None
+        self.result: Optional[List[Dict[str, Any]]] = None
+        self.error: Optional[str] = None
+        self.created = created if created is not None else time.time()
+        # 클라이언트가 마지막으로 확인한 시각 (monotonic)
+        self.last_seen = time.monotonic()
+        self.listeners: Set[asyncio.Queue] = set()
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {"job_id": self.id, "status": self.status, "stage": self.stage}
+        if self.tier is not None:
+            data["tier"] = self.tier
+        if self.status == DONE:
+            data["ocr_nutrients"] = self.result
+        if self.error is not None:
+            data["error"] = self.error
+        return data
+
+
+class OCRJobStore:
+    """
+    작업 영구 저장소 (SQLite 파일 하나)
+
+    연결 하나를 전용 스레드 하나에서만 쓰므로 쓰기가 서로 겹치지 않습니다.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS ocr_jobs (
+            id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            status TEXT NOT NULL,
+            image BLOB,
+            result TEXT,
+            error TEXT,
+            created REAL NOT NULL,
+            updated REAL NOT NULL
+        )
+    """
+
+    def __init__(self, path: str = OCR_JOB_DB):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ocr-jobs")
+        self._conn: Optional[sqlite3.Connection] = None
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(self.SCHEMA)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ocr_jobs_status ON ocr_jobs (status, created)")
+        self._conn.commit()
+
+    def _recover(self) -> List[sqlite3.Row]:
+        # 재시작 전에 실행 중이던 작업은 끝나지 않았으므로 다시 대기 상태로
+        with self._conn:
+            self._conn.execute("UPDATE ocr_jobs SET status = ?, updated = ? WHERE status = ?",
+                               (QUEUED, time.time(), RUNNING))
+        return self._conn.execute("SELECT id, user_id, created FROM ocr_jobs WHERE status = ? ORDER BY created",
+                                  (QUEUED,)).fetchall()
+
+    def _insert(self, job: OCRJob, image: Optional[bytes]):
+        result = json.dumps(job.result, ensure_ascii=False) if job.result is not None else None
+        with self._conn:
+            self._conn.execute(
+                "INSERT INTO ocr_jobs (id, user_id, status, image, result, created, updated) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job.id, job.user_id, job.status, image, result, job.created, time.time()),
+            )
+
+    def _update(self, job: OCRJob):
+        result = json.dumps(job.result, ensure_ascii=False) if job.result is not None else None
+        # 끝난 작업의 이미지는 더 이상 필요 없으므로 비움
+        image_clause = ", image = NULL" if job.status in FINAL_STATUSES else ""
+        with self._conn:
+            self._conn.execute(
+                f"UPDATE ocr_jobs SET status = ?, result = ?, error = ?, updated = ?{image_clause} WHERE id = ?",
+                (job.status, result, job.error, time.time(), job.id),
+            )
+
+    def _image(self, job_id: str) -> Optional[bytes]:
+        row = self._conn.execute("SELECT image FROM ocr_jobs WHERE id = ?", (job_id,)).fetchone()
+        return row["image"] if row is not None else None
+
+    def _get(self, job_id: str) -> Optional[sqlite3.Row]:
+        return self._conn.execute("SELECT id, user_id, status, result, error, created FROM ocr_jobs WHERE id = ?",
+                                  (job_id,)).fetchone()
+
+    def _purge(self, before: float) -> int:
+        with self._conn:
+            cursor = self._conn.execute(
+                f"DELETE FROM ocr_jobs WHERE status IN ({', '.join('?' * len(FINAL_STATUSES))}) AND created < ?",
+                (*FINAL_STATUSES, before),
+            )
+        return cursor.rowcount
+
+    async def open(self) -> List[sqlite3.Row]:
+        """파일을 열고 대기열에 다시 올릴 작업 목록 반환"""
+        await self._run(self._open)
+        return await self._run(self._recover)
+
+    async def insert(self, job: OCRJob, image: Optional[bytes]):
+        await self._run(self._insert, job, image)
+
+    async def update(self, job: OCRJob):
+        await self._run(self._update, job)
+
+    async def image(self, job_id: str) -> Optional[bytes]:
+        return await self._run(self._image, job_id)
+
+    async def get(self, job_id: str) -> Optional[sqlite3.Row]:
+        return await self._run(self._get, job_id)
+
+    async def purge(self, before: float) -> int:
+        return await self._run(self._purge, before)
+
+    def close(self):
+        def close():
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        self._executor.submit(close)
+        self._executor.shutdown(wait=True)
+
+
+class OCRJobQueue:
+    """
+    OCR 작업 대기열
+
+    concurrency 개의 작업자가 대기열 순서대로 작업을 꺼내 runner 로 실행합니다. OCR 풀이 /upload 요청으로
+    가득 차 있으면 잠시 기다렸다가 다시 시도합니다. 꺼낸 작업을 아무도 조회하거나 구독하지 않은 채
+    abandon_after 초가 지났으면 실행하지 않고 취소합니다. 이벤트 루프에서만 사용합니다.
+    """
+
+    def __init__(self, store: Optional[OCRJobStore] = None, max_queued: int = OCR_JOB_MAX_QUEUED,
+                 abandon_after: float = OCR_JOB_ABANDON_AFTER, retention: float = OCR_JOB_RETENTION):
+        self.store = store or OCRJobStore()
+        self.max_queued = max_queued
+        self.abandon_after = abandon_after
+        self.retention = retention
+        self._jobs: Dict[str, OCRJob] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._runner: Optional[JobRunner] = None
+        self._stats = {"submitted": 0, "done": 0, "failed": 0, "cancelled": 0, "abandoned": 0, "recovered": 0}
+
+    async def start(self, runner: JobRunner, concurrency: int):
+        """저장된 작업을 불러와 대기열에 올리고 작업자 시작"""
+        self._runner = runner
+        self._queue = asyncio.Queue()
+        for row in await self.store.open():
+            job = OCRJob(row["id"], row["user_id"], created=row["created"])
+            self._jobs[job.id] = job
+            self._queue.put_nowait(job.id)
+            self._stats["recovered"] += 1
+        if self._stats["recovered"]:
+            print(f"OCR 작업 {self._stats['recovered']}개를 다시 대기열에 올림")
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(max(1, concurrency))]
+        self._tasks.append(asyncio.create_task(self._purge_loop()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # 실행 중이던 작업은 저장소에 running 으로 남아 있다가 다음 시작 때 다시 대기열로 올라감
+        self.store.close()
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for job in self._jobs.values() if job.status == QUEUED)
+
+    async def submit(self, user_id, image: bytes,
+                     result: Optional[List[Dict[str, Any]]] = None) -> OCRJob:
+        """
+        작업 등록 (대기열이 가득 차면 OCRBusyError)
+
+        result 를 주면(캐시 적중 등) OCR 없이 바로 끝난 작업으로 등록합니다.
+        """
+        job = OCRJob(uuid.uuid4().hex, str(user_id))
+        if result is not None:
+            job.status, job.result = DONE, result
+            await self.store.insert(job, None)
+            self._jobs[job.id] = job
+            self._stats["done"] += 1
+            return job
+
+        if self.queued >= self.max_queued:
+            raise OCRBusyError()
+        await self.store.insert(job, image)
+        self._jobs[job.id] = job
+        self._queue.put_nowait(job.id)
+        self._stats["submitted"] += 1
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """작업 상태 (조회한 것으로 기록해서 대기 작업이 취소되지 않게 함)"""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            job.last_seen = time.monotonic()
+            return job.to_dict()
+        # 재시작 전에 끝난 작업
+        row = await self.store.get(job_id)
+        if row is None:
+            return None
+        job = OCRJob(row["id"], row["user_id"], status=row["status"], created=row["created"])
+        job.result = json.loads(row["result"]) if row["result"] is not None else None
+        job.error = row["error"]
+        return job.to_dict()
+
+    def subscribe(self, job_id: str) -> Optional[asyncio.Queue]:
+        """작업 상태가 바뀔 때마다 to_dict() 를 받는 큐 (메모리에 없는 작업이면 None)"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        listener: asyncio.Queue = asyncio.Queue()
+        job.listeners.add(listener)
+        listener.put_nowait(job.to_dict())
+        return listener
+
+    def unsubscribe(self, job_id: str, listener: asyncio.Queue):
+        job = self._jobs.get(job_id)
+        if job is not None:
+            job.listeners.discard(listener)
+            # 연결이 끊긴 시점부터 abandon_after 동안은 다시 연결하거나 조회할 수 있음
+            job.last_seen = time.monotonic()
+
+    async def cancel(self, job_id: str) -> bool:
+        """대기 중인 작업 취소 (없으면 False, 이미 실행 중이거나 끝났으면 JobNotCancellableError)"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return False
+        if job.status != QUEUED:
+            raise JobNotCancellableError()
+        await self._finish(job, CANCELLED, error="취소된 작업입니다.")
+        return True
+
+    def report(self, job_id: str, stage: str, tier: Optional[str] = None):
+        """실행 중인 작업의 진행 단계 갱신 (OCR 워커 프로세스에서 보낸 단계도 여기로 들어옴)"""
+        if stage not in STAGES:
+            raise ValueError(f"알 수 없는 OCR 진행 단계: {stage}")
+        job = self._jobs.get(job_id)
+        if job is None or job.status != RUNNING:
+            return
+        job.stage = stage
+        if tier is not None:
+            job.tier = tier
+        self._notify(job)
+
+    def _notify(self, job: OCRJob):
+        event = job.to_dict()
+        for listener in job.listeners:
+            listener.put_nowait(event)
+
+    def _abandoned(self, job: OCRJob) -> bool:
+        return not job.listeners and time.monotonic() - job.last_seen > self.abandon_after
+
+    async def _finish(self, job: OCRJob, status: str, result=None, error: Optional[str] = None):
+        job.status, job.result, job.error = status, result, error
+        if status == DONE:
+            job.stage = "done"
+        self._stats[status] += 1
+        try:
+            await self.store.update(job)
+        except sqlite3.Error as e:
+            # 메모리 상태로는 끝난 작업으로 알리고, 저장소에 남은 이전 상태는 다음 시작 때 다시 실행됨
+            print(f"OCR 작업 {job.id} 상태 저장 실패: {e!r}")
+        self._notify(job)
+
+    async def _work(self):
+        while True:
+            job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            if job is None or job.status != QUEUED:
+                continue
+            # 작업 하나의 오류로 작업자가 멈추지 않도록 (멈추면 대기열이 조용히 쌓이기만 함)
+            try:
+                if self._abandoned(job):
+                    self._stats["abandoned"] += 1
+                    await self._finish(job, CANCELLED, error="클라이언트 연결이 끊겨 취소된 작업입니다.")
+                    continue
+                await self._run(job)
+            except Exception as e:
+                print(f"OCR 작업 {job.id} 처리 중 오류: {e!r}")
+                if job.status not in FINAL_STATUSES:
+                    await self._finish(job, FAILED, error="OCR 처리 중 오류가 발생했습니다.")
+
+    async def _run(self, job: OCRJob):
+        try:
+            job.status = RUNNING
+            await self.store.update(job)
+            self._notify(job)
+            image = await self.store.image(job.id)
+            while True:
+                try:
+                    result = await self._runner(job.id, image)
+                    break
+                except OCRBusyError:
+                    # /upload 요청 등으로 OCR 풀이 가득 참 → 자리가 날 때까지 대기
+                    await asyncio.sleep(OCR_JOB_BUSY_RETRY)
+        except OCRTimeoutError:
+            await self._finish(job, FAILED, error="OCR 처리 시간이 초과되었습니다.")
+            return
+        except Exception as e:
+            print(f"OCR 작업 {job.id} 실패: {e!r}")
+            await self._finish(job, FAILED, error="OCR 처리 중 오류가 발생했습니다.")
+            return
+        if result is None:
+            await self._finish(job, FAILED, error="이미지 불러오기 실패")
+        else:
+            await self._finish(job, DONE, result=result)
+
+    async def _purge_loop(self):
+        while True:
+            await asyncio.sleep(min(60.0, self.retention))
+            cutoff = time.time() - self.retention
+            for job_id in [job.id for job in self._jobs.values()
+                           if job.status in FINAL_STATUSES and job.created < cutoff and not job.listeners]:
+                del self._jobs[job_id]
+            try:
+                await self.store.purge(cutoff)
+            except sqlite3.Error as e:
+                print(f"OCR 작업 정리 실패: {e!r}")
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        counts: Dict[str, int] = {}
+        for job in self._jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        stats["jobs"] = counts
+        return stats
+
+
+ocr_jobs = OCRJobQueue()
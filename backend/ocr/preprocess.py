@@ -1,63 +1,323 @@
 #이미지 처리 전담
 
+import io
+import os
+import time
 import cv2
 import numpy as np
-from typing import Optional, Tuple
+from PIL import Image
+from typing import Any, Dict, Optional, Tuple, Union
 
-def preprocess_image(image_path: str, method: str = "adaptive") -> Optional[np.ndarray]:
+# 전처리 작업 폭 (이보다 큰 이미지는 축소)
+MAX_WIDTH = 2000
+# 빠른 OCR 단계(PreprocessPipeline.fast)에서 쓰는 축소 폭
+FAST_MAX_WIDTH = int(os.getenv("OCR_FAST_MAX_WIDTH", "1280"))
+
+# 추정 노이즈(σ)가 이 값보다 낮으면 노이즈 제거 생략, DENOISE_GRAY_SIGMA 보다 낮으면 그레이스케일만 제거
+DENOISE_SKIP_SIGMA = float(os.getenv("DENOISE_SKIP_SIGMA", "3.0"))
+DENOISE_GRAY_SIGMA = float(os.getenv("DENOISE_GRAY_SIGMA", "8.0"))
+
+# 영양성분표 영역 검출 기준 (이미지 대비 최소/최대 면적 비율, 최소 행 구분선 수)
+TABLE_MIN_AREA_RATIO = 0.03
+TABLE_MAX_AREA_RATIO = 0.9
+TABLE_MIN_ROWS = 3
+# 행 구분선 사이 간격의 최대값 = 이미지 높이 / TABLE_ROW_GAP_DIVISOR
+TABLE_ROW_GAP_DIVISOR = 12
+
+# 이진화 후 점 노이즈 제거 단계에서 지울 최대 면적 (픽셀)
+SPECKLE_MIN_SIZE = int(os.getenv("SPECKLE_MIN_SIZE", "6"))
+
+# 노이즈 추정용 라플라시안 차분 커널 (밝기 변화는 지우고 픽셀 단위 노이즈만 남김, L2 노름 = 6)
+_NOISE_KERNEL = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+
+# 축소 디코딩 배율과 대응하는 OpenCV 플래그
+_REDUCED_MODES = [
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+]
+
+ImageSource = Union[str, bytes, bytearray, memoryview, np.ndarray]
+
+def _probe_width(data: Union[bytes, bytearray, memoryview]) -> Optional[int]:
+    """이미지 헤더만 읽어서 원본 폭을 확인"""
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            return img.size[0]
+    except Exception:
+        return None
+
+def decode_image(data: Union[bytes, bytearray, memoryview], target_width: int = MAX_WIDTH) -> Optional[np.ndarray]:
+    """
+    메모리 버퍼의 이미지를 디코딩하는 함수
+
+    원본이 target_width 의 2배 이상이면 IMREAD_REDUCED_* 모드로 축소 디코딩합니다.
+    (축소 후에도 폭이 target_width 이상이 되는 가장 큰 배율 사용)
+
+    Args:
+        data: 인코딩된 이미지 바이트
+        target_width: 전처리 작업 폭
+
+    Returns:
+        BGR 이미지 또는 None
+    """
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    if buffer.size == 0:
+        return None
+
+    flag = cv2.IMREAD_COLOR
+    width = _probe_width(data)
+    if width:
+        for factor, reduced_flag in _REDUCED_MODES:
+            if width // factor >= target_width:
+                flag = reduced_flag
+                break
+
+    return cv2.imdecode(buffer, flag)
+
+def load_image(source: ImageSource) -> Optional[np.ndarray]:
+    """경로, 바이트 버퍼, 또는 이미 디코딩된 배열에서 이미지를 불러옴"""
+    if isinstance(source, np.ndarray):
+        return source
+    if isinstance(source, str):
+        return cv2.imread(source)
+    return decode_image(source)
+
+def estimate_noise(gray: np.ndarray) -> float:
+    """
+    그레이스케일 이미지의 가우시안 노이즈 표준편차(σ) 추정
+
+    라플라시안 차분 응답의 중앙값을 사용하므로 글자 경계처럼 응답이 큰 소수의 픽셀에는 영향을 덜 받습니다.
+    (응답은 한 칸씩 건너뛰며 표본 추출 - 이미지를 줄이면 노이즈도 줄어들기 때문에 응답 쪽을 줄임)
+    """
+    response = cv2.filter2D(gray.astype(np.float32), -1, _NOISE_KERNEL)[1:-1:2, 1:-1:2]
+    if response.size == 0:
+        return 0.0
+    return float(np.median(np.abs(response)) / (0.6745 * 6))
+
+def _denoise(image: np.ndarray, mode: str, report: Optional[Dict[str, Any]]) -> np.ndarray:
+    """
+    노이즈 제거 후 그레이스케일 이미지 반환
+
+    mode
+        "auto": 추정 노이즈에 따라 "none" / "gray" / "full" 중 선택
+        "full": 컬러 이미지 전체에 fastNlMeansDenoisingColored (가장 느림, 기존 방식)
+        "gray": 그레이스케일 채널에만 fastNlMeansDenoising (컬러보다 몇 배 빠름)
+        "none": 노이즈 제거 생략
+    """
+    start = time.perf_counter()
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    if mode == "auto":
+        sigma = estimate_noise(gray)
+        if sigma < DENOISE_SKIP_SIGMA:
+            mode = "none"
+        elif sigma < DENOISE_GRAY_SIGMA:
+            mode = "gray"
+        else:
+            mode = "full"
+        if report is not None:
+            report["noise_sigma"] = round(sigma, 2)
+
+    if mode == "full":
+        denoised = cv2.fastNlMeansDenoisingColored(image, None, 10, 10, 7, 21)
+        gray = cv2.cvtColor(denoised, cv2.COLOR_BGR2GRAY)
+    elif mode == "gray":
+        gray = cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
+
+    if report is not None:
+        report["denoise"] = mode
+        report["denoise_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return gray
+
+# 지원하는 이진화 방법
+THRESHOLD_METHODS = ("adaptive", "otsu", "gaussian", "multi_scale")
+
+class PreprocessPipeline:
+    """
+    이미지 한 장에 대한 전처리 파이프라인
+
+    불러오기 → 크기 조정 → 노이즈 제거 → 대비 향상 → 블러까지의 공통 단계는 처음 필요할 때 한 번만
+    계산해서 보관하고, 여러 이진화 방법(variant)이나 표 영역/전체 이미지로 갈라져 재사용합니다.
+    요청 하나(이미지 하나) 동안만 쓰고 버리는 객체입니다.
+
+    Args:
+        image: 이미지 파일 경로, 인코딩된 이미지 바이트(버퍼), 또는 BGR 배열
+        denoise: 노이즈 제거 방식 ("auto", "full", "gray", "none")
+        remove_noise: True이면 이진화 후 작은 점 노이즈 제거 (remove_speckles)
+    """
+
+    def __init__(self, image: ImageSource, denoise: str = "auto", remove_noise: bool = False):
+        self._source = image
+        self.denoise = denoise
+        self.remove_noise = remove_noise
+        # 단계별 소요 시간(ms)과 노이즈 제거 방식, 표 영역 등을 기록
+        self.report: Dict[str, Any] = {}
+        self._cache: Dict[str, Any] = {}
+        self._nested = 0.0  # 현재 단계 안에서 계산된 앞 단계들의 시간
+
+    def _stage(self, key: str, compute):
+        """key 단계 결과를 한 번만 계산하고 소요 시간(앞 단계 계산 시간 제외)을 기록"""
+        if key not in self._cache:
+            outer_nested = self._nested
+            self._nested = 0.0
+            start = time.perf_counter()
+            self._cache[key] = compute()
+            elapsed = time.perf_counter() - start
+            stages = self.report.setdefault("stages_ms", {})
+            stages[key] = round((elapsed - self._nested) * 1000, 1)
+            self._nested = outer_nested + elapsed
+        return self._cache[key]
+
+    @property
+    def image(self) -> Optional[np.ndarray]:
+        """불러온 뒤 작업 폭으로 줄인 BGR 이미지 (불러오기 실패 시 None)"""
+        return self._stage("load", self._load)
+
+    def _load(self) -> Optional[np.ndarray]:
+        image = load_image(self._source)
+        self._source = None  # 원본 바이트는 더 이상 필요 없음
+        if image is None:
+            return None
+        
+        # 이미지 크기 조정 (너무 크거나 작은 경우)
+        height, width = image.shape[:2]
+        if width > MAX_WIDTH:
+            scale = MAX_WIDTH / width
+            new_width = int(width * scale)
+            new_height = int(height * scale)
+            image = cv2.resize(image, (new_width, new_height))
+        return image
+
+    @property
+    def gray(self) -> np.ndarray:
+        """노이즈 제거 + 그레이스케일 변환 (깨끗한 사진은 생략하거나 가벼운 방식 사용)"""
+        return self._stage("denoise", lambda: _denoise(self.image, self.denoise, self.report))
+
+    @property
+    def blurred(self) -> np.ndarray:
+        """대비 향상 + 블러까지 마친, 모든 이진화 방법이 공유하는 이미지"""
+        def compute():
+            # 대비 향상
+            clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
+            enhanced = clahe.apply(self.gray)
+            # 블러 처리로 노이즈 제거
+            return cv2.GaussianBlur(enhanced, (3, 3), 0)
+        return self._stage("enhance", compute)
+
+    @property
+    def table_bbox(self) -> Optional[Tuple[int, int, int, int]]:
+        """영양성분표 박스 위치 (없으면 None)"""
+        def compute():
+            bbox = locate_nutrition_table(self.blurred)
+            self.report["table_bbox"] = bbox
+            return bbox
+        return self._stage("locate_table", compute)
+
+    def fast(self, max_width: int = FAST_MAX_WIDTH) -> Optional[np.ndarray]:
+        """
+        노이즈 제거/이진화 없이 그레이스케일로 바꾸고 max_width 까지 줄인 이미지
+
+        OCR 캐스케이드의 첫 단계처럼 깨끗한 사진을 싸게 읽어 보는 용도입니다.
+        (불러오기 실패 시 None)
+        """
+        if self.image is None:
+            return None
+
+        def compute():
+            gray = cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY)
+            height, width = gray.shape[:2]
+            if width > max_width:
+                scale = max_width / width
+                gray = cv2.resize(gray, (max_width, int(height * scale)), interpolation=cv2.INTER_AREA)
+            return gray
+
+        return self._stage(f"fast/{max_width}", compute)
+
+    def base(self, crop_table: bool = False) -> np.ndarray:
+        """이진화 직전 이미지 (crop_table 이면 영양성분표 영역만, 찾지 못하면 전체)"""
+        if crop_table and self.table_bbox is not None:
+            x, y, w, h = self.table_bbox
+            return self.blurred[y:y + h, x:x + w]
+        return self.blurred
+
+    def variant(self, method: str = "adaptive", crop_table: bool = False) -> Optional[np.ndarray]:
+        """
+        method 방식으로 이진화한 이미지 (같은 조합은 다시 계산하지 않음)
+
+        Returns:
+            전처리된 이미지 또는 None (불러오기 실패)
+        """
+        if self.image is None:
+            return None
+        if method not in THRESHOLD_METHODS:
+            method = "adaptive"
+        # 표를 찾지 못했으면 전체 이미지 결과와 같으므로 같은 키 사용
+        region = "table" if crop_table and self.table_bbox is not None else "full"
+
+        def compute():
+            image = self.base(region == "table")
+            if method == "adaptive":
+                binary = _adaptive_threshold(image, self._adaptive_raw(region))
+            elif method == "otsu":
+                binary = _otsu_threshold(image)
+            elif method == "gaussian":
+                binary = _gaussian_threshold(image)
+            else:
+                binary = _multi_scale_processing(image, self._adaptive_raw(region))
+
+            if self.remove_noise:
+                binary = remove_speckles(binary)
+            return binary
+
+        return self._stage(f"{method}/{region}", compute)
+
+    def variants(self, methods=THRESHOLD_METHODS, crop_table: bool = False) -> Dict[str, Optional[np.ndarray]]:
+        """여러 이진화 방법의 결과를 한 번에 계산 (공통 단계는 한 번만 수행)"""
+        return {method: self.variant(method, crop_table) for method in methods}
+
+    def _adaptive_raw(self, region: str) -> np.ndarray:
+        """적응형 임계값 원본 (adaptive 와 multi_scale 의 1.0배 스케일이 공유)"""
+        return self._stage(f"adaptive_raw/{region}", lambda: _adaptive_raw_threshold(self.base(region == "table")))
+
+def preprocess_image(image: ImageSource, method: str = "adaptive", denoise: str = "auto",
+                     crop_table: bool = False, remove_noise: bool = False,
+                     report: Optional[Dict[str, Any]] = None) -> Optional[np.ndarray]:
     """
     OCR을 위한 이미지 전처리 함수
     
+    여러 방법을 비교하거나 실패 시 다른 방법으로 재시도할 때는 PreprocessPipeline 을 직접 사용하면
+    공통 단계를 한 번만 계산합니다.
+
     Args:
-        image_path: 이미지 파일 경로
+        image: 이미지 파일 경로, 인코딩된 이미지 바이트(버퍼), 또는 BGR 배열
         method: 전처리 방법 ("adaptive", "otsu", "gaussian", "multi_scale")
+        denoise: 노이즈 제거 방식 ("auto", "full", "gray", "none")
+        crop_table: True이면 영양성분표 박스를 찾아 그 영역만 반환 (찾지 못하면 전체 이미지)
+        remove_noise: True이면 이진화 후 작은 점 노이즈 제거 (remove_speckles)
+        report: 전달하면 선택된 노이즈 제거 방식과 단계별 소요 시간(ms), 잘라낸 표 영역을 기록
     
     Returns:
         전처리된 이미지 또는 None
     """
-    image = cv2.imread(image_path)
-    if image is None:
-        return None
-    
-    # 이미지 크기 조정 (너무 크거나 작은 경우)
-    height, width = image.shape[:2]
-    if width > 2000:
-        scale = 2000 / width
-        new_width = int(width * scale)
-        new_height = int(height * scale)
-        image = cv2.resize(image, (new_width, new_height))
-    
-    # 노이즈 제거
-    denoised = cv2.fastNlMeansDenoisingColored(image, None, 10, 10, 7, 21)
-    
-    # 그레이스케일 변환
-    gray = cv2.cvtColor(denoised, cv2.COLOR_BGR2GRAY)
-    
-    # 대비 향상
-    clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
-    enhanced = clahe.apply(gray)
-    
-    # 블러 처리로 노이즈 제거
-    blurred = cv2.GaussianBlur(enhanced, (3, 3), 0)
-    
-    if method == "adaptive":
-        return _adaptive_threshold(blurred)
-    elif method == "otsu":
-        return _otsu_threshold(blurred)
-    elif method == "gaussian":
-        return _gaussian_threshold(blurred)
-    elif method == "multi_scale":
-        return _multi_scale_processing(blurred)
-    else:
-        return _adaptive_threshold(blurred)
-
-def _adaptive_threshold(image: np.ndarray) -> np.ndarray:
-    """적응형 임계값 처리"""
-    thresh = cv2.adaptiveThreshold(
+    pipeline = PreprocessPipeline(image, denoise=denoise, remove_noise=remove_noise)
+    result = pipeline.variant(method, crop_table=crop_table)
+    if report is not None:
+        report.update(pipeline.report)
+    return result
+
+def _adaptive_raw_threshold(image: np.ndarray) -> np.ndarray:
+    """적응형 임계값 (후처리 없음)"""
+    return cv2.adaptiveThreshold(
         image, 255,
         cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
         cv2.THRESH_BINARY, 11, 2
     )
+
+def _adaptive_threshold(image: np.ndarray, thresh: Optional[np.ndarray] = None) -> np.ndarray:
+    """적응형 임계값 처리 (thresh: 미리 계산한 적응형 임계값 결과)"""
+    if thresh is None:
+        thresh = _adaptive_raw_threshold(image)
     
     # 모폴로지 연산으로 노이즈 제거
     kernel = np.ones((1, 1), np.uint8)
@@ -88,26 +348,26 @@ def _gaussian_threshold(image: np.ndarray) -> np.ndarray:
     
     return thresh
 
-def _multi_scale_processing(image: np.ndarray) -> np.ndarray:
-    """다중 스케일 처리"""
+def _multi_scale_processing(image: np.ndarray, base_thresh: Optional[np.ndarray] = None) -> np.ndarray:
+    """다중 스케일 처리 (base_thresh: 미리 계산한 1.0배 스케일 적응형 임계값 결과)"""
     # 여러 스케일에서 처리
     scales = [0.8, 1.0, 1.2]
     results = []
     
     for scale in scales:
+        if scale == 1.0 and base_thresh is not None:
+            results.append(base_thresh)
+            continue
+
         if scale != 1.0:
             h, w = image.shape
             new_h, new_w = int(h * scale), int(w * scale)
             scaled = cv2.resize(image, (new_w, new_h))
         else:
-            scaled = image.copy()
+            scaled = image
         
         # 각 스케일에서 전처리
-        thresh = cv2.adaptiveThreshold(
-            scaled, 255,
-            cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-            cv2.THRESH_BINARY, 11, 2
-        )
+        thresh = _adaptive_raw_threshold(scaled)
         
         if scale != 1.0:
             # 원본 크기로 복원
@@ -123,19 +383,25 @@ def _multi_scale_processing(image: np.ndarray) -> np.ndarray:
     
     return final
 
-def enhance_text_region(image: np.ndarray) -> np.ndarray:
-    """텍스트 영역 강화"""
+def _detect_table_lines(image: np.ndarray, length: int = 25) -> Tuple[np.ndarray, np.ndarray]:
+    """엣지에서 length 픽셀 이상 이어지는 수평선 / 수직선 마스크 추출"""
     # 엣지 검출
     edges = cv2.Canny(image, 50, 150, apertureSize=3)
     
     # 수평선 검출 (영양성분표의 특징)
-    horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (25, 1))
+    horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (length, 1))
     horizontal_lines = cv2.morphologyEx(edges, cv2.MORPH_OPEN, horizontal_kernel)
     
     # 수직선 검출
-    vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 25))
+    vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, length))
     vertical_lines = cv2.morphologyEx(edges, cv2.MORPH_OPEN, vertical_kernel)
     
+    return horizontal_lines, vertical_lines
+
+def enhance_text_region(image: np.ndarray) -> np.ndarray:
+    """텍스트 영역 강화"""
+    horizontal_lines, vertical_lines = _detect_table_lines(image)
+    
     # 선들을 결합
     lines = cv2.add(horizontal_lines, vertical_lines)
     
@@ -144,21 +410,87 @@ def enhance_text_region(image: np.ndarray) -> np.ndarray:
     
     return enhanced
 
-def remove_background_noise(image: np.ndarray) -> np.ndarray:
-    """배경 노이즈 제거"""
+def locate_nutrition_table(image: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+    """
+    영양성분표 박스 위치 검출
+
+    표의 테두리와 행 구분선(긴 수평/수직선)을 모폴로지로 찾고, 이를 이어 붙인 영역 중
+    수평선이 여러 줄 들어 있는 가장 큰 사각형을 영양성분표로 봅니다.
+
+    Args:
+        image: 그레이스케일 이미지
+
+    Returns:
+        (x, y, w, h) 또는 None (표를 찾지 못했거나 이미지 대부분을 차지하는 경우)
+    """
+    height, width = image.shape[:2]
+    # 글자 획보다 확실히 긴 선만 남도록 이미지 크기에 비례한 길이 사용
+    length = max(25, min(width, height) // 25)
+    horizontal_lines, vertical_lines = _detect_table_lines(image, length)
+
+    # 선들을 결합한 뒤 위아래로 늘려서 행 구분선끼리 이어 붙여 표 전체를 하나의 덩어리로 만듦
+    grid = cv2.add(horizontal_lines, vertical_lines)
+    row_gap = max(3, height // TABLE_ROW_GAP_DIVISOR)
+    grid = cv2.dilate(grid, cv2.getStructuringElement(cv2.MORPH_RECT, (5, row_gap)))
+    contours, _ = cv2.findContours(grid, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    image_area = width * height
+    best = None
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        area = w * h
+        if area < image_area * TABLE_MIN_AREA_RATIO or w < width * 0.15 or h < height * 0.1:
+            continue
+        # 영양성분표는 행 구분선이 여러 개 있음 (단순 테두리 / 사진 경계 제외)
+        rows, _ = cv2.findContours(horizontal_lines[y:y + h, x:x + w], cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if len(rows) < TABLE_MIN_ROWS:
+            continue
+        if best is None or area > best[2] * best[3]:
+            best = (x, y, w, h)
+
+    if best is None:
+        return None
+
+    # 테두리 바깥 글자가 잘리지 않도록 여백 추가
+    x, y, w, h = best
+    margin = int(min(width, height) * 0.02)
+    x0, y0 = max(0, x - margin), max(0, y - margin)
+    x1, y1 = min(width, x + w + margin), min(height, y + h + margin)
+    if (x1 - x0) * (y1 - y0) > image_area * TABLE_MAX_AREA_RATIO:
+        # 잘라도 거의 줄지 않으면 전체 이미지 사용
+        return None
+    return x0, y0, x1 - x0, y1 - y0
+
+def remove_background_noise(image: np.ndarray, min_size: int = 50) -> np.ndarray:
+    """
+    배경 노이즈 제거
+
+    면적이 min_size 미만인 연결 요소(흰색)를 지웁니다. 라벨별로 마스크를 만드는 대신
+    라벨 → 유지 여부 조회표를 한 번에 적용하므로 요소 수와 관계없이 이미지를 한 번만 훑습니다.
+    """
     # 연결 요소 분석
     num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(image, connectivity=8)
     
-    # 작은 노이즈 제거
-    min_size = 50
-    cleaned = image.copy()
+    # 작은 노이즈 제거 (0은 배경이므로 항상 유지)
+    keep = stats[:, cv2.CC_STAT_AREA] >= min_size
+    keep[0] = True
+    if keep.all():
+        return image.copy()
     
-    for i in range(1, num_labels):  # 0은 배경
-        if stats[i, cv2.CC_STAT_AREA] < min_size:
-            cleaned[labels == i] = 0
+    cleaned = image.copy()
+    cleaned[~keep[labels]] = 0
     
     return cleaned
 
+def remove_speckles(binary: np.ndarray, min_size: int = SPECKLE_MIN_SIZE) -> np.ndarray:
+    """
+    흰 배경 위 검은 글자 이진화 이미지에서 작은 검은 점 제거
+
+    remove_background_noise 는 흰색 요소를 지우므로 반전해서 적용한 뒤 되돌립니다.
+    (소수점처럼 작은 글자 조각도 지워질 수 있어 min_size 는 작게 유지)
+    """
+    return cv2.bitwise_not(remove_background_noise(cv2.bitwise_not(binary), min_size))
+
 def deskew_image(image: np.ndarray) -> np.ndarray:
     """이미지 기울기 보정"""
     # 이진화
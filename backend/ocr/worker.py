@@ -0,0 +1,487 @@
+#OCR 전용 프로세스 풀
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from ocr.preprocess import PreprocessPipeline, ImageSource
+from ocr.extractor import looks_like_nutrition_table
+from ocr.cascade import run_cascade
+from profiler import StackSampler
+
+# 풀 설정 (환경 변수로 조정)
+OCR_POOL_SIZE = int(os.getenv("OCR_POOL_SIZE", str(os.cpu_count() or 1)))
+OCR_QUEUE_SIZE = int(os.getenv("OCR_QUEUE_SIZE", "8"))
+OCR_JOB_TIMEOUT = float(os.getenv("OCR_JOB_TIMEOUT", "60"))
+# 배치 인식 시 인식 모델에 한 번에 넣는 텍스트 조각 수
+OCR_RECOGNIZER_BATCH = int(os.getenv("OCR_RECOGNIZER_BATCH", "16"))
+# 워밍업(모델 다운로드/로드 포함) 제한 시간
+OCR_WARMUP_TIMEOUT = float(os.getenv("OCR_WARMUP_TIMEOUT", "300"))
+# 워밍업 시도 횟수와 첫 재시도 전 대기 시간(초, 시도마다 두 배) - 모두 실패하면 /readyz 가 failed 로 응답
+OCR_WARMUP_ATTEMPTS = int(os.getenv("OCR_WARMUP_ATTEMPTS", "3"))
+OCR_WARMUP_BACKOFF = float(os.getenv("OCR_WARMUP_BACKOFF", "5"))
+# 영양성분표 영역만 잘라서 OCR (표가 아니면 전체 이미지로 다시 시도)
+OCR_CROP_TABLE = os.getenv("OCR_CROP_TABLE", "1") == "1"
+# 이진화 후 작은 점 노이즈 제거 단계 사용 여부
+OCR_REMOVE_NOISE = os.getenv("OCR_REMOVE_NOISE", "0") == "1"
+# /upload 에서 빠른 단계부터 시도하는 신뢰도 기반 캐스케이드 사용 여부
+OCR_CASCADE = os.getenv("OCR_CASCADE", "1") == "1"
+
+# 워커 프로세스마다 하나씩 보관하는 EasyOCR 리더
+_reader = None
+# 워커 프로세스 → 메인 프로세스로 작업 진행 단계와 단계별 소요 시간을 보내는 큐 (OCRPool.start 에서 전달)
+# ("progress", job_id, stage, tier), ("timings", [(단계, 초), ...]) 또는 ("count", 이벤트, 횟수)
+_event_queue = None
+
+
+class OCRBusyError(Exception):
+    """대기열이 가득 차서 작업을 받을 수 없음"""
+
+
+class OCRTimeoutError(Exception):
+    """작업이 제한 시간 안에 끝나지 않음"""
+
+
+def get_reader():
+    """현재 프로세스의 EasyOCR 리더를 반환 (없으면 생성)"""
+    global _reader
+    if _reader is None:
+        import easyocr
+        _reader = easyocr.Reader(['ko', 'en'], gpu=False)
+    return _reader
+
+
+def _init_worker(torch_threads: int, event_queue=None):
+    """워커 프로세스 초기화: 스레드 수 제한 후 모델을 미리 로드"""
+    global _event_queue
+    _event_queue = event_queue
+    import torch
+    # 프로세스 여러 개가 코어를 나눠 쓰므로 프로세스당 스레드 수를 줄여 과할당을 막음
+    torch.set_num_threads(torch_threads)
+    get_reader()
+
+
+def _synthetic_label() -> np.ndarray:
+    """워밍업용 가짜 영양성분표 이미지 생성"""
+    image = np.full((360, 720), 255, dtype=np.uint8)
+    lines = ["Nutrition Facts", "Calories 250 kcal", "Sodium 450 mg", "Protein 8 g", "Fat 3.5 g"]
+    for i, text in enumerate(lines):
+        cv2.putText(image, text, (30, 60 + i * 65), cv2.FONT_HERSHEY_SIMPLEX, 1.4, 0, 3, cv2.LINE_AA)
+    return image
+
+
+def warm_up() -> int:
+    """
+    워커 프로세스에서 가짜 영양성분표로 한 번 추론을 실행
+
+    첫 추론에서 발생하는 지연(가중치 로드, 메모리 할당 등)을 실제 요청 전에 치르기 위함
+
+    Returns:
+        워밍업을 수행한 프로세스 ID
+    """
+    get_reader().readtext(_synthetic_label(), detail=0)
+    return os.getpid()
+
+
+def _progress(job_id: Optional[str]) -> Optional[Callable[..., None]]:
+    """job_id 작업의 진행 단계를 메인 프로세스로 보내는 함수 (작업 ID가 없으면 None)"""
+    if job_id is None or _event_queue is None:
+        return None
+
+    def report(stage: str, tier: Optional[str] = None):
+        _event_queue.put(("progress", job_id, stage, tier))
+    return report
+
+
+@contextmanager
+def _reporting_reader(progress: Optional[Callable[..., None]] = None):
+    """
+    readtext 내부의 글자 영역 검출(detect)과 인식(recognize)을 계측하는 리더
+
+    readtext 가 self.detect / self.recognize 를 차례로 부르므로, 이 블록 안에서만 인스턴스 속성으로
+    감싸서 단계 시작을 progress 로 알리고 소요 시간을 메인 프로세스로 보냅니다. (풀 밖에서는 그대로 반환)
+    """
+    reader = get_reader()
+    if _event_queue is None:
+        yield reader
+        return
+    timings: List[Tuple[str, float]] = []
+
+    def measured(stage: str, fn):
+        def wrapper(*args, **kwargs):
+            if progress is not None:
+                progress(stage)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                timings.append((f"ocr.{stage}", time.perf_counter() - start))
+        return wrapper
+
+    reader.detect = measured("detect", reader.detect)
+    reader.recognize = measured("recognize", reader.recognize)
+    try:
+        yield reader
+    finally:
+        del reader.detect, reader.recognize
+        _event_queue.put(("timings", timings))
+
+
+def _send_count(event: str, amount: int = 1):
+    """워커에서 일어난 일의 횟수를 메인 프로세스로 보냄 (풀 밖에서는 무시)"""
+    if _event_queue is not None and amount:
+        _event_queue.put(("count", event, amount))
+
+
+def _send_preprocess_timings(pipelines: List[PreprocessPipeline]):
+    """
+    전처리 단계별 소요 시간을 메인 프로세스로 보냄 (load → ocr.decode, 나머지는 ocr.preprocess.<단계>)
+
+    노이즈 제거는 고른 방식에 따라 비용이 크게 달라서 ocr.preprocess.denoise.<방식> 으로 나눠 기록합니다.
+    (/metrics 에서 방식별 횟수와 소요 시간을 따로 볼 수 있도록)
+    """
+    if _event_queue is None:
+        return
+    timings = []
+    for pipeline in pipelines:
+        for key, ms in pipeline.report.get("stages_ms", {}).items():
+            if key == "load":
+                stage = "ocr.decode"
+            elif key == "denoise":
+                stage = f"ocr.preprocess.denoise.{pipeline.report.get('denoise', pipeline.denoise)}"
+            else:
+                stage = f"ocr.preprocess.{key.split('/')[0]}"
+            timings.append((stage, ms / 1000))
+    _event_queue.put(("timings", timings))
+
+
+def run_ocr(image: ImageSource, method: str = "adaptive", job_id: Optional[str] = None) -> Optional[List[str]]:
+    """
+    워커 프로세스에서 전처리와 OCR을 수행
+
+    Args:
+        image: 인코딩된 이미지 바이트 또는 이미지 파일 경로
+        method: 전처리 방법
+        job_id: 비동기 OCR 작업 ID (주면 decode/preprocess/detect/recognize 단계를 알림)
+
+    Returns:
+        추출된 텍스트 라인들 또는 None (이미지 불러오기 실패)
+    """
+    progress = _progress(job_id)
+    pipeline = PreprocessPipeline(image, remove_noise=OCR_REMOVE_NOISE)
+    if progress is not None:
+        progress("decode")
+        if pipeline.image is None:
+            return None
+        progress("preprocess", tier=method)
+    processed = pipeline.variant(method, crop_table=OCR_CROP_TABLE)
+    if processed is None:
+        return None
+    with _reporting_reader(progress) as reader:
+        lines = reader.readtext(processed, detail=0)
+
+        if OCR_CROP_TABLE and pipeline.table_bbox is not None and not looks_like_nutrition_table(lines):
+            # 잘라낸 영역이 영양성분표가 아니었으면 전체 이미지로 다시 OCR (노이즈 제거 등 공통 단계는 재사용)
+            _send_count("table_retry")
+            lines = reader.readtext(pipeline.variant(method), detail=0)
+    _send_preprocess_timings([pipeline])
+    return lines
+
+
+def run_ocr_cascade(image: ImageSource, job_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    워커 프로세스에서 신뢰도 기반 캐스케이드로 OCR 수행 (ocr.cascade.run_cascade 참고)
+
+    Args:
+        image: 인코딩된 이미지 바이트 또는 이미지 파일 경로
+        job_id: 비동기 OCR 작업 ID (주면 decode/preprocess/detect/recognize 단계를 알림)
+
+    Returns:
+        {"values", "confidences", "tier", "lines", "table_retries"} 또는 None (이미지 불러오기 실패)
+    """
+    progress = _progress(job_id)
+    pipeline = PreprocessPipeline(image, remove_noise=OCR_REMOVE_NOISE)
+    if progress is not None:
+        progress("decode")
+        if pipeline.image is None:
+            return None
+    with _reporting_reader(progress) as reader:
+        result = run_cascade(pipeline, reader, crop_table=OCR_CROP_TABLE, progress=progress)
+    _send_preprocess_timings([pipeline])
+    return result
+
+
+def _pad_to(image: np.ndarray, height: int, width: int) -> np.ndarray:
+    """이진화 이미지를 흰 배경으로 채워서 크기를 맞춤 (비율 왜곡 없이 배치로 묶기 위함)"""
+    h, w = image.shape[:2]
+    return cv2.copyMakeBorder(image, 0, height - h, 0, width - w, cv2.BORDER_CONSTANT, value=255)
+
+
+def _recognize_batch(pipelines: List[PreprocessPipeline], method: str,
+                     crop_table: bool) -> List[Optional[List[str]]]:
+    """파이프라인들을 병렬로 이진화한 뒤 readtext_batched 로 한 번에 인식"""
+    # OpenCV 연산은 GIL을 놓기 때문에 스레드로도 병렬 처리됨
+    with ThreadPoolExecutor(max_workers=min(len(pipelines), os.cpu_count() or 1)) as executor:
+        processed = list(executor.map(lambda pipeline: pipeline.variant(method, crop_table), pipelines))
+
+    valid = [i for i, img in enumerate(processed) if img is not None]
+    results: List[Optional[List[str]]] = [None] * len(pipelines)
+    if not valid:
+        return results
+
+    # readtext_batched 는 같은 크기의 이미지만 묶을 수 있으므로 가장 큰 크기에 맞춰 여백 추가
+    height = max(processed[i].shape[0] for i in valid)
+    width = max(processed[i].shape[1] for i in valid)
+    batch = [_pad_to(processed[i], height, width) for i in valid]
+
+    with _reporting_reader() as reader:
+        texts = reader.readtext_batched(batch, detail=0, batch_size=OCR_RECOGNIZER_BATCH)
+    for i, lines in zip(valid, texts):
+        results[i] = lines
+    return results
+
+
+def run_ocr_batch(images: List[ImageSource], method: str = "adaptive") -> List[Optional[List[str]]]:
+    """
+    여러 이미지를 병렬로 전처리한 뒤 EasyOCR 배치 API로 한 번에 인식
+
+    Args:
+        images: 인코딩된 이미지 바이트 목록
+        method: 전처리 방법
+
+    Returns:
+        이미지별 텍스트 라인들 (불러오기 실패한 이미지는 None)
+    """
+    pipelines = [PreprocessPipeline(image, remove_noise=OCR_REMOVE_NOISE) for image in images]
+    results = _recognize_batch(pipelines, method, OCR_CROP_TABLE)
+
+    # 잘라낸 영역이 영양성분표가 아니었던 이미지만 모아서 전체 이미지로 다시 OCR
+    retry = [i for i, lines in enumerate(results)
+             if OCR_CROP_TABLE and lines is not None and pipelines[i].table_bbox is not None
+             and not looks_like_nutrition_table(lines)]
+    if retry:
+        _send_count("table_retry", len(retry))
+        retried = _recognize_batch([pipelines[i] for i in retry], method, False)
+        for i, lines in zip(retry, retried):
+            results[i] = lines
+    _send_preprocess_timings(pipelines)
+    return results
+
+
+def run_profiled(fn: Callable[..., Any], interval: float, *args) -> Tuple[Any, Dict[str, int]]:
+    """
+    워커 프로세스에서 fn(*args)를 샘플링 프로파일러와 함께 실행
+
+    Returns:
+        (fn 의 결과, collapsed stack 별 샘플 수)
+    """
+    with StackSampler(interval) as sampler:
+        result = fn(*args)
+    return result, dict(sampler.stacks)
+
+
+class OCRPool:
+    """
+    이벤트 루프를 막지 않고 OCR 작업을 실행하는 프로세스 풀
+
+    실행 중 + 대기 중인 작업 수가 size + queue_size 를 넘으면 즉시 OCRBusyError 를,
+    작업이 timeout 초 안에 끝나지 않으면 OCRTimeoutError 를 발생시킵니다.
+    워커가 죽어 풀이 망가지면(BrokenProcessPool) 풀을 새로 만들고, 실패한 작업은 OCRBusyError 로 알립니다.
+    """
+
+    def __init__(self, size: int = OCR_POOL_SIZE, queue_size: int = OCR_QUEUE_SIZE,
+                 timeout: float = OCR_JOB_TIMEOUT):
+        self.size = max(1, size)
+        self.queue_size = max(0, queue_size)
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self._generation = 0  # 풀을 새로 만들 때마다 증가 (이전 풀 작업의 자리 반납을 무시하기 위함)
+        self.ready = False
+        self.warmup_error: Optional[str] = None  # 마지막 워밍업 실패 원인 (성공하면 None)
+        self.warmup_failed = False  # 모든 워밍업 시도가 실패함
+        self._event_queue = None
+        self._progress_handler: Optional[Callable[[str, str, Optional[str]], None]] = None
+        self._progress_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._timing_handler: Optional[Callable[[str, float], None]] = None
+        self._count_handler: Optional[Callable[[str, int], None]] = None
+
+    @property
+    def capacity(self) -> int:
+        return self.size + self.queue_size
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    @property
+    def status(self) -> str:
+        """/readyz 에 보여줄 상태 ("ready" / "warming_up" / "failed")"""
+        if self.ready:
+            return "ready"
+        return "failed" if self.warmup_failed else "warming_up"
+
+    def start(self):
+        if self._executor is not None:
+            return
+        torch_threads = max(1, (os.cpu_count() or 1) // self.size)
+        self._event_queue = multiprocessing.Queue()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.size,
+            initializer=_init_worker,
+            initargs=(torch_threads, self._event_queue),
+        )
+        threading.Thread(target=self._forward_events, args=(self._event_queue,),
+                         name="ocr-events", daemon=True).start()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._event_queue.put(None)  # 전달 스레드 종료
+            self._event_queue = None
+        self.ready = False
+
+    def _restart(self, broken: Optional[ProcessPoolExecutor]):
+        """
+        망가진 풀(broken)을 버리고 새 프로세스 풀을 시작
+
+        워커 하나가 죽으면(초기화 실패, OOM 등) ProcessPoolExecutor 전체가 BrokenProcessPool 상태가 되어
+        이후 모든 작업이 실패하므로 새로 만들어야 합니다. 이미 다른 호출이 새 풀로 바꿨으면 아무것도 하지 않습니다.
+        이전 풀의 작업은 모두 실패로 끝나므로 대기 중 작업 수는 0 부터 다시 셉니다.
+        """
+        if broken is None or self._executor is not broken:
+            return
+        print("OCR 프로세스 풀이 망가져 새로 시작합니다.")
+        ready = self.ready
+        self.shutdown()
+        self.ready = ready
+        self._generation += 1
+        self._pending = 0
+        self.start()
+
+    def on_progress(self, handler: Callable[[str, str, Optional[str]], None]):
+        """
+        작업 진행 단계를 받을 함수 등록 (handler(job_id, stage, tier) 가 현재 이벤트 루프에서 호출됨)
+
+        이벤트 루프 안에서 호출해야 합니다.
+        """
+        self._progress_handler = handler
+        self._progress_loop = asyncio.get_running_loop()
+
+    def on_timing(self, handler: Callable[[str, float], None]):
+        """워커 프로세스에서 잰 단계별 소요 시간을 받을 함수 등록 (handler(단계, 초) 가 전달 스레드에서 호출됨)"""
+        self._timing_handler = handler
+
+    def on_count(self, handler: Callable[[str, int], None]):
+        """워커 프로세스에서 센 이벤트 횟수를 받을 함수 등록 (handler(이벤트, 횟수) 가 전달 스레드에서 호출됨)"""
+        self._count_handler = handler
+
+    def _forward_events(self, queue):
+        """워커 프로세스가 보낸 소요 시간과 횟수는 바로 handler 로, 진행 단계는 이벤트 루프로 전달 (전용 스레드)"""
+        while True:
+            item = queue.get()
+            if item is None:
+                return
+            kind, *payload = item
+            if kind == "timings":
+                if self._timing_handler is not None:
+                    for stage, seconds in payload[0]:
+                        self._timing_handler(stage, seconds)
+                continue
+            if kind == "count":
+                if self._count_handler is not None:
+                    self._count_handler(*payload)
+                continue
+            handler, loop = self._progress_handler, self._progress_loop
+            if handler is None or loop is None:
+                continue
+            try:
+                loop.call_soon_threadsafe(handler, *payload)
+            except RuntimeError:
+                # 이벤트 루프가 이미 닫힌 경우 (종료 중)
+                return
+
+    async def warm_up(self):
+        """
+        모든 워커에서 모델을 로드하고 워밍업 추론을 실행한 뒤 ready 로 표시
+
+        워커 수만큼 작업을 동시에 넣어 각 프로세스에 하나씩 돌아가도록 합니다.
+        (ProcessPoolExecutor 가 작업을 배분하므로 보장되지는 않지만, 작업 하나가 모델 로드
+        시간만큼 걸리기 때문에 실제로는 대부분 고르게 나뉩니다.)
+
+        실패하면 풀을 새로 만들어 OCR_WARMUP_ATTEMPTS 번까지 다시 시도하고(대기 시간은 매번 두 배),
+        모두 실패하면 warmup_failed 로 표시해 /readyz 가 기다리지 않고 failed 를 돌려주도록 합니다.
+        """
+        for attempt in range(1, max(1, OCR_WARMUP_ATTEMPTS) + 1):
+            executor = self._executor
+            try:
+                pids = await asyncio.gather(*[
+                    self.run(warm_up, timeout=OCR_WARMUP_TIMEOUT) for _ in range(self.size)
+                ])
+            except Exception as e:
+                self.warmup_error = repr(e)
+                print(f"OCR 워밍업 실패 ({attempt}/{OCR_WARMUP_ATTEMPTS}): {e!r}")
+                if attempt >= OCR_WARMUP_ATTEMPTS:
+                    self.warmup_failed = True
+                    return
+                self._restart(executor)
+                await asyncio.sleep(OCR_WARMUP_BACKOFF * 2 ** (attempt - 1))
+                continue
+            self.ready = True
+            self.warmup_error = None
+            print(f"OCR 워밍업 완료 (워커 {len(set(pids))}/{self.size}개)")
+            return
+
+    def _release(self, loop: asyncio.AbstractEventLoop, generation: int):
+        # 프로세스 쪽 작업이 실제로 끝났을 때만 자리를 반납 (타임아웃 후에도 계속 실행될 수 있음)
+        def release():
+            if generation == self._generation:
+                self._pending -= 1
+        try:
+            loop.call_soon_threadsafe(release)
+        except RuntimeError:
+            # 이벤트 루프가 이미 닫힌 경우 (종료 중)
+            pass
+
+    async def run(self, fn, *args, timeout: Optional[float] = None):
+        """풀에서 fn(*args)를 실행하고 결과를 기다림"""
+        if self._executor is None:
+            self.start()
+        if self._pending >= self.capacity:
+            raise OCRBusyError()
+
+        loop = asyncio.get_running_loop()
+        executor = self._executor
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._restart(executor)
+            raise OCRBusyError("OCR 워커 프로세스가 종료되어 풀을 새로 시작함")
+        self._pending += 1
+        generation = self._generation
+        future.add_done_callback(lambda _: self._release(loop, generation))
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future),
+                                          timeout if timeout is not None else self.timeout)
+        except asyncio.TimeoutError:
+            # 아직 시작하지 않은 작업이면 취소됨
+            future.cancel()
+            raise OCRTimeoutError()
+        except BrokenProcessPool:
+            # 워커가 죽음 (OOM, OpenCV/torch 네이티브 크래시 등) - 다음 요청은 새 풀에서 실행
+            self._restart(executor)
+            raise OCRBusyError("OCR 워커 프로세스가 종료되어 풀을 새로 시작함")
+
+
+ocr_pool = OCRPool()
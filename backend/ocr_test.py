@@ -1,4 +1,5 @@
-from main import preprocess_image, reader
+from ocr.preprocess import preprocess_image
+from ocr.worker import get_reader
 import os
 
 # 경로 수정: 상대경로 또는 절대경로 둘 다 가능
@@ -12,7 +13,7 @@ print(" 파일 존재 확인:", os.path.exists(image_path))
 processed = preprocess_image(image_path)
 
 if processed is not None:
-    result = reader.readtext(processed, detail=0)
+    result = get_reader().readtext(processed, detail=0)
     print(" OCR 결과:")
     for line in result:
         print("-", line)
@@ -0,0 +1,78 @@
+#비밀번호 해시/검증 (bcrypt 는 한 번에 100~300 ms 걸리므로 이벤트 루프 밖 전용 스레드에서 실행)
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict
+
+import bcrypt
+
+# bcrypt 는 계산 중 GIL 을 놓으므로 스레드 수만큼 병렬로 실행됨
+BCRYPT_THREADS = int(os.getenv("BCRYPT_THREADS", str(min(4, os.cpu_count() or 1))))
+# 실행 중인 작업 외에 기다릴 수 있는 요청 수 (넘으면 PasswordHasherBusyError)
+BCRYPT_QUEUE_SIZE = int(os.getenv("BCRYPT_QUEUE_SIZE", "32"))
+
+
+class PasswordHasherBusyError(Exception):
+    """대기 중인 해시 작업이 너무 많아 요청을 받을 수 없음"""
+
+
+class PasswordHasher:
+    """
+    bcrypt 전용 스레드 풀
+
+    DB/기본 스레드 풀과 분리해 두어 로그인이 몰려도 다른 요청의 스레드를 차지하지 않고,
+    대기열이 가득 차면 기다리게 하지 않고 바로 거절합니다.
+    """
+
+    def __init__(self, threads: int = BCRYPT_THREADS, queue_size: int = BCRYPT_QUEUE_SIZE):
+        self.threads = max(1, threads)
+        self.queue_size = queue_size
+        self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="bcrypt")
+        self._pending = 0
+        self._stats = {"hashes": 0, "checks": 0, "rejected": 0}
+
+    @property
+    def capacity(self) -> int:
+        return self.threads + self.queue_size
+
+    async def _run(self, fn, *args):
+        if self._pending >= self.capacity:
+            self._stats["rejected"] += 1
+            raise PasswordHasherBusyError()
+        loop = asyncio.get_running_loop()
+        future = self._executor.submit(fn, *args)
+        self._pending += 1
+        # 요청이 취소되어도 이미 시작한 작업은 스레드에서 끝까지 실행되므로, 끝난 뒤에 자리를 반납
+        future.add_done_callback(lambda _: self._release(loop))
+        return await asyncio.wrap_future(future)
+
+    def _release(self, loop: asyncio.AbstractEventLoop):
+        def release():
+            self._pending -= 1
+        try:
+            loop.call_soon_threadsafe(release)
+        except RuntimeError:
+            # 이벤트 루프가 이미 닫힌 경우 (종료 중)
+            pass
+
+    async def hash(self, password: str) -> str:
+        hashed = await self._run(bcrypt.hashpw, password.encode("utf-8"), bcrypt.gensalt())
+        self._stats["hashes"] += 1
+        return hashed.decode("utf-8")
+
+    async def check(self, password: str, hashed: str) -> bool:
+        matched = await self._run(bcrypt.checkpw, password.encode("utf-8"), hashed.encode("utf-8"))
+        self._stats["checks"] += 1
+        return matched
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats.update({"threads": self.threads, "pending": self._pending, "capacity": self.capacity})
+        return stats
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,111 @@
+#프로필 이미지 저장 (업로드 시 고정 크기 썸네일을 만들어 blob 저장소에 보관, users 에는 버전만 저장)
+
+import hashlib
+import os
+import re
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from blob_store import BlobStore, create_blob_store
+
+# 만들어 둘 정사각형 썸네일 한 변 크기 (px)
+PROFILE_IMAGE_SIZES = tuple(int(s) for s in os.getenv("PROFILE_IMAGE_SIZES", "64,128,256").split(","))
+PROFILE_IMAGE_MAX_BYTES = int(os.getenv("PROFILE_IMAGE_MAX_BYTES", str(5 * 1024 * 1024)))
+PROFILE_IMAGE_JPEG_QUALITY = int(os.getenv("PROFILE_IMAGE_JPEG_QUALITY", "85"))
+
+# users.profile_image 에 저장하는 버전 (썸네일 내용의 해시 앞부분)
+_VERSION_PATTERN = re.compile(r"^[0-9a-f]{16}$")
+
+
+def is_version(value: Optional[str]) -> bool:
+    """users.profile_image 값이 이 모듈이 만든 버전인지 (이전 방식의 base64 데이터는 False)"""
+    return bool(value) and _VERSION_PATTERN.match(value) is not None
+
+
+def make_thumbnails(data: bytes) -> Optional[Tuple[str, Dict[int, bytes]]]:
+    """
+    이미지를 가운데 기준 정사각형으로 자르고 PROFILE_IMAGE_SIZES 크기의 JPEG 로 변환
+
+    Returns:
+        (버전, {크기: JPEG 바이트}) - 이미지로 읽을 수 없으면 None
+    """
+    # IMREAD_COLOR 는 EXIF 회전 정보를 반영해서 디코딩
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        return None
+    height, width = image.shape[:2]
+    side = min(height, width)
+    top, left = (height - side) // 2, (width - side) // 2
+    square = image[top:top + side, left:left + side]
+
+    thumbnails = {}
+    for size in PROFILE_IMAGE_SIZES:
+        interpolation = cv2.INTER_AREA if side > size else cv2.INTER_CUBIC
+        resized = cv2.resize(square, (size, size), interpolation=interpolation)
+        ok, encoded = cv2.imencode(".jpg", resized, [cv2.IMWRITE_JPEG_QUALITY, PROFILE_IMAGE_JPEG_QUALITY])
+        if not ok:
+            return None
+        thumbnails[size] = encoded.tobytes()
+
+    digest = hashlib.sha256()
+    for size in PROFILE_IMAGE_SIZES:
+        digest.update(thumbnails[size])
+    return digest.hexdigest()[:16], thumbnails
+
+
+class ProfileImageStore:
+    """
+    사용자별 프로필 썸네일 저장소
+
+    키는 "profile/<user_id>/<버전>/<크기>.jpg" 이고, 내용이 바뀌면 버전(=URL)도 바뀌므로
+    제공하는 쪽에서 오래 캐시해도 됩니다. 모든 메서드는 블로킹이므로 스레드 풀에서 호출하세요.
+    """
+
+    def __init__(self, store: Optional[BlobStore] = None):
+        self._store = store
+
+    @property
+    def store(self) -> BlobStore:
+        # 저장소 디렉터리는 처음 쓸 때 만듦 (import 만으로 디스크를 건드리지 않도록)
+        if self._store is None:
+            self._store = create_blob_store()
+        return self._store
+
+    @staticmethod
+    def _key(user_id, version: str, size: Optional[int] = None) -> str:
+        key = f"profile/{int(user_id)}/{version}"
+        return key if size is None else f"{key}/{size}.jpg"
+
+    def save(self, user_id, data: bytes) -> Optional[str]:
+        """썸네일을 만들어 저장하고 버전 반환 (이미지가 아니면 None)"""
+        result = make_thumbnails(data)
+        if result is None:
+            return None
+        version, thumbnails = result
+        for size, thumbnail in thumbnails.items():
+            self.store.put(self._key(user_id, version, size), thumbnail)
+        return version
+
+    def read(self, user_id, version: str, size: int) -> Optional[bytes]:
+        if not is_version(version) or size not in PROFILE_IMAGE_SIZES:
+            return None
+        return self.store.get(self._key(user_id, version, size))
+
+    def delete(self, user_id, version: Optional[str] = None):
+        """version 의 썸네일 삭제 (None 이면 사용자의 모든 프로필 이미지)"""
+        if version is None:
+            self.store.delete_prefix(f"profile/{int(user_id)}")
+        elif is_version(version):
+            self.store.delete_prefix(self._key(user_id, version))
+
+
+def profile_image_urls(user_id, version: Optional[str]) -> Optional[Dict[str, str]]:
+    """크기별 이미지 경로 (프로필 이미지가 없으면 None)"""
+    if not is_version(version):
+        return None
+    return {str(size): f"/profile-images/{int(user_id)}/{version}/{size}.jpg" for size in PROFILE_IMAGE_SIZES}
+
+
+profile_images = ProfileImageStore()
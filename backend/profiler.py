@@ -0,0 +1,206 @@
+#요청 단위 샘플링 프로파일러 (느린 요청이 어디서 시간을 쓰는지 운영 중에 확인하기 위한 용도)
+#
+# 별도 스레드가 대상 스레드의 파이썬 스택을 일정 간격으로 읽어 "프레임;프레임;... 횟수" 형식(collapsed stacks)으로
+# 모읍니다. flamegraph.pl, speedscope, inferno 에 그대로 넣을 수 있습니다.
+# OpenCV/torch 처럼 네이티브 코드에서 보낸 시간은 그 코드를 호출한 파이썬 프레임에 쌓입니다.
+# 결과는 PROFILE_DIR 에 최근 PROFILE_RING_SIZE 개만 보관합니다.
+
+import hmac
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "storage", "profiles"))
+PROFILE_RING_SIZE = int(os.getenv("PROFILE_RING_SIZE", "50"))
+# 스택을 읽는 간격 (밀리초)
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+# 관리자 헤더(X-Profile: <토큰>)로 프로파일링을 켜기 위한 토큰 (비어 있으면 헤더로 켤 수 없고 조회 API도 막힘)
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN", "")
+# 일반 요청 중 무작위로 프로파일링할 비율 (0 ~ 1)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+# 무작위로 고른 요청은 이 시간(밀리초) 이상 걸렸을 때만 저장 (빠른 요청으로 보관 공간이 채워지지 않도록)
+PROFILE_MIN_DURATION_MS = float(os.getenv("PROFILE_MIN_DURATION_MS", "1000"))
+
+PROFILE_HEADER = "x-profile"
+_PROFILE_ID = re.compile(r"^[0-9]{13}-[0-9a-f]{8}$")
+
+
+def _frame_name(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    대상 스레드의 스택을 interval 초마다 읽어 collapsed stack 별 횟수를 세는 샘플러
+
+    with 블록으로 쓰며, 블록을 실행하는 스레드가 대상입니다.
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL_MS / 1000, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                names.append(_frame_name(frame.f_code))
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+                self.samples += 1
+
+    def start(self):
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._thread = threading.Thread(target=self._sample, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.stacks
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+
+class RequestProfile:
+    """프로파일링 중인 요청 하나 (이벤트 루프 스레드 샘플 + OCR 워커 프로세스에서 받아 온 샘플)"""
+
+    def __init__(self, reason: str, interval: float = PROFILE_INTERVAL_MS / 1000):
+        self.id = f"{int(time.time() * 1000):013d}-{uuid.uuid4().hex[:8]}"
+        self.reason = reason
+        self.interval = interval
+        self.sampler = StackSampler(interval)
+        self.extra: Counter = Counter()
+
+    def add_stacks(self, prefix: str, stacks: Dict[str, int]):
+        """다른 프로세스/스레드에서 모은 스택을 prefix 아래에 합침"""
+        for stack, count in stacks.items():
+            self.extra[f"{prefix};{stack}"] += count
+
+    def collapsed(self) -> str:
+        stacks = self.sampler.stacks + self.extra
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+# 현재 요청의 프로파일 (ProfilingMiddleware 가 설정, 프로파일링하지 않는 요청은 None)
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """X-Profile 헤더 값이 관리자 토큰인지 (토큰을 설정하지 않았으면 항상 False)"""
+    return bool(PROFILE_ADMIN_TOKEN) and token is not None and hmac.compare_digest(token, PROFILE_ADMIN_TOKEN)
+
+
+def should_profile(headers: Dict[str, str]) -> Optional[str]:
+    """프로파일링할 요청이면 이유("header" / "sampled"), 아니면 None"""
+    if is_admin_token(headers.get(PROFILE_HEADER)):
+        return "header"
+    if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        return "sampled"
+    return None
+
+
+class ProfileStore:
+    """
+    최근 프로파일을 디스크에 보관하는 고정 크기 링
+
+    프로파일마다 {id}.collapsed (flame graph 입력)와 {id}.json (요청 정보)을 쓰고,
+    max_profiles 개를 넘으면 가장 오래된 것부터 지웁니다. ID 가 생성 시각(ms)으로 시작하므로 이름순이 시간순입니다.
+    """
+
+    def __init__(self, directory: str = PROFILE_DIR, max_profiles: int = PROFILE_RING_SIZE):
+        self.directory = directory
+        self.max_profiles = max(1, max_profiles)
+        self._lock = threading.Lock()
+        self._stats = {"saved": 0, "discarded": 0, "evicted": 0}
+
+    def _path(self, profile_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}{suffix}")
+
+    def _ids(self) -> List[str]:
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(name[:-len(".json")] for name in names
+                      if name.endswith(".json") and _PROFILE_ID.match(name[:-len(".json")]))
+
+    def save(self, profile: RequestProfile, meta: Dict[str, Any]):
+        """프로파일 저장 후 오래된 것 정리 (블로킹 파일 I/O - 스레드 풀에서 호출)"""
+        meta = dict(meta, id=profile.id, reason=profile.reason, interval_ms=profile.interval * 1000,
+                    samples=profile.sampler.samples + sum(profile.extra.values()))
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            # 메타데이터를 마지막에 써서 목록에 보이는 프로파일은 스택 파일이 항상 있도록
+            for suffix, content in ((".collapsed", profile.collapsed()),
+                                    (".json", json.dumps(meta, ensure_ascii=False))):
+                tmp_path = self._path(profile.id, suffix + ".tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(content)
+                os.replace(tmp_path, self._path(profile.id, suffix))
+            self._stats["saved"] += 1
+
+            ids = self._ids()
+            for old_id in ids[:max(0, len(ids) - self.max_profiles)]:
+                for suffix in (".json", ".collapsed"):
+                    try:
+                        os.remove(self._path(old_id, suffix))
+                    except FileNotFoundError:
+                        pass
+                self._stats["evicted"] += 1
+
+    def discard(self):
+        """저장 조건(최소 소요 시간)에 못 미쳐 버린 프로파일 수 기록"""
+        self._stats["discarded"] += 1
+
+    def list(self) -> List[Dict[str, Any]]:
+        """최근 프로파일 요청 정보 (최신순)"""
+        profiles = []
+        for profile_id in reversed(self._ids()):
+            try:
+                with open(self._path(profile_id, ".json"), encoding="utf-8") as f:
+                    profiles.append(json.load(f))
+            except (FileNotFoundError, ValueError):
+                continue
+        return profiles
+
+    def read(self, profile_id: str) -> Optional[str]:
+        """collapsed stacks 텍스트 (없으면 None)"""
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        try:
+            with open(self._path(profile_id, ".collapsed"), encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats.update({"stored": len(self._ids()), "max_profiles": self.max_profiles,
+                      "sample_rate": PROFILE_SAMPLE_RATE, "header_enabled": bool(PROFILE_ADMIN_TOKEN)})
+        return stats
+
+
+profile_store = ProfileStore()
@@ -0,0 +1,249 @@
+#비동기 DB 접근 계층 (사용자 / 일일 영양소 / 통계)
+#
+# mysql.connector 는 블로킹 드라이버이므로 쿼리는 전용 스레드 풀에서 실행하고, 엔드포인트는 await 로 결과만 받습니다.
+# 스레드 수를 커넥션 풀 크기(size + overflow)에 맞춰 두어 연결을 기다리며 노는 스레드가 생기지 않게 합니다.
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from db import DBSession, db_pool, db_session
+from metrics import DB_QUERY_ERRORS, DB_QUERY_SECONDS
+from nutrient_cache import today_cache
+from user_cache import user_cache
+
+DB_EXECUTOR_THREADS = int(os.getenv("DB_EXECUTOR_THREADS", str(db_pool.size + db_pool.overflow)))
+
+_executor = ThreadPoolExecutor(max_workers=max(1, DB_EXECUTOR_THREADS), thread_name_prefix="db")
+
+
+def _in_session(fn: Callable[..., Any], *args) -> Any:
+    with db_session() as db:
+        return fn(db, *args)
+
+
+async def run_db(fn: Callable[..., Any], *args) -> Any:
+    """fn(db, *args)를 DB 전용 스레드에서 연결 하나를 빌려 실행하고 결과를 기다림 (작업 이름별 소요 시간 기록)"""
+    loop = asyncio.get_running_loop()
+    query = fn.__name__.lstrip("_")
+    try:
+        with DB_QUERY_SECONDS.labels(query).time():
+            return await loop.run_in_executor(_executor, partial(_in_session, fn, *args))
+    except Exception:
+        DB_QUERY_ERRORS.labels(query).inc()
+        raise
+
+
+def shutdown():
+    _executor.shutdown(wait=False, cancel_futures=True)
+
+
+# --- 사용자 ---
+
+# 화면에서 쓰는 사용자 정보 컬럼
+USER_PROFILE_COLUMNS = ("username", "gender", "age_group", "activity_level", "health_goal", "profile_image")
+
+
+def _get_user(db: DBSession, user_id, columns: Sequence[str]) -> Optional[Dict[str, Any]]:
+    db.cursor.execute(f"SELECT {', '.join(columns)} FROM users WHERE id = %s", (user_id,))
+    return db.cursor.fetchone()
+
+
+def _get_user_by_username(db: DBSession, username: str, columns: Sequence[str]) -> Optional[Dict[str, Any]]:
+    db.cursor.execute(f"SELECT {', '.join(columns)} FROM users WHERE username = %s", (username,))
+    return db.cursor.fetchone()
+
+
+def _create_user(db: DBSession, username: str, password_hash: str, gender: str, age_group: str):
+    db.cursor.execute(
+        "INSERT INTO users (username, password, gender, age_group) VALUES (%s, %s, %s, %s)",
+        (username, password_hash, gender, age_group)
+    )
+    db.commit()
+
+
+def _update_user(db: DBSession, user_id, fields: Dict[str, Any]):
+    set_clause = ", ".join([f"{key} = %s" for key in fields])
+    db.cursor.execute(f"UPDATE users SET {set_clause} WHERE id = %s", (*fields.values(), user_id))
+    db.commit()
+
+
+def _delete_user(db: DBSession, user_id):
+    # 사용자와 관련된 모든 데이터를 함께 삭제
+    db.cursor.execute("DELETE FROM daily_nutrients WHERE user_id = %s", (user_id,))
+    db.cursor.execute("DELETE FROM nutrient_rollups WHERE user_id = %s", (user_id,))
+    db.cursor.execute("DELETE FROM users WHERE id = %s", (user_id,))
+    db.commit()
+
+
+class UserRepository:
+    """users 테이블 접근 (USER_PROFILE_COLUMNS 안의 컬럼 조회는 user_cache 를 거침)"""
+
+    async def get(self, user_id, columns: Sequence[str] = USER_PROFILE_COLUMNS) -> Optional[Dict[str, Any]]:
+        if not set(columns) <= set(USER_PROFILE_COLUMNS):
+            return await run_db(_get_user, user_id, columns)
+        profile = await self.profile(user_id)
+        return {column: profile[column] for column in columns} if profile is not None else None
+
+    async def profile(self, user_id) -> Optional[Dict[str, Any]]:
+        """USER_PROFILE_COLUMNS 전체 (없는 사용자면 None, 없다는 결과는 캐시하지 않음)"""
+        profile, version = user_cache.get(user_id)
+        if profile is None:
+            profile = await run_db(_get_user, user_id, USER_PROFILE_COLUMNS)
+            if profile is not None:
+                user_cache.fill(user_id, profile, version)
+        return profile
+
+    async def exists(self, user_id) -> bool:
+        return await self.profile(user_id) is not None
+
+    async def get_by_username(self, username: str, columns: Sequence[str]) -> Optional[Dict[str, Any]]:
+        return await run_db(_get_user_by_username, username, columns)
+
+    async def create(self, username: str, password_hash: str, gender: str, age_group: str):
+        await run_db(_create_user, username, password_hash, gender, age_group)
+
+    async def update(self, user_id, fields: Dict[str, Any]):
+        """fields 의 키는 호출하는 쪽에서 허용된 컬럼명만 넘겨야 함 (SET 절에 그대로 들어감)"""
+        try:
+            await run_db(_update_user, user_id, fields)
+        finally:
+            # 실패한 경우에도 반영 여부를 알 수 없으므로 캐시를 비움
+            user_cache.invalidate(user_id)
+
+    async def delete(self, user_id):
+        try:
+            await run_db(_delete_user, user_id)
+        finally:
+            user_cache.invalidate(user_id)
+        today_cache.invalidate_user(user_id)
+
+
+# --- 일일 영양소 ---
+
+def upsert_daily_sql(count: int, table: str = "daily_nutrients") -> str:
+    """
+    영양소 count 개를 하루 누적값에 더하는 다중 행 upsert 문
+
+    (user_id, nutrient_name, date) 유니크 키에 걸리면 기존 값에 더하므로, 조회 후 갱신하던 방식과 달리
+    동시에 저장해도 값이 사라지지 않습니다. (migrations/daily_nutrients_unique_key.py 로 키 추가 필요)
+    """
+    rows = ", ".join(["(%s, %s, %s, %s, %s)"] * count)
+    return f"""
+        INSERT INTO {table} (user_id, nutrient_name, value, unit, date)
+        VALUES {rows}
+        ON DUPLICATE KEY UPDATE value = value + VALUES(value)
+    """
+
+
+def _add_daily(db: DBSession, user_id, nutrients: List[Dict[str, Any]], day: date):
+    if not nutrients:
+        return
+    params = []
+    for nutrient in nutrients:
+        params.extend((user_id, nutrient["name"], float(nutrient["value"]), nutrient["unit"], day))
+    # 일별 누적값과 주/월 롤업을 한 트랜잭션으로 저장 (통계가 일별 값과 어긋나지 않도록)
+    db.cursor.execute(upsert_daily_sql(len(nutrients)), params)
+    db.cursor.execute(*_upsert_rollups(user_id, nutrients, day))
+    db.commit()
+
+
+def _get_daily(db: DBSession, user_id, day: date) -> List[Dict[str, Any]]:
+    db.cursor.execute("""
+        SELECT nutrient_name, value, unit
+        FROM daily_nutrients
+        WHERE user_id = %s AND date = %s
+    """, (user_id, day))
+    return db.cursor.fetchall()
+
+
+class DailyNutrientRepository:
+    """daily_nutrients 테이블의 하루 누적값 접근 (today_cache 를 거쳐 읽고, 저장 시 함께 갱신)"""
+
+    async def add(self, user_id, nutrients: List[Dict[str, Any]], day: date):
+        """day 날짜 누적값에 nutrients 를 더함"""
+        today_cache.begin_write(user_id, day)
+        try:
+            await run_db(_add_daily, user_id, nutrients, day)
+        except BaseException:
+            today_cache.abort_write(user_id, day)
+            raise
+        today_cache.add(user_id, day, nutrients)
+
+    async def get(self, user_id, day: date) -> List[Dict[str, Any]]:
+        """day 날짜의 영양소별 누적값 (nutrient_name, value, unit)"""
+        rows, version = today_cache.get(user_id, day)
+        if rows is None:
+            rows = await run_db(_get_daily, user_id, day)
+            today_cache.fill(user_id, day, rows, version)
+        return rows
+
+
+# --- 통계 ---
+
+# 통계 단위: 일별은 daily_nutrients 를 그대로 쓰고, 주/월은 nutrient_rollups 에 미리 합산해 둠
+# (migrations/nutrient_rollups.py 로 테이블 생성 및 기존 기록 반영 필요)
+GRANULARITIES = ("day", "week", "month")
+
+
+def period_start(day: date, granularity: str) -> date:
+    """day 가 속한 기간의 시작일 (주는 월요일, 월은 1일)"""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _upsert_rollups(user_id, nutrients: List[Dict[str, Any]], day: date):
+    """nutrients 를 day 가 속한 주/월 롤업에 더하는 다중 행 upsert 문과 파라미터"""
+    params = []
+    for granularity in ("week", "month"):
+        start = period_start(day, granularity)
+        for nutrient in nutrients:
+            params.extend((user_id, granularity, start, nutrient["name"], float(nutrient["value"]), nutrient["unit"]))
+    rows = ", ".join(["(%s, %s, %s, %s, %s, %s)"] * (len(params) // 6))
+    sql = f"""
+        INSERT INTO nutrient_rollups (user_id, granularity, period_start, nutrient_name, value, unit)
+        VALUES {rows}
+        ON DUPLICATE KEY UPDATE value = value + VALUES(value)
+    """
+    return sql, params
+
+
+def _get_range(db: DBSession, user_id, granularity: str, start: date, end: date) -> List[Dict[str, Any]]:
+    if granularity == "day":
+        db.cursor.execute("""
+            SELECT date AS period, nutrient_name, value, unit
+            FROM daily_nutrients
+            WHERE user_id = %s AND date BETWEEN %s AND %s
+            ORDER BY date
+        """, (user_id, start, end))
+    else:
+        db.cursor.execute("""
+            SELECT period_start AS period, nutrient_name, value, unit
+            FROM nutrient_rollups
+            WHERE user_id = %s AND granularity = %s AND period_start BETWEEN %s AND %s
+            ORDER BY period_start
+        """, (user_id, granularity, period_start(start, granularity), end))
+    return db.cursor.fetchall()
+
+
+class StatisticsRepository:
+    """기간별 영양소 기록 조회"""
+
+    async def range(self, user_id, granularity: str, start: date, end: date) -> List[Dict[str, Any]]:
+        """
+        start ~ end 사이 기간별 영양소 합계 (오래된 기간부터)
+
+        주/월 단위는 start 가 속한 기간부터 반환합니다. 각 행은 period(기간 시작일), nutrient_name, value, unit
+        """
+        return await run_db(_get_range, user_id, granularity, start, end)
+
+
+users = UserRepository()
+daily_nutrients = DailyNutrientRepository()
+statistics = StatisticsRepository()
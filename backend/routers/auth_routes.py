@@ -1,28 +1,23 @@
 from fastapi import APIRouter, HTTPException, Form
-import bcrypt
-from db import conn, cursor
+from passwords import password_hasher
+from repository import users
 
 router = APIRouter()
 
 @router.post("/register")
-def register(
+async def register(
     username: str = Form(...),
     password: str = Form(...),
     gender: str = Form(...),
     age_group: str = Form(...)
 ):
     # 사용자 중복 확인
-    cursor.execute("SELECT * FROM users WHERE username = %s", (username,))
-    if cursor.fetchone():
+    if await users.get_by_username(username, ("id",)):
         raise HTTPException(status_code=400, detail="이미 존재하는 사용자입니다.")
 
     # 비밀번호 해시
-    hashed_pw = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
+    hashed_pw = await password_hasher.hash(password)
 
     # DB에 저장
-    cursor.execute(
-        "INSERT INTO users (username, password, gender, age_group) VALUES (%s, %s, %s, %s)",
-        (username, hashed_pw.decode("utf-8"), gender, age_group)
-    )
-    conn.commit()
+    await users.create(username, hashed_pw, gender, age_group)
     return {"message": "회원가입 완료"}
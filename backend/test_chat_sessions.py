@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI 코치 채팅 세션 테스트
+
+    python -m pytest test_chat_sessions.py
+"""
+
+import asyncio
+import os
+import sys
+
+# 현재 디렉토리를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chat_sessions import ChatSessionStore, SystemPromptCache, fit_to_budget, message_tokens
+
+
+def message(role, content):
+    return {"role": role, "content": content}
+
+
+def test_fit_to_budget_keeps_most_recent_messages():
+    messages = [message("user", "가" * 10), message("assistant", "나" * 10), message("user", "다" * 10)]
+    per_message = message_tokens(messages[:1])
+
+    assert fit_to_budget(messages, per_message * 2) == messages[1:]
+    assert fit_to_budget(messages, per_message - 1) == []
+
+
+def test_session_is_reused_only_by_its_owner():
+    store = ChatSessionStore()
+    session = store.get_or_create(1, None)
+
+    assert store.get_or_create(1, session.id) is session
+    assert store.get_or_create(2, session.id) is not session
+    assert store.get_or_create(1, "unknown").id != session.id
+
+
+def test_oldest_sessions_are_evicted():
+    store = ChatSessionStore(max_sessions=2)
+    first = store.get_or_create(1, None)
+    store.get_or_create(2, None)
+    store.get_or_create(3, None)
+
+    assert store.get_or_create(1, first.id) is not first
+    assert store.stats()["expired"] >= 1
+
+
+def test_history_over_budget_is_summarized():
+    summaries = []
+
+    async def summarize(summary, old):
+        summaries.append(old)
+        return "요약"
+
+    async def main():
+        store = ChatSessionStore(budget=60, keep_ratio=0.5)
+        session = store.get_or_create(1, None)
+        for i in range(4):
+            store.append(session, f"질문{i}" * 3, f"답변{i}" * 3, summarize)
+            await asyncio.sleep(0)
+        await asyncio.gather(*store._tasks)
+        return session
+
+    session = asyncio.run(main())
+    assert session.summary == "요약"
+    assert summaries and summaries[0][0]["content"].startswith("질문0")
+    # 남은 기록은 질문/답변 쌍 단위이고, 보낼 문맥은 요약 + 예산 안의 최근 대화
+    assert len(session.history) % 2 == 0
+    context = session.context(60)
+    assert context[0]["content"].endswith("요약")
+    assert message_tokens(context) <= 60
+
+
+def test_failed_summary_drops_old_turns():
+    async def summarize(summary, old):
+        raise RuntimeError("OpenAI 오류")
+
+    async def main():
+        store = ChatSessionStore(budget=30, keep_ratio=0.5)
+        session = store.get_or_create(1, None)
+        store.append(session, "질문" * 10, "답변" * 10, summarize)
+        await asyncio.gather(*store._tasks)
+        return store, session
+
+    store, session = asyncio.run(main())
+    assert session.summary == ""
+    assert message_tokens(session.history) <= 30
+    assert store.stats()["summarize_errors"] == 1
+
+
+def test_system_prompt_rebuilt_only_when_snapshot_changes():
+    cache = SystemPromptCache()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return f"프롬프트{len(builds)}"
+
+    assert cache.get(1, "a", build) == "프롬프트1"
+    assert cache.get(1, "a", build) == "프롬프트1"
+    assert cache.get(1, "b", build) == "프롬프트2"
+    assert len(builds) == 2
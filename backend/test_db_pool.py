@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DB 커넥션 풀 테스트 (MySQL 없이 가짜 연결로)
+
+    python -m pytest test_db_pool.py
+"""
+
+import os
+import sys
+import threading
+
+import pytest
+
+# 현재 디렉토리를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db import ConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.in_transaction = False
+        self.rollbacks = 0
+        self.alive = True
+
+    def ping(self, reconnect=False):
+        if not self.alive:
+            raise ConnectionError("끊긴 연결")
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(**kwargs):
+    opened = []
+
+    def connect():
+        conn = FakeConnection()
+        opened.append(conn)
+        return conn
+    return ConnectionPool(connect=connect, **kwargs), opened
+
+
+def test_returned_connection_is_reused():
+    pool, opened = make_pool(size=1, overflow=0)
+    first = pool.checkout()
+    pool.checkin(first)
+    assert pool.checkout() is first
+    assert len(opened) == 1
+
+
+def test_overflow_connections_are_closed_on_checkin():
+    pool, opened = make_pool(size=1, overflow=1, timeout=0.1)
+    a, b = pool.checkout(), pool.checkout()
+    with pytest.raises(PoolTimeoutError):
+        pool.checkout()
+    pool.checkin(a)
+    pool.checkin(b)
+    assert [conn.closed for conn in opened] == [False, True]
+    assert pool.stats()["idle"] == 1 and pool.stats()["timeouts"] == 1
+
+
+def test_waiter_gets_connection_returned_by_another_thread():
+    pool, opened = make_pool(size=1, overflow=0, timeout=5)
+    conn = pool.checkout()
+    threading.Timer(0.05, pool.checkin, args=(conn,)).start()
+    assert pool.checkout() is conn
+    assert pool.stats()["waits"] == 1
+
+
+def test_dead_and_expired_connections_are_replaced():
+    pool, opened = make_pool(size=1, overflow=0)
+    conn = pool.checkout()
+    conn.alive = False
+    pool.checkin(conn)
+    fresh = pool.checkout()
+    assert fresh is not conn and conn.closed
+
+    pool.checkin(fresh)
+    pool.recycle = 0
+    assert pool.checkout() is not fresh
+    assert pool.stats()["recycled"] == 2
+
+
+def test_open_transaction_is_rolled_back_on_checkin():
+    pool, _ = make_pool(size=1, overflow=0)
+    conn = pool.checkout()
+    conn.in_transaction = True
+    pool.checkin(conn)
+    assert conn.rollbacks == 1 and not conn.closed
+
+
+def test_failed_connect_frees_its_slot():
+    calls = []
+
+    def connect():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ConnectionError("접속 실패")
+        return FakeConnection()
+
+    pool = ConnectionPool(connect=connect, size=1, overflow=0, timeout=0.1)
+    with pytest.raises(ConnectionError):
+        pool.checkout()
+    assert pool.checkout() is not None
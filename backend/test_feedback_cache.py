@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI 피드백 캐시 테스트
+
+    python -m pytest test_feedback_cache.py
+"""
+
+import asyncio
+import os
+import sys
+from datetime import date
+
+# 현재 디렉토리를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from feedback_cache import AIFeedbackCache, feedback_key
+
+YESTERDAY, TODAY = date(2026, 10, 17), date(2026, 10, 18)
+
+
+def snapshot(kcal):
+    return feedback_key("남성", "20대", [{"name": "열량", "value": kcal, "unit": "kcal"}])
+
+
+class Generator:
+    """호출 횟수를 세고, 열어 줄 때까지 기다렸다가 피드백을 돌려주는 생성 함수"""
+
+    def __init__(self, text):
+        self.text = text
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        return self.text
+
+
+def test_key_ignores_order_and_float_noise():
+    a = [{"name": "열량", "value": 250.0, "unit": "kcal"}, {"name": "나트륨", "value": 450.04, "unit": "mg"}]
+    b = [{"name": "나트륨", "value": 450.0, "unit": "mg"}, {"name": "열량", "value": 250, "unit": "kcal"}]
+    assert feedback_key("남성", "20대", a) == feedback_key("남성", "20대", b)
+    assert feedback_key("여성", "20대", a) != feedback_key("남성", "20대", a)
+
+
+def test_concurrent_requests_generate_once():
+    async def main():
+        cache = AIFeedbackCache()
+        generate = Generator("조언")
+        waiting = [asyncio.create_task(cache.get(1, snapshot(500), generate, day=TODAY)) for _ in range(3)]
+        await asyncio.sleep(0)
+        generate.release.set()
+        return await asyncio.gather(*waiting), generate.calls, cache.stats()
+
+    texts, calls, stats = asyncio.run(main())
+    assert texts == ["조언"] * 3
+    assert calls == 1
+    assert stats["misses"] == 3
+
+
+def test_same_day_change_serves_previous_then_refreshes():
+    async def main():
+        cache = AIFeedbackCache()
+        first = Generator("아침 조언")
+        first.release.set()
+        await cache.get(1, snapshot(500), first, day=TODAY)
+
+        second = Generator("점심 조언")
+        served = await cache.get(1, snapshot(900), second, day=TODAY)
+        second.release.set()
+        await asyncio.sleep(0.01)
+        return served, await cache.get(1, snapshot(900), second, day=TODAY), second.calls
+
+    served, refreshed, calls = asyncio.run(main())
+    assert served == "아침 조언"
+    assert refreshed == "점심 조언"
+    assert calls == 1
+
+
+def test_previous_day_feedback_is_not_served():
+    async def main():
+        cache = AIFeedbackCache()
+        yesterday = Generator("어제 조언")
+        yesterday.release.set()
+        await cache.get(1, snapshot(2000), yesterday, day=YESTERDAY)
+
+        today = Generator("오늘 조언")
+        today.release.set()
+        return await cache.get(1, snapshot(400), today, day=TODAY)
+
+    assert asyncio.run(main()) == "오늘 조언"
+
+
+def test_failed_generation_is_not_stored():
+    async def fail():
+        raise RuntimeError("OpenAI 오류")
+
+    async def main():
+        cache = AIFeedbackCache()
+        try:
+            await cache.get(1, snapshot(500), fail, day=TODAY)
+        except RuntimeError:
+            pass
+        retry = Generator("조언")
+        retry.release.set()
+        return await cache.get(1, snapshot(500), retry, day=TODAY), cache.stats()
+
+    text, stats = asyncio.run(main())
+    assert text == "조언"
+    assert stats["errors"] == 1
+
+
+def test_forget_user_drops_previous_feedback():
+    async def main():
+        cache = AIFeedbackCache()
+        first = Generator("조언")
+        first.release.set()
+        await cache.get(1, snapshot(500), first, day=TODAY)
+        cache.forget_user(1)
+
+        second = Generator("새 조언")
+        second.release.set()
+        return await cache.get(1, snapshot(900), second, day=TODAY)
+
+    assert asyncio.run(main()) == "새 조언"
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+오늘 누적 영양소 캐시 테스트
+
+    python -m pytest test_nutrient_cache.py
+"""
+
+import os
+import sys
+from datetime import date
+
+# 현재 디렉토리를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from nutrient_cache import TodayNutrientCache
+
+YESTERDAY, TODAY = date(2026, 10, 17), date(2026, 10, 18)
+ROWS = [{"nutrient_name": "열량", "value": 250.0, "unit": "kcal"}]
+MEAL = [{"name": "열량", "value": 100, "unit": "kcal"}, {"name": "나트륨", "value": 300, "unit": "mg"}]
+
+
+def filled_cache() -> TodayNutrientCache:
+    cache = TodayNutrientCache()
+    _, version = cache.get(1, TODAY)
+    cache.fill(1, TODAY, ROWS, version)
+    return cache
+
+
+def test_fill_then_hit_returns_copy():
+    cache = filled_cache()
+    rows, _ = cache.get(1, TODAY)
+    assert rows == ROWS
+    rows[0]["value"] = 0
+    assert cache.get(1, TODAY)[0] == ROWS
+    assert cache.stats()["hits"] == 2
+
+
+def test_save_writes_through():
+    cache = filled_cache()
+    cache.begin_write(1, TODAY)
+    cache.add(1, TODAY, MEAL)
+
+    rows, _ = cache.get(1, TODAY)
+    assert {row["nutrient_name"]: row["value"] for row in rows} == {"열량": 350.0, "나트륨": 300.0}
+
+
+def test_read_that_overlaps_a_save_is_not_cached():
+    cache = TodayNutrientCache()
+    _, version = cache.get(1, TODAY)
+    cache.begin_write(1, TODAY)
+    cache.fill(1, TODAY, ROWS, version)  # 저장 전에 시작한 조회 결과
+    cache.add(1, TODAY, MEAL)
+    assert cache.get(1, TODAY)[0] is None
+
+    _, version = cache.get(1, TODAY)
+    cache.begin_write(1, TODAY)
+    cache.fill(1, TODAY, ROWS, version)  # 저장 중에 끝난 조회 결과 (add 에서 한 번 더 더해질 수 있음)
+    cache.add(1, TODAY, MEAL)
+    assert cache.get(1, TODAY)[0] is None
+
+
+def test_failed_save_drops_entry():
+    cache = filled_cache()
+    cache.begin_write(1, TODAY)
+    cache.abort_write(1, TODAY)
+    assert cache.get(1, TODAY)[0] is None
+
+
+def test_new_day_drops_previous_entries():
+    cache = TodayNutrientCache()
+    _, version = cache.get(1, YESTERDAY)
+    cache.fill(1, YESTERDAY, ROWS, version)
+    cache.get(2, TODAY)
+
+    assert cache.get(1, YESTERDAY)[0] is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_invalidate_user_blocks_in_flight_fill():
+    cache = TodayNutrientCache()
+    _, version = cache.get(1, TODAY)
+    cache.invalidate_user(1)
+    cache.fill(1, TODAY, ROWS, version)
+    assert cache.get(1, TODAY)[0] is None
+
+
+def test_expired_entry_is_a_miss():
+    cache = TodayNutrientCache(ttl=-1)
+    _, version = cache.get(1, TODAY)
+    cache.fill(1, TODAY, ROWS, version)
+    assert cache.get(1, TODAY)[0] is None
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OCR 결과 캐시 테스트
+
+    python -m pytest test_ocr_cache.py
+"""
+
+import os
+import sys
+
+import cv2
+import numpy as np
+
+# 현재 디렉토리를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import ocr.cache
+from ocr.cache import OCRResultCache, perceptual_hash
+
+
+def render_label(values):
+    """배치는 같고 숫자만 다른 영양성분표 이미지 (PNG 바이트)"""
+    image = np.full((360, 720), 255, dtype=np.uint8)
+    lines = ["Nutrition Facts"] + [f"{name} {value}" for name, value in values]
+    for i, text in enumerate(lines):
+        cv2.putText(image, text, (30, 60 + i * 65), cv2.FONT_HERSHEY_SIMPLEX, 1.4, 0, 3, cv2.LINE_AA)
+    return cv2.imencode(".png", image)[1].tobytes()
+
+
+LABEL_A = render_label([("Calories", "250 kcal"), ("Sodium", "450 mg"), ("Protein", "8 g")])
+LABEL_B = render_label([("Calories", "310 kcal"), ("Sodium", "180 mg"), ("Protein", "4 g")])
+RESULT_A = [{"name": "열량", "value": 250.0, "unit": "kcal"}]
+
+
+def test_same_layout_different_values_do_not_share_entry(tmp_path):
+    # 지각 해시로는 두 표를 구분할 수 없음 (이전 기본값 4비트 안쪽)
+    assert (perceptual_hash(LABEL_A) ^ perceptual_hash(LABEL_B)).bit_count() <= 4
+
+    cache = OCRResultCache(directory=str(tmp_path))
+    key, cached = cache.lookup(LABEL_A)
+    assert cached is None
+    cache.store(key, RESULT_A)
+
+    _, cached = cache.lookup(LABEL_B)
+    assert cached is None
+    assert cache.stats()["near_hits"] == 0
+
+
+def test_exact_same_bytes_hit(tmp_path):
+    cache = OCRResultCache(directory=str(tmp_path))
+    key, _ = cache.lookup(LABEL_A)
+    cache.store(key, RESULT_A)
+
+    _, cached = cache.lookup(LABEL_A)
+    assert cached == RESULT_A
+    assert cache.stats()["exact_hits"] == 1
+
+
+def test_near_match_only_when_enabled(tmp_path):
+    cache = OCRResultCache(directory=str(tmp_path), max_distance=4)
+    key, _ = cache.lookup(LABEL_A)
+    cache.store(key, RESULT_A)
+
+    _, cached = cache.lookup(LABEL_B)
+    assert cached == RESULT_A
+
+
+def test_phash_skipped_when_near_matching_is_off(tmp_path, monkeypatch):
+    def fail(data):
+        raise AssertionError("max_distance 가 0 이면 지각 해시를 계산하지 않아야 함")
+    monkeypatch.setattr(ocr.cache, "perceptual_hash", fail)
+
+    cache = OCRResultCache(directory=str(tmp_path))
+    key, cached = cache.lookup(LABEL_A)
+    assert cached is None and key.phash is None
+    cache.store(key, RESULT_A)
+    assert os.listdir(tmp_path) == [f"{key.digest}_none.json"]
@@ -0,0 +1,74 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from ocr.cascade import EXHAUSTED, CascadeStats, run_cascade
+
+
+class FakePipeline:
+    """단계마다 같은 빈 이미지를 돌려주는 전처리 대역"""
+    table_bbox = None
+
+    def fast(self):
+        return np.zeros((10, 10), dtype=np.uint8)
+
+    def variant(self, method, crop_table=False):
+        return np.zeros((10, 10), dtype=np.uint8)
+
+
+class FakeReader:
+    """readtext 호출 순서대로 준비한 (텍스트, 신뢰도) 목록을 돌려주는 리더"""
+
+    def __init__(self, *tiers):
+        self.tiers = list(tiers)
+
+    def readtext(self, image, detail=1):
+        return [([[0, 0], [1, 0], [1, 1], [0, 1]], text, confidence) for text, confidence in self.tiers.pop(0)]
+
+
+def test_exhausted_when_no_tier_is_confident():
+    low = [("열량 200", 0.2), ("나트륨 300", 0.2)]
+    result = run_cascade(FakePipeline(), FakeReader(low, low, low))
+
+    assert result["tier"] == EXHAUSTED
+    stats = CascadeStats()
+    stats.record(result["tier"])
+    assert stats.stats()["exits"] == {EXHAUSTED: 1}
+
+
+def test_lines_come_from_tiers_that_supplied_values():
+    fast = [("열량 200", 0.9), ("나트륨 300", 0.1)]
+    adaptive = [("잡음", 0.9), ("나트륨 310", 0.8)]
+    result = run_cascade(FakePipeline(), FakeReader(fast, adaptive))
+
+    assert result["tier"] == "adaptive"
+    assert result["values"] == {"열량": 200.0, "나트륨": 310.0}
+    assert result["lines"] == ["열량 200", "나트륨 300", "잡음", "나트륨 310"]
+
+
+def test_lines_skip_tiers_without_chosen_values():
+    fast = [("열량 200", 0.9), ("나트륨 300", 0.9)]
+    adaptive = [("흐림", 0.1)]
+    otsu = [("흐림", 0.1)]
+    result = run_cascade(FakePipeline(), FakeReader(fast, adaptive, otsu))
+
+    assert result["tier"] == "fast"
+    assert result["lines"] == ["열량 200", "나트륨 300"]
+
+
+def test_table_crop_misses_are_counted():
+    pipeline = FakePipeline()
+    pipeline.table_bbox = (0, 0, 5, 5)
+    fast = [("열량 200", 0.1)]
+    cropped = [("잡음", 0.9)]  # 잘라낸 영역이 영양성분표가 아님 → 전체 이미지로 재시도
+    full = [("열량 200", 0.9), ("나트륨 300", 0.9)]
+    result = run_cascade(pipeline, FakeReader(fast, cropped, full), crop_table=True)
+
+    assert result["tier"] == "adaptive"
+    assert result["table_retries"] == 1
+    stats = CascadeStats()
+    stats.record(result["tier"], result["table_retries"])
+    assert stats.stats()["table_retries"] == 1
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+비동기 OCR 작업 큐 테스트 (OCR 풀 대신 가짜 runner 사용)
+
+    python -m pytest test_ocr_jobs.py
+"""
+
+import asyncio
+import os
+import sqlite3
+import sys
+
+import pytest
+
+# 현재 디렉토리를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ocr.jobs import DONE, FAILED, OCRJobQueue, OCRJobStore
+
+RESULT = [{"name": "열량", "value": 250.0, "unit": "kcal"}]
+
+
+async def fake_runner(job_id, image):
+    return RESULT
+
+
+async def wait_final(queue, job_id, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        job = await queue.get(job_id)
+        if job["status"] in (DONE, FAILED, "cancelled"):
+            return job
+        assert asyncio.get_running_loop().time() < deadline, f"작업이 끝나지 않음: {job}"
+        await asyncio.sleep(0.01)
+
+
+def run_with_failing_store(tmp_path, fail_method):
+    """fail_method 가 첫 호출에서 sqlite3.Error 를 내는 저장소로 작업 두 개 실행"""
+    async def scenario():
+        store = OCRJobStore(str(tmp_path / "jobs.sqlite3"))
+        original = getattr(store, fail_method)
+        calls = {"count": 0}
+
+        async def failing(*args):
+            calls["count"] += 1
+            if calls["count"] == 1:
+                raise sqlite3.OperationalError("database is locked")
+            return await original(*args)
+
+        setattr(store, fail_method, failing)
+        queue = OCRJobQueue(store=store)
+        await queue.start(fake_runner, concurrency=1)
+        try:
+            first = await queue.submit("1", b"image-1")
+            first_result = await wait_final(queue, first.id)
+            # 작업자가 살아 있으면 다음 작업도 처리됨
+            second = await queue.submit("1", b"image-2")
+            second_result = await wait_final(queue, second.id)
+        finally:
+            await queue.stop()
+        return first_result, second_result
+
+    return asyncio.run(scenario())
+
+
+def test_store_failure_when_marking_running_fails_job_and_keeps_worker(tmp_path):
+    first, second = run_with_failing_store(tmp_path, "update")
+    assert first["status"] == FAILED
+    assert second["status"] == DONE
+    assert second["ocr_nutrients"] == RESULT
+
+
+def test_store_failure_when_reading_image_fails_job_and_keeps_worker(tmp_path):
+    first, second = run_with_failing_store(tmp_path, "image")
+    assert first["status"] == FAILED
+    assert second["status"] == DONE
+
+
+def test_unknown_progress_stage_rejected(tmp_path):
+    queue = OCRJobQueue(store=OCRJobStore(str(tmp_path / "jobs.sqlite3")))
+    with pytest.raises(ValueError):
+        queue.report("job", "unknown")
+    queue.report("job", "extract")  # 없는 작업의 알려진 단계는 무시
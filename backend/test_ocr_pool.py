@@ -0,0 +1,112 @@
+import asyncio
+import os
+import sys
+import threading
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import ocr.worker as worker
+from ocr.worker import OCRBusyError, OCRPool
+
+
+class FakeReader:
+    def readtext(self, image, detail=1):
+        return []
+
+
+def broken_init(torch_threads, event_queue=None):
+    raise RuntimeError("torch 없음")
+
+
+def init_failing_once(marker):
+    """처음 뜬 워커만 초기화에 실패하는 initializer (marker 파일로 프로세스 간 횟수 공유)"""
+    def init(torch_threads, event_queue=None):
+        worker._event_queue = event_queue
+        if not os.path.exists(marker):
+            open(marker, "w").close()
+            raise RuntimeError("첫 워커 초기화 실패")
+    return init
+
+
+def warm_up_pool(monkeypatch, init, attempts=3):
+    """워밍업 후 (풀, 종료 전 상태)"""
+    # 워커는 fork 로 만들어지므로 부모에 넣어 둔 가짜 리더/초기화 함수를 그대로 물려받음
+    monkeypatch.setattr(worker, "_reader", FakeReader())
+    monkeypatch.setattr(worker, "_init_worker", init)
+    monkeypatch.setattr(worker, "OCR_WARMUP_ATTEMPTS", attempts)
+    monkeypatch.setattr(worker, "OCR_WARMUP_BACKOFF", 0)
+    pool = OCRPool(size=1, queue_size=0, timeout=30)
+
+    async def main():
+        try:
+            await pool.warm_up()
+            return pool.status
+        finally:
+            pool.shutdown()
+    return pool, asyncio.run(main())
+
+
+def test_warm_up_retries_on_a_new_pool(monkeypatch, tmp_path):
+    pool, status = warm_up_pool(monkeypatch, init_failing_once(str(tmp_path / "marker")))
+
+    assert status == "ready"
+    assert pool.warmup_error is None
+
+
+def test_warm_up_reports_failure_after_all_attempts(monkeypatch):
+    pool, status = warm_up_pool(monkeypatch, broken_init, attempts=2)
+
+    assert status == "failed"
+    assert "OCRBusyError" in pool.warmup_error
+
+
+def crash():
+    os._exit(1)  # OOM 이나 네이티브 크래시로 워커가 죽은 상황
+
+
+def test_run_rebuilds_pool_after_worker_crash(monkeypatch, tmp_path):
+    monkeypatch.setattr(worker, "_init_worker", init_failing_once(str(tmp_path / "marker")))
+    open(tmp_path / "marker", "w").close()  # 초기화는 항상 성공
+    pool = OCRPool(size=1, queue_size=0, timeout=30)
+
+    async def main():
+        try:
+            try:
+                await pool.run(crash)
+            except OCRBusyError:
+                pass
+            else:
+                raise AssertionError("OCRBusyError 가 발생해야 함")
+            assert pool.pending == 0
+            return await pool.run(os.getpid)
+        finally:
+            pool.shutdown()
+
+    assert isinstance(asyncio.run(main()), int)
+
+
+def count_table_retry():
+    worker._send_count("table_retry", 2)
+
+
+def test_worker_counts_reach_main_process(monkeypatch, tmp_path):
+    monkeypatch.setattr(worker, "_init_worker", init_failing_once(str(tmp_path / "marker")))
+    open(tmp_path / "marker", "w").close()
+    pool = OCRPool(size=1, queue_size=0, timeout=30)
+    counts = []
+    received = threading.Event()
+
+    def on_count(event, amount):
+        counts.append((event, amount))
+        received.set()
+    pool.on_count(on_count)
+
+    async def main():
+        try:
+            await pool.run(count_table_retry)
+            assert received.wait(5)
+        finally:
+            pool.shutdown()
+    asyncio.run(main())
+
+    assert counts == [("table_retry", 2)]
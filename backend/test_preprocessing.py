@@ -11,7 +11,7 @@ from pathlib import Path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from ocr.preprocess import (
-    preprocess_image, 
+    PreprocessPipeline,
     enhance_text_region, 
     remove_background_noise, 
     deskew_image
@@ -43,14 +43,15 @@ def test_preprocessing_methods(image_path: str):
     
     print(f"원본 이미지 크기: {original.shape}")
     
-    # 다양한 전처리 방법 테스트
+    # 다양한 전처리 방법 테스트 (노이즈 제거 등 공통 단계는 한 번만 수행)
     methods = ["adaptive", "otsu", "gaussian", "multi_scale"]
+    pipeline = PreprocessPipeline(image_path)
     
     for method in methods:
         print(f"\n{method.upper()} 방법 테스트:")
         
         # 전처리 수행
-        processed = preprocess_image(image_path, method)
+        processed = pipeline.variant(method)
         
         if processed is not None:
             # 결과 저장
@@ -70,11 +71,13 @@ def test_preprocessing_methods(image_path: str):
         else:
             print(f"  - 전처리 실패")
     
+    print(f"\n단계별 소요 시간(ms): {pipeline.report.get('stages_ms')}")
+    
     # 추가 전처리 기법들 테스트
     print(f"\n추가 전처리 기법 테스트:")
     
     # 기본 전처리
-    base_processed = preprocess_image(image_path, "adaptive")
+    base_processed = pipeline.variant("adaptive")
     if base_processed is not None:
         # 텍스트 영역 강화
         enhanced = enhance_text_region(base_processed)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+일일 영양소 / 주·월 롤업 저장·조회 SQL 테스트 (MySQL 대신 bench/sqlite_mysql.py 의 SQLite 대역으로 실행)
+
+    python -m pytest test_repository.py
+"""
+
+import os
+import sys
+import threading
+from datetime import date
+
+import pytest
+
+# 현재 디렉토리를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench.sqlite_mysql import Connection, create_database
+from db import DBSession
+from repository import _add_daily, _get_daily, _get_range, period_start, upsert_daily_sql
+
+DAY = date(2026, 10, 14)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "test.db")
+    create_database(path)
+    return path
+
+
+def session(path) -> DBSession:
+    return DBSession(Connection(path))
+
+
+def totals(path, user_id=1, day=DAY):
+    return {row["nutrient_name"]: row["value"] for row in _get_daily(session(path), user_id, day)}
+
+
+def test_upsert_sql_has_one_row_per_nutrient():
+    sql = upsert_daily_sql(3)
+    assert sql.count("(%s, %s, %s, %s, %s)") == 3
+    assert "ON DUPLICATE KEY UPDATE value = value + VALUES(value)" in sql
+
+
+def test_repeated_saves_add_to_the_same_rows(db_path):
+    db = session(db_path)
+    _add_daily(db, 1, [{"name": "열량", "value": 250, "unit": "kcal"}, {"name": "나트륨", "value": 450, "unit": "mg"}], DAY)
+    _add_daily(db, 1, [{"name": "열량", "value": 100.5, "unit": "kcal"}], DAY)
+    _add_daily(db, 2, [{"name": "열량", "value": 999, "unit": "kcal"}], DAY)
+
+    assert totals(db_path) == {"열량": 350.5, "나트륨": 450.0}
+    db.cursor.execute("SELECT COUNT(*) AS n FROM daily_nutrients WHERE user_id = 1", ())
+    assert db.cursor.fetchone()["n"] == 2
+
+
+def test_concurrent_saves_are_not_lost(db_path):
+    def save():
+        db = session(db_path)
+        for _ in range(10):
+            _add_daily(db, 1, [{"name": "열량", "value": 10, "unit": "kcal"}], DAY)
+
+    threads = [threading.Thread(target=save) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert totals(db_path) == {"열량": 400.0}
+
+
+def test_empty_save_is_a_no_op(db_path):
+    _add_daily(session(db_path), 1, [], DAY)
+    assert totals(db_path) == {}
+
+
+def test_period_start():
+    assert period_start(DAY, "day") == DAY
+    assert period_start(DAY, "week") == date(2026, 10, 12)  # 월요일
+    assert period_start(DAY, "month") == date(2026, 10, 1)
+
+
+def test_rollups_match_daily_totals(db_path):
+    db = session(db_path)
+    meals = [(date(2026, 9, 30), 100), (date(2026, 10, 1), 200), (date(2026, 10, 4), 300), (date(2026, 10, 5), 400)]
+    for day, kcal in meals:
+        _add_daily(db, 1, [{"name": "열량", "value": kcal, "unit": "kcal"}], day)
+
+    def by_period(granularity, start, end):
+        return {row["period"]: row["value"] for row in _get_range(db, 1, granularity, start, end)}
+
+    start, end = date(2026, 9, 30), date(2026, 10, 5)
+    assert by_period("day", start, end) == {day: float(kcal) for day, kcal in meals}
+    # 2026-09-28(월) 주: 9/30, 10/1, 10/4 / 2026-10-05(월) 주: 10/5
+    assert by_period("week", start, end) == {date(2026, 9, 28): 600.0, date(2026, 10, 5): 400.0}
+    assert by_period("month", start, end) == {date(2026, 9, 1): 100.0, date(2026, 10, 1): 900.0}
+    # 범위 시작이 기간 중간이어도 그 기간 전체 합계를 반환
+    assert by_period("month", date(2026, 10, 4), end) == {date(2026, 10, 1): 900.0}
@@ -0,0 +1,43 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from starlette.applications import Starlette
+from starlette.formparsers import MultiPartParser
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from upload_form import UploadFormError, read_upload_form
+
+MAX_FILE_SIZE = 8 * 1024 * 1024
+
+
+async def upload(request):
+    try:
+        user_id, files = await read_upload_form(request, MAX_FILE_SIZE, "images", multiple=True)
+    except UploadFormError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    # SpooledTemporaryFile 이 디스크로 넘어갔으면 _rolled 가 True
+    return JSONResponse({"user_id": user_id, "sizes": [len(await f.read()) for f in files],
+                         "on_disk": [f.file._rolled for f in files]})
+
+
+client = TestClient(Starlette(routes=[Route("/upload", upload, methods=["POST"])]))
+
+
+def test_photo_sized_uploads_stay_in_memory():
+    photo = os.urandom(4 * 1024 * 1024)  # 기본 스풀 한도(1MB)보다 큰 휴대폰 사진 크기
+    response = client.post("/upload", data={"user_id": "7"},
+                           files=[("images", ("a.jpg", photo)), ("images", ("b.jpg", photo))])
+
+    assert response.status_code == 200
+    assert response.json() == {"user_id": "7", "sizes": [len(photo)] * 2, "on_disk": [False, False]}
+    assert MultiPartParser.max_file_size == 1024 * 1024  # 다른 경로의 기본 파서 설정은 그대로
+
+
+def test_missing_fields_are_rejected():
+    assert client.post("/upload", data={"user_id": "7"}, files={"other": ("a.jpg", b"x")}).status_code == 400
+    assert client.post("/upload", files={"images": ("a.jpg", b"x")}).status_code == 400
+    assert client.post("/upload", json={"user_id": "7"}).status_code == 400
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+사용자 프로필 캐시 / bcrypt 풀 테스트
+
+    python -m pytest test_user_cache.py
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+# 현재 디렉토리를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from passwords import PasswordHasher, PasswordHasherBusyError
+from user_cache import UserProfileCache
+
+PROFILE = {"username": "kim", "gender": "male", "age_group": "20대"}
+
+
+def test_fill_then_hit_returns_copy():
+    cache = UserProfileCache()
+    _, version = cache.get(1)
+    cache.fill(1, PROFILE, version)
+
+    profile, _ = cache.get(1)
+    assert profile == PROFILE
+    profile["gender"] = "female"
+    assert cache.get(1)[0] == PROFILE
+    assert cache.stats()["hits"] == 2
+
+
+def test_update_during_read_keeps_stale_profile_out():
+    cache = UserProfileCache()
+    _, version = cache.get(1)
+    cache.invalidate(1)  # 조회하는 동안 프로필 수정
+    cache.fill(1, PROFILE, version)
+    assert cache.get(1)[0] is None
+
+
+def test_invalidate_drops_entry():
+    cache = UserProfileCache()
+    cache.fill(1, PROFILE, cache.get(1)[1])
+    cache.invalidate(1)
+    assert cache.get(1)[0] is None
+
+
+def test_lru_and_ttl_limits():
+    cache = UserProfileCache(max_users=1)
+    cache.fill(1, PROFILE, 0)
+    cache.fill(2, PROFILE, 0)
+    assert cache.get(1)[0] is None and cache.get(2)[0] == PROFILE
+
+    expired = UserProfileCache(ttl=-1)
+    expired.fill(1, PROFILE, 0)
+    assert expired.get(1)[0] is None
+
+
+def test_password_round_trip():
+    async def main():
+        hasher = PasswordHasher(threads=1, queue_size=0)
+        try:
+            hashed = await hasher.hash("비밀번호")
+            return await hasher.check("비밀번호", hashed), await hasher.check("틀림", hashed)
+        finally:
+            hasher.shutdown()
+
+    assert asyncio.run(main()) == (True, False)
+
+
+def test_hasher_rejects_when_queue_is_full():
+    release = threading.Event()
+
+    async def main():
+        hasher = PasswordHasher(threads=1, queue_size=1)
+        try:
+            running = [asyncio.ensure_future(hasher._run(release.wait)) for _ in range(2)]
+            await asyncio.sleep(0)
+            with pytest.raises(PasswordHasherBusyError):
+                await hasher._run(release.wait)
+            release.set()
+            await asyncio.gather(*running)
+            await asyncio.sleep(0.01)
+            return hasher.stats()
+        finally:
+            release.set()
+            hasher.shutdown()
+
+    stats = asyncio.run(main())
+    assert stats["rejected"] == 1
+    assert stats["pending"] == 0
@@ -0,0 +1,60 @@
+#업로드 요청의 multipart 본문을 메모리에서 파싱
+#
+# FastAPI 의 File()/Form() 은 starlette 기본 파서를 쓰며, 파일이 1MB 를 넘으면 디스크 임시 파일로 넘깁니다.
+# 휴대폰 사진(2~5MB)은 대부분 이 한도를 넘으므로 OCR 업로드 경로는 이 모듈로 직접 파싱해
+# 한도(max_file_size) 이내의 파일을 메모리에 유지합니다. 다른 경로의 파서 설정은 바꾸지 않습니다.
+
+from typing import List, Tuple
+
+from starlette.datastructures import UploadFile
+from starlette.formparsers import MultiPartException, MultiPartParser
+from starlette.requests import Request
+
+
+def upload_form_openapi(file_field: str = "image", multiple: bool = False) -> dict:
+    """라우트의 openapi_extra 로 넘겨 /docs 에 File()/Form() 을 쓸 때와 같은 요청 형식을 보여줌"""
+    file_schema = {"type": "string", "format": "binary"}
+    if multiple:
+        file_schema = {"type": "array", "items": file_schema}
+    return {"requestBody": {"required": True, "content": {"multipart/form-data": {"schema": {
+        "type": "object",
+        "properties": {file_field: file_schema, "user_id": {"type": "string"}},
+        "required": [file_field, "user_id"],
+    }}}}}
+
+
+class UploadFormError(ValueError):
+    """업로드 본문이 multipart 형식이 아니거나 필수 필드가 빠진 경우"""
+
+
+async def read_upload_form(request: Request, max_file_size: int, file_field: str = "image",
+                           multiple: bool = False) -> Tuple[str, List[UploadFile]]:
+    """
+    multipart 본문에서 user_id 와 업로드 파일을 꺼냄 (max_file_size 이내의 파일은 디스크에 쓰지 않음)
+
+    Args:
+        request: 본문을 아직 읽지 않은 요청
+        max_file_size: 파일을 메모리에 둘 최대 크기 (요청 크기 제한은 UploadSizeLimitMiddleware 가 담당)
+        file_field: 파일 필드 이름
+        multiple: 같은 이름의 파일을 여러 개 받을지
+
+    Returns:
+        (user_id, 업로드 파일 목록) - 형식이 잘못되면 UploadFormError
+    """
+    if not request.headers.get("content-type", "").startswith("multipart/form-data"):
+        raise UploadFormError("multipart/form-data 형식으로 업로드해주세요.")
+
+    parser = MultiPartParser(request.headers, request.stream())
+    # 이 요청에서만 스풀 한도를 올림 (클래스 속성은 그대로 두어 다른 경로에 영향 없음)
+    parser.max_file_size = max_file_size
+    try:
+        form = await parser.parse()
+    except MultiPartException as e:
+        raise UploadFormError(str(e))
+
+    user_id = form.get("user_id")
+    files = [value for value in form.getlist(file_field) if isinstance(value, UploadFile)]
+    if not isinstance(user_id, str) or not files or (not multiple and len(files) > 1):
+        await form.close()
+        raise UploadFormError(f"{file_field} 파일과 user_id 가 필요합니다.")
+    return user_id, files
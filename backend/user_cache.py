@@ -0,0 +1,70 @@
+#사용자 프로필 캐시 (성별/나이대/건강 목표 등을 알기 위해 매 요청 users 를 조회하지 않도록)
+
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+USER_CACHE_MAX_USERS = int(os.getenv("USER_CACHE_MAX_USERS", "10000"))
+# 최대 보관 시간 (초) - 다른 프로세스에서 바꾼 프로필은 이 시간이 지나야 보임
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "300"))
+
+
+class UserProfileCache:
+    """
+    user_id -> 프로필 행(USER_PROFILE_COLUMNS) 캐시 (TTL + 최대 개수 LRU)
+
+    수정/삭제 시 invalidate 로 항목을 지우고 버전을 올립니다. DB에서 읽은 값은 조회를 시작할 때의
+    버전이 그대로일 때만 넣으므로, 수정과 동시에 진행된 조회가 수정 전 값을 다시 채우지 못합니다.
+    이벤트 루프에서만 호출합니다.
+    """
+
+    def __init__(self, max_users: int = USER_CACHE_MAX_USERS, ttl: float = USER_CACHE_TTL):
+        self.max_users = max_users
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def get(self, user_id) -> Tuple[Optional[Dict[str, Any]], int]:
+        """
+        캐시 조회
+
+        Returns:
+            (프로필 복사본 또는 None, 캐시를 채울 때 넘길 버전)
+        """
+        key = str(user_id)
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[1] <= self.ttl:
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return dict(entry[0]), self._versions.get(key, 0)
+        if entry is not None:
+            del self._entries[key]
+        self._stats["misses"] += 1
+        return None, self._versions.get(key, 0)
+
+    def fill(self, user_id, profile: Dict[str, Any], version: int):
+        key = str(user_id)
+        if self._versions.get(key, 0) != version:
+            return
+        self._entries[key] = (dict(profile), time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_users:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        key = str(user_id)
+        self._entries.pop(key, None)
+        self._versions[key] = self._versions.get(key, 0) + 1
+        self._stats["invalidations"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+user_cache = UserProfileCache()
@@ -1,4 +1,4 @@
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { Outlet } from 'react-router-dom';
 import NutrientBars from "./NutrientBars";
 import BottomNavBar from './BottomNavBar';
@@ -14,6 +14,8 @@ function SharedLayout({ user, handleLogout }) {
   const [isModalOpen, setIsModalOpen] = useState(false);
   const [ocrResult, setOcrResult] = useState(null);
   const [isChatOpen, setIsChatOpen] = useState(false);
+  // 서버에 보관된 AI 코치 대화 세션 ID (대화 기록은 서버가 관리)
+  const chatSessionId = useRef(null);
 
   useEffect(() => {
     const fetchInitialData = async () => {
@@ -94,18 +96,42 @@ function SharedLayout({ user, handleLogout }) {
     try {
       const aiThinkingMessage = { role: "assistant", content: "...", isTyping: true };
       setMessages(prev => [...prev, aiThinkingMessage]);
-      const response = await fetch("http://localhost:8000/ask-ai", {
+      // 답변을 생성되는 대로 받아서(SSE) 마지막 말풍선에 이어 붙임
+      const response = await fetch("http://localhost:8000/ask-ai/stream", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ user_id: user.id, question, history: messages }),
-      });
-      if (!response.ok) throw new Error("AI 응답 생성 실패");
-      const data = await response.json();
-      setMessages(prev => {
-        const newMessages = [...prev];
-        newMessages[newMessages.length - 1] = { role: "assistant", content: data.answer };
-        return newMessages;
+        body: JSON.stringify({ user_id: user.id, question, session_id: chatSessionId.current }),
       });
+      if (!response.ok || !response.body) throw new Error("AI 응답 생성 실패");
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      let answer = "";
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split("\n\n");
+        buffer = events.pop();
+        for (const event of events) {
+          const dataLine = event.split("\n").find(line => line.startsWith("data: "));
+          if (event.startsWith("event: error")) throw new Error("AI 응답 생성 실패");
+          if (!dataLine || event.startsWith("event: done")) continue;
+          if (event.startsWith("event: session")) {
+            chatSessionId.current = JSON.parse(dataLine.slice(6)).session_id;
+            continue;
+          }
+          answer += JSON.parse(dataLine.slice(6)).delta;
+          const content = answer;
+          setMessages(prev => {
+            const newMessages = [...prev];
+            newMessages[newMessages.length - 1] = { role: "assistant", content };
+            return newMessages;
+          });
+        }
+      }
+      if (!answer) throw new Error("AI 응답 생성 실패");
     } catch (error) {
       console.error(error);
       const errorMessage = { role: "assistant", content: "죄송해요, 답변을 생성하는 데 문제가 발생했어요." };
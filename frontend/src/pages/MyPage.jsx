@@ -30,7 +30,7 @@ function MyPage() {
     ageGroup: '',
     activity_level: '좌식 생활',
     health_goal: '현재 체중 유지',
-    profileImage: null,
+    profileImage: null, // 크기별 썸네일 경로 { "64": "/profile-images/...", ... }
   });
   const [isLoading, setIsLoading] = useState(true);
   const [showEditProfileModal, setShowEditProfileModal] = useState(false);
@@ -60,24 +60,21 @@ function MyPage() {
 
   const handleImageChange = async (e) => {
     const file = e.target.files[0];
-    if (file) {
-      const reader = new FileReader();
-      reader.onloadend = async () => {
-        const base64Image = reader.result;
-        setProfile(prev => ({ ...prev, profileImage: base64Image }));
-
-        try {
-          await fetch(`http://localhost:8000/users/${user.id}/profile-image`, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ profile_image: base64Image }),
-          });
-        } catch (error) {
-          console.error("이미지 업로드 실패:", error);
-          alert("이미지 업로드에 실패했습니다.");
-        }
-      };
-      reader.readAsDataURL(file);
+    if (!file) return;
+    // 원본 파일을 그대로 보내고, 서버가 만든 썸네일 경로를 받아서 표시
+    const formData = new FormData();
+    formData.append("image", file);
+    try {
+      const res = await fetch(`http://localhost:8000/users/${user.id}/profile-image`, {
+        method: 'POST',
+        body: formData,
+      });
+      const data = await res.json();
+      if (!res.ok) throw new Error(data.error);
+      setProfile(prev => ({ ...prev, profileImage: data.profile_image }));
+    } catch (error) {
+      console.error("이미지 업로드 실패:", error);
+      alert("이미지 업로드에 실패했습니다.");
     }
   };
 
@@ -148,7 +145,12 @@ function MyPage() {
             {/* 프로필 이미지 */}
             <div className="relative w-20 h-20">
               <img
-                src={profile.profileImage || `https://ui-avatars.com/api/?name=${profile.username}&background=random&size=128`}
+                src={profile.profileImage
+                  ? `http://localhost:8000${profile.profileImage["128"]}`
+                  : `https://ui-avatars.com/api/?name=${profile.username}&background=random&size=128`}
+                srcSet={profile.profileImage
+                  ? `http://localhost:8000${profile.profileImage["128"]} 1x, http://localhost:8000${profile.profileImage["256"]} 2x`
+                  : undefined}
                 alt="프로필"
                 className="w-full h-full rounded-full object-cover border-2 border-green-400"
               />
@@ -26,7 +26,9 @@ function StatisticsPage() {
       try {
         const response = await fetch(`http://localhost:8000/statistics/${user.id}`);
         const data = await response.json();
-        setStatsData(data);
+        // 열 단위 응답(dates + 영양소별 values)을 날짜 -> 인덱스로 찾을 수 있게 변환
+        const dateIndex = Object.fromEntries(data.dates.map((d, i) => [d, i]));
+        setStatsData({ ...data, dateIndex });
       } catch (error) {
         console.error("통계 데이터 로딩 실패:", error);
       } finally {
@@ -36,13 +38,14 @@ function StatisticsPage() {
     fetchStatsData();
   }, [user.id]);
 
-  // 선택된 날짜의 데이터 (문자열 키로 직접 접근)
-  const selectedDayData = statsData ? statsData[selectedDate] : null;
+  // 선택된 날짜의 인덱스 (문자열 키로 직접 접근)
+  const hasData = (day) => statsData !== null && statsData.dateIndex[day] !== undefined;
+  const selectedIndex = hasData(selectedDate) ? statsData.dateIndex[selectedDate] : null;
   const targetNutrients = ["열량", "단백질", "나트륨", "당류", "지방", "포화지방"];
-  const chartData = selectedDayData
+  const chartData = selectedIndex !== null
     ? targetNutrients.map(name => {
-        const nutrient = selectedDayData.find(n => n.name === name);
-        return { name, 섭취량: nutrient ? nutrient.value : 0 };
+        const value = statsData.nutrients[name]?.values[selectedIndex];
+        return { name, 섭취량: value ?? 0 };
       })
     : [];
 
@@ -76,7 +79,7 @@ function StatisticsPage() {
                 className={theme === 'dark' ? 'dark-calendar' : ''}
                 tileClassName={({ date, view }) => {
                   // 캘린더의 각 날짜도 UTC 문자열로 변환하여 비교
-                  if (view === 'month' && statsData && statsData[formatDateToUTCString(date)]) {
+                  if (view === 'month' && hasData(formatDateToUTCString(date))) {
                     return 'has-data';
                   }
                 }}
@@ -88,7 +91,7 @@ function StatisticsPage() {
               <h3 className="font-bold text-lg mb-4 text-gray-700 dark:text-gray-300">
                 {new Date(selectedDate).toLocaleDateString()} 영양소 섭취량
               </h3>
-              {selectedDayData ? (
+              {selectedIndex !== null ? (
                 <ResponsiveContainer width="100%" height={250}>
                   <BarChart data={chartData} margin={{ top: 5, right: 20, left: -10, bottom: 5 }}>
                     <XAxis dataKey="name" fontSize={12} stroke={chartColor} />